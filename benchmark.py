@@ -0,0 +1,1020 @@
+"""
+Load benchmark for the Form Builder API.
+
+Drives a running server (``uvicorn main:app``) with a mix of public form
+submissions and stats refreshes and reports throughput and p50/p95/p99
+latency per operation. Run it against two revisions to compare them:
+
+    RATE_LIMIT_ENABLED=false uvicorn main:app --port 8000
+    python benchmark.py --base-url http://localhost:8000 --output after.json
+    python benchmark.py --compare before.json after.json
+
+The cap scenario fires hundreds of parallel submitters at a form with
+max_responses and checks that exactly that many are accepted:
+
+    python benchmark.py --scenario cap --submitters 500 --max-responses 100
+
+The login-storm scenario measures submit latency first on its own and then
+while clients log in back to back (bcrypt must not stall the event loop):
+
+    python benchmark.py --scenario login-storm --duration 20 --logins 20
+
+The scaling scenario starts ``python main.py serve`` itself with each worker
+count in turn (MONGODB_URI must point at a test database) and reports
+submit throughput per worker count:
+
+    python benchmark.py --scenario scaling --workers 1 2 4 --concurrency 200
+
+The suite scenario replays a weighted mix of public form views, JSON and
+file submits, stats refreshes, paginated response listings and logins
+against a seeded data set: users, forms of several question counts and
+(by default) a million responses. Seed once, start the server on the same
+MONGODB_URI, save a baseline, then let CI fail on regressions beyond
+--tolerance percent in p99 or throughput:
+
+    MONGODB_URI=mongodb://localhost/bench python benchmark.py --seed --responses 2000000
+    python benchmark.py --scenario suite --random-seed 1 --output baseline.json
+    python benchmark.py --scenario suite --random-seed 1 --baseline baseline.json --tolerance 20
+
+With --in-memory the app runs in-process on mongomock-motor and seeds
+itself, so no server or MongoDB is needed. Keep --responses small there:
+
+    python benchmark.py --scenario suite --in-memory --responses 20000 --duration 20
+
+Microbenchmarks of in-process code paths run without a server:
+
+    python benchmark.py --micro validator --questions 200
+    python benchmark.py --micro dynamic
+    python benchmark.py --micro stats --questions 50 --in-memory
+    python benchmark.py --micro metrics
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import signal
+import string
+import subprocess
+import sys
+import time
+import timeit
+
+import httpx
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed):
+    summary = {}
+    for operation, samples in latencies.items():
+        summary[operation] = {
+            "requests": len(samples),
+            "throughput": len(samples) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+        }
+    return summary
+
+
+def build_form(question_count, max_responses=None, file_question=False):
+    questions = []
+    for index in range(question_count):
+        if index % 3 == 0:
+            questions.append({
+                "id": f"q{index}",
+                "type": "rating",
+                "title": f"Rating {index}",
+                "required": True,
+                "min_value": 1,
+                "max_value": 5,
+            })
+        elif index % 3 == 1:
+            questions.append({
+                "id": f"q{index}",
+                "type": "multiple_choice",
+                "title": f"Choice {index}",
+                "required": False,
+                "options": [{"value": v, "label": v.upper()} for v in ("a", "b", "c")],
+            })
+        else:
+            questions.append({
+                "id": f"q{index}",
+                "type": "text",
+                "title": f"Text {index}",
+                "required": False,
+            })
+    if file_question:
+        questions.append({"id": "upload", "type": "file", "title": "Attachment", "required": False})
+    return {
+        "title": "Benchmark form",
+        "start_screen": {"id": "start", "title": "Start"},
+        "questions": questions,
+        "end_screen": {"id": "end", "title": "Done"},
+        "max_responses": max_responses,
+    }
+
+
+def build_answers(form):
+    answers = {}
+    for question in form["questions"]:
+        if question["type"] == "rating":
+            answers[question["id"]] = random.randint(1, 5)
+        elif question["type"] == "multiple_choice":
+            answers[question["id"]] = random.choice(question["options"])["value"]
+        elif question["type"] == "file":
+            continue
+        else:
+            answers[question["id"]] = "".join(random.choices(string.ascii_lowercase, k=12))
+    return answers
+
+
+async def setup(client, question_count, max_responses=None):
+    suffix = "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    username = f"bench_{suffix}"
+    password = "bench-password"
+    response = await client.post("/register", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": password,
+    })
+    response.raise_for_status()
+    response = await client.post("/token", data={"username": username, "password": password})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    form = build_form(question_count, max_responses)
+    response = await client.post("/forms", json=form, headers=headers)
+    response.raise_for_status()
+    created = response.json()
+    return {
+        "headers": headers,
+        "credentials": {"username": username, "password": password},
+        "form": form,
+        "form_id": created["_id"],
+        "slug": created["slug"],
+    }
+
+
+async def run_mixed(client, context, duration, concurrency, stats_ratio):
+    latencies = {"submit": [], "stats": []}
+    errors = {"submit": 0, "stats": 0}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            if random.random() < stats_ratio:
+                operation = "stats"
+                request = client.get(f"/forms/{context['form_id']}/stats", headers=context["headers"])
+            else:
+                operation = "submit"
+                request = client.post(f"/f/{context['slug']}/submit", json=build_answers(context["form"]))
+            started = time.perf_counter()
+            response = await request
+            latencies[operation].append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors[operation] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(latencies, elapsed)
+    for operation, count in errors.items():
+        summary[operation]["errors"] = count
+    return summary
+
+
+async def run_cap_stress(client, context, submitters, max_responses):
+    async def submit():
+        response = await client.post(f"/f/{context['slug']}/submit", json=build_answers(context["form"]))
+        return response.status_code
+
+    started = time.perf_counter()
+    codes = await asyncio.gather(*(submit() for _ in range(submitters)))
+    elapsed = time.perf_counter() - started
+
+    accepted = codes.count(200)
+    rejected = codes.count(403)
+    response = await client.get(f"/forms/{context['form_id']}", headers=context["headers"])
+    stored_count = response.json()["response_count"]
+    print(f"submitters: {submitters}, cap: {max_responses}, elapsed: {elapsed:.2f}s")
+    print(f"accepted: {accepted}, rejected at cap: {rejected}, other: {submitters - accepted - rejected}")
+    print(f"form response_count: {stored_count}")
+    if accepted != max_responses or stored_count != max_responses:
+        raise SystemExit("max_responses was not enforced")
+
+
+async def run_login_storm(client, context, duration, concurrency, logins):
+    """Submit latency alone for the first half of the run, then alongside back-to-back logins."""
+    latencies = {"submit_quiet": [], "submit_storm": [], "login": []}
+    errors = {operation: 0 for operation in latencies}
+
+    async def submitter(operation, deadline):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await client.post(f"/f/{context['slug']}/submit", json=build_answers(context["form"]))
+            latencies[operation].append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors[operation] += 1
+
+    async def login(deadline):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await client.post("/token", data=context["credentials"])
+            latencies["login"].append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors["login"] += 1
+
+    started = time.perf_counter()
+    deadline = started + duration / 2
+    await asyncio.gather(*(submitter("submit_quiet", deadline) for _ in range(concurrency)))
+    deadline = time.perf_counter() + duration / 2
+    await asyncio.gather(
+        *(submitter("submit_storm", deadline) for _ in range(concurrency)),
+        *(login(deadline) for _ in range(logins))
+    )
+    elapsed = (time.perf_counter() - started) / 2
+
+    summary = summarize(latencies, elapsed)
+    for operation, count in errors.items():
+        summary[operation]["errors"] = count
+    return summary
+
+
+SUITE_OPERATIONS = ("view", "submit", "submit_file", "stats", "list", "login")
+DEFAULT_MIX = "view=50,submit=25,submit_file=5,stats=8,list=10,login=2"
+SEED_BATCH_SIZE = 5000
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        operation, _, weight = part.partition("=")
+        if operation.strip() not in SUITE_OPERATIONS:
+            raise SystemExit(f"Unknown operation {operation!r} in --mix (expected {', '.join(SUITE_OPERATIONS)})")
+        mix[operation.strip()] = float(weight)
+    return mix
+
+
+@contextlib.contextmanager
+def in_memory_database():
+    """Import main with its collections pointed at mongomock-motor, so no MongoDB server is needed."""
+    try:
+        from mongomock_motor import AsyncMongoMockClient, enabled_gridfs_integration
+    except ImportError:
+        raise SystemExit("--in-memory needs mongomock-motor (pip install mongomock-motor)")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    import main
+
+    mock_client = AsyncMongoMockClient()
+    main.client = mock_client
+    main.db = mock_client.formbuilder
+    main.users_collection = main.db.users
+    main.forms_collection = main.db.forms
+    main.responses_collection = main.db.responses
+    main.templates_collection = main.db.templates
+    main.stats_collection = main.db.form_stats
+    main.deletions_collection = main.db.form_deletions
+    with enabled_gridfs_integration():
+        yield main
+
+
+async def seed_database(app_module, users, forms_per_user, question_counts, responses):
+    """
+    Write a benchmark data set straight into main's collections and return its manifest.
+
+    Forms cycle through question_counts and every form has an optional file
+    question. Responses follow a Zipf-like split across forms, so a few forms
+    are very large, and their submit times are spread over the last 90 days.
+    Counters and stats rollups are rebuilt afterwards, as after real traffic.
+    """
+    from datetime import datetime, timedelta
+
+    await app_module.ensure_indexes()
+    tag = os.urandom(3).hex()
+    password = "bench-password"
+    hashed_password = await app_module.get_password_hash(password)
+    now = datetime.now()
+
+    manifest = {"users": [], "forms": []}
+    user_documents = []
+    for index in range(users):
+        username = f"bench_{tag}_{index}"
+        user_documents.append({
+            "username": username,
+            "email": f"{username}@example.com",
+            "hashed_password": hashed_password,
+            "created_at": now,
+        })
+        manifest["users"].append({"username": username, "password": password})
+    user_ids = (await app_module.users_collection.insert_many(user_documents)).inserted_ids
+
+    form_documents = []
+    for index in range(users * forms_per_user):
+        question_count = question_counts[index % len(question_counts)]
+        document = app_module.FormCreate(**build_form(question_count, file_question=True)).model_dump(by_alias=True)
+        document.update({
+            "creator_id": user_ids[index % users],
+            "created_at": now,
+            "updated_at": now,
+            "slug": f"b{tag}{index}",
+            "is_active": True,
+            "response_count": 0,
+        })
+        form_documents.append(document)
+        manifest["forms"].append({"slug": document["slug"], "owner": index % users, "questions": question_count})
+    form_ids = (await app_module.forms_collection.insert_many(form_documents)).inserted_ids
+
+    weights = [1 / (rank + 1) for rank in range(len(form_documents))]
+    counts = [0] * len(form_documents)
+    search_ids = [
+        [q["id"] for q in document["questions"] if q["type"] in app_module.SEARCHABLE_QUESTION_TYPES]
+        for document in form_documents
+    ]
+    started = time.perf_counter()
+    written = 0
+    while written < responses:
+        batch = []
+        for index in random.choices(range(len(form_documents)), weights, k=min(SEED_BATCH_SIZE, responses - written)):
+            answers = build_answers(form_documents[index])
+            document = {
+                "form_id": form_ids[index],
+                "answers": answers,
+                "created_at": now - timedelta(seconds=random.randint(0, 90 * 86400)),
+                "ip_address": f"10.0.{random.randint(0, 255)}.{random.randint(1, 254)}",
+                "user_agent": "benchmark",
+            }
+            search_text = app_module.build_search_text(search_ids[index], answers)
+            if search_text:
+                document["search_text"] = search_text
+            batch.append(document)
+            counts[index] += 1
+        await app_module.responses_collection.insert_many(batch, ordered=False)
+        written += len(batch)
+        if written % (SEED_BATCH_SIZE * 20) == 0 or written == responses:
+            rate = written / (time.perf_counter() - started)
+            print(f"seeded {written}/{responses} responses ({rate:.0f}/s)")
+
+    for form_id, count in zip(form_ids, counts):
+        await app_module.forms_collection.update_one({"_id": form_id}, {"$set": {"response_count": count}})
+    await app_module.rebuild_all_stats([str(form_id) for form_id in form_ids])
+    for entry, form_id, count in zip(manifest["forms"], form_ids, counts):
+        entry.update({"form_id": str(form_id), "responses": count})
+    return manifest
+
+
+async def run_suite(client, manifest, duration, concurrency, mix, pages, file_size):
+    """Replay a weighted mix of the app's main operations against a seeded data set."""
+    latencies = {operation: [] for operation in mix}
+    errors = {operation: 0 for operation in mix}
+    users = manifest["users"]
+    forms = [{**entry, "form": build_form(entry["questions"], file_question=True)} for entry in manifest["forms"]]
+    # Busy forms see most of the traffic, as in the seeded data
+    weights = [1 / (rank + 1) for rank in range(len(forms))]
+    operations = list(mix)
+    operation_weights = [mix[operation] for operation in operations]
+    attachment = os.urandom(file_size)
+
+    headers = []
+    for user in users:
+        response = await client.post("/token", data=user)
+        response.raise_for_status()
+        headers.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+
+    def record(operation, started, response):
+        latencies[operation].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            errors[operation] += 1
+
+    async def view(form):
+        started = time.perf_counter()
+        record("view", started, await client.get(f"/f/{form['slug']}"))
+
+    async def submit(form):
+        started = time.perf_counter()
+        record("submit", started, await client.post(f"/f/{form['slug']}/submit", json=build_answers(form["form"])))
+
+    async def submit_file(form):
+        started = time.perf_counter()
+        response = await client.post(
+            f"/f/{form['slug']}/submit-multipart",
+            data={"answers": json.dumps(build_answers(form["form"]))},
+            files={"upload": ("attachment.bin", attachment, "application/octet-stream")},
+        )
+        record("submit_file", started, response)
+
+    async def stats(form):
+        started = time.perf_counter()
+        record("stats", started, await client.get(f"/forms/{form['form_id']}/stats", headers=headers[form["owner"]]))
+
+    async def listing(form):
+        # Page through the newest responses the way the responses screen does
+        params = {"limit": 50}
+        for _ in range(pages):
+            started = time.perf_counter()
+            response = await client.get(
+                f"/forms/{form['form_id']}/responses", params=params, headers=headers[form["owner"]]
+            )
+            record("list", started, response)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params = {"limit": 50, "cursor": cursor}
+
+    async def login(form):
+        started = time.perf_counter()
+        record("login", started, await client.post("/token", data=users[form["owner"]]))
+
+    handlers = {"view": view, "submit": submit, "submit_file": submit_file, "stats": stats, "list": listing, "login": login}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            operation = random.choices(operations, operation_weights)[0]
+            await handlers[operation](random.choices(forms, weights)[0])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(latencies, elapsed)
+    for operation, count in errors.items():
+        summary[operation]["errors"] = count
+    return summary
+
+
+def check_baseline(summary, baseline_path, tolerance):
+    """Exit non-zero when any operation's p99 or throughput is more than tolerance percent worse than the baseline."""
+    with open(baseline_path) as handle:
+        baseline = json.load(handle)
+    regressions = []
+    print(f"{'operation':<12}{'p99 base':>10}{'p99 now':>10}{'req/s base':>12}{'req/s now':>11}")
+    for operation in sorted(set(baseline) & set(summary)):
+        old, new = baseline[operation], summary[operation]
+        print(f"{operation:<12}{old['p99_ms']:>10.1f}{new['p99_ms']:>10.1f}{old['throughput']:>12.1f}{new['throughput']:>11.1f}")
+        if old["p99_ms"] and new["p99_ms"] > old["p99_ms"] * (1 + tolerance / 100):
+            regressions.append(f"{operation}: p99 {old['p99_ms']:.1f} ms -> {new['p99_ms']:.1f} ms")
+        if new["throughput"] < old["throughput"] * (1 - tolerance / 100):
+            regressions.append(f"{operation}: throughput {old['throughput']:.1f} -> {new['throughput']:.1f} req/s")
+        if new.get("errors", 0) > old.get("errors", 0) and new["errors"] / max(new["requests"], 1) > 0.01:
+            regressions.append(f"{operation}: {new['errors']} errors")
+    if regressions:
+        raise SystemExit("Regressions beyond {:.0f}%:\n  {}".format(tolerance, "\n  ".join(regressions)))
+    print(f"No regressions beyond {tolerance:.0f}% of {baseline_path}")
+
+
+def wait_for_server(base_url, timeout=60.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"Server at {base_url} did not become healthy within {timeout:.0f}s")
+
+
+async def measure_submit_throughput(base_url, duration, concurrency, question_count):
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        context = await setup(client, question_count)
+        summary = await run_mixed(client, context, duration, concurrency, stats_ratio=0)
+    return summary["submit"]
+
+
+def run_scaling(args):
+    """
+    Start ``main.py serve`` once per worker count and measure submit throughput against it.
+
+    Rate limiting is disabled for the servers. The load generator is a single
+    process, so give it enough --concurrency to saturate the largest worker count.
+    """
+    port = 8765
+    base_url = f"http://127.0.0.1:{port}"
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    results = {}
+    for workers in args.workers:
+        env = {**os.environ, "PORT": str(port), "RATE_LIMIT_ENABLED": "false"}
+        server = subprocess.Popen([sys.executable, main_path, "serve", "--workers", str(workers)], env=env)
+        try:
+            wait_for_server(base_url)
+            results[workers] = asyncio.run(
+                measure_submit_throughput(base_url, args.duration, args.concurrency, args.questions)
+            )
+        finally:
+            # SIGTERM exercises the same graceful drain as a deploy
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+    baseline_workers = args.workers[0]
+    baseline = results[baseline_workers]["throughput"]
+    print(f"{'workers':<10}{'req/s':>10}{'p99 ms':>10}{'speedup':>10}{'efficiency':>12}")
+    for workers, submit in results.items():
+        speedup = submit["throughput"] / baseline if baseline else 0.0
+        efficiency = speedup / (workers / baseline_workers)
+        print(f"{workers:<10}{submit['throughput']:>10.1f}{submit['p99_ms']:>10.1f}{speedup:>10.2f}{efficiency:>11.0%}")
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({str(workers): submit for workers, submit in results.items()}, handle, indent=2)
+
+
+def print_summary(summary):
+    print(f"{'operation':<12}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for operation, data in summary.items():
+        print(
+            f"{operation:<12}{data['requests']:>10}{data['throughput']:>10.1f}"
+            f"{data['p50_ms']:>10.1f}{data['p95_ms']:>10.1f}{data['p99_ms']:>10.1f}"
+        )
+
+
+def compare(before_path, after_path):
+    with open(before_path) as handle:
+        before = json.load(handle)
+    with open(after_path) as handle:
+        after = json.load(handle)
+    print(f"{'operation':<12}{'p99 before':>12}{'p99 after':>12}{'change':>10}")
+    for operation in sorted(set(before) & set(after)):
+        old = before[operation]["p99_ms"]
+        new = after[operation]["p99_ms"]
+        change = (new - old) / old * 100 if old else 0.0
+        print(f"{operation:<12}{old:>12.1f}{new:>12.1f}{change:>9.1f}%")
+
+
+def baseline_validate(form, answers):
+    # submit_form_response's checks at the baseline commit: a linear question scan
+    # per answer (to find base64 file answers) and a required-id loop. Nothing else
+    # was validated, so this is less work than the compiled validator does.
+    for question_id, answer in list(answers.items()):
+        question = next((q for q in form["questions"] if q["id"] == question_id), None)
+        if question and question["type"] == "file" and isinstance(answer, dict) and "data" in answer:
+            pass
+    for question in form["questions"]:
+        if question["required"] and question["id"] not in answers:
+            return f"Question '{question['title']}' is required"
+    return None
+
+
+def micro_validator(args):
+    from main import AnswerValidator
+
+    form = build_form(args.questions)
+    answers = build_answers(form)
+    validator = AnswerValidator(form["questions"])
+    assert validator.validate(answers) is None
+    assert baseline_validate(form, answers) is None
+
+    runs = args.iterations
+    baseline = timeit.timeit(lambda: baseline_validate(form, answers), number=runs) / runs
+    compiled = timeit.timeit(lambda: validator.validate(answers), number=runs) / runs
+    build = timeit.timeit(lambda: AnswerValidator(form["questions"]), number=max(1, runs // 10)) / max(1, runs // 10)
+    print(f"questions: {args.questions}")
+    print(f"baseline checks (required only):    {baseline * 1e6:10.1f} us/submit")
+    print(f"compiled validator (type/range/...): {compiled * 1e6:10.1f} us/submit ({baseline / compiled:.1f}x)")
+    print(f"validator build:                     {build * 1e6:10.1f} us/form revision")
+
+
+def personality_dynamic_content():
+    # Four-level quiz tree like the built-in Personality Assessment template, with all 16 leaves
+    levels = [("social_energy", "EI"), ("information_processing", "SN"),
+              ("decision_making", "TF"), ("lifestyle_preference", "JP")]
+
+    def build(depth, prefix):
+        question_id, letters = levels[depth]
+        branches = {}
+        for letter in letters:
+            if depth == len(levels) - 1:
+                branches[f"equals:{letter}"] = {"title": prefix + letter, "description": "..."}
+            else:
+                branches[f"equals:{letter}"] = build(depth + 1, prefix + letter)
+        return {question_id: branches}
+
+    return build(0, "")
+
+
+def micro_dynamic(args):
+    from main import DynamicContentEvaluator, evaluate_dynamic_content
+
+    # Agreement with evaluate_dynamic_content is checked by tests/test_dynamic_content.py
+    tree = personality_dynamic_content()
+    evaluator = DynamicContentEvaluator(tree)
+    answers = {"social_energy": "I", "information_processing": "N",
+               "decision_making": "F", "lifestyle_preference": "P"}
+    assert evaluator.evaluate(answers) == evaluate_dynamic_content(tree, answers)
+
+    runs = args.iterations * 10
+    legacy = timeit.timeit(lambda: evaluate_dynamic_content(tree, answers), number=runs) / runs
+    compiled = timeit.timeit(lambda: evaluator.evaluate(answers), number=runs) / runs
+    print(f"evaluate_dynamic_content: {legacy * 1e6:8.2f} us/submit")
+    print(f"compiled evaluator:       {compiled * 1e6:8.2f} us/submit ({legacy / compiled:.1f}x)")
+
+
+async def baseline_form_stats(responses_collection, form):
+    """
+    The stats endpoint's body at the baseline commit: daily counts, one or two
+    pipelines per question and a count_documents, each scanning the form's
+    responses. Copied from a516386 with only the Motor awaits added.
+    """
+    from datetime import datetime, timedelta
+
+    from bson import ObjectId
+
+    form_id = str(form["_id"])
+    
+    # Get total responses
+    response_count = form["response_count"]
+    
+    # Get response over time data (last 30 days)
+    thirty_days_ago = datetime.now() - timedelta(days=30)
+    daily_responses = await responses_collection.aggregate([
+        {
+            "$match": {
+                "form_id": ObjectId(form_id),
+                "created_at": {"$gte": thirty_days_ago}
+            }
+        },
+        {
+            "$group": {
+                "_id": {
+                    "year": {"$year": "$created_at"},
+                    "month": {"$month": "$created_at"},
+                    "day": {"$dayOfMonth": "$created_at"}
+                },
+                "count": {"$sum": 1}
+            }
+        },
+        {"$sort": {"_id.year": 1, "_id.month": 1, "_id.day": 1}}
+    ]).to_list(None)
+    
+    # Prepare response summary for each question
+    question_stats = {}
+    for question in form["questions"]:
+        question_id = question["id"]
+        question_type = question["type"]
+        
+        if question_type in ["multiple_choice", "checkbox", "dropdown"]:
+            # For choice-based questions, count occurrences of each option
+            option_counts = await responses_collection.aggregate([
+                {"$match": {"form_id": ObjectId(form_id)}},
+                {"$unwind": {"path": f"$answers.{question_id}", "preserveNullAndEmptyArrays": True}},
+                {
+                    "$group": {
+                        "_id": f"$answers.{question_id}",
+                        "count": {"$sum": 1}
+                    }
+                }
+            ]).to_list(None)
+            question_stats[question_id] = {
+                "type": question_type,
+                "title": question["title"],
+                "option_counts": {str(item["_id"]): item["count"] for item in option_counts}
+            }
+        elif question_type in ["rating", "scale", "number"]:
+            # For numeric questions, calculate average and distribution
+            numeric_stats = await responses_collection.aggregate([
+                {"$match": {"form_id": ObjectId(form_id)}},
+                {
+                    "$group": {
+                        "_id": None,
+                        "average": {"$avg": f"$answers.{question_id}"},
+                        "min": {"$min": f"$answers.{question_id}"},
+                        "max": {"$max": f"$answers.{question_id}"},
+                        "count": {"$sum": 1}
+                    }
+                }
+            ]).to_list(None)
+            
+            # Get distribution of values
+            value_distribution = await responses_collection.aggregate([
+                {"$match": {"form_id": ObjectId(form_id)}},
+                {
+                    "$group": {
+                        "_id": f"$answers.{question_id}",
+                        "count": {"$sum": 1}
+                    }
+                },
+                {"$sort": {"_id": 1}}
+            ]).to_list(None)
+            
+            stats_data = {"type": question_type, "title": question["title"]}
+            if numeric_stats:
+                stats_data.update({
+                    "average": numeric_stats[0]["average"],
+                    "min": numeric_stats[0]["min"],
+                    "max": numeric_stats[0]["max"],
+                    "count": numeric_stats[0]["count"],
+                })
+            stats_data["distribution"] = {str(item["_id"]): item["count"] for item in value_distribution}
+            question_stats[question_id] = stats_data
+        elif question_type == "file":
+            # For file uploads, count number of files and get statistics
+            file_stats = await responses_collection.aggregate([
+                {"$match": {"form_id": ObjectId(form_id)}},
+                {"$match": {f"answers.{question_id}.file_id": {"$exists": True}}},
+                {"$count": "file_count"}
+            ]).to_list(None)
+            
+            file_count = file_stats[0]["file_count"] if file_stats else 0
+            
+            # Get sample file metadata (limit to 5)
+            sample_files = await responses_collection.aggregate([
+                {"$match": {"form_id": ObjectId(form_id)}},
+                {"$match": {f"answers.{question_id}.file_id": {"$exists": True}}},
+                {"$project": {"file_metadata": f"$answers.{question_id}"}},
+                {"$limit": 5}
+            ]).to_list(None)
+            
+            question_stats[question_id] = {
+                "type": question_type,
+                "title": question["title"],
+                "file_count": file_count,
+                "sample_files": [item["file_metadata"] for item in sample_files]
+            }
+        else:
+            # For text-based questions, count responses and get sample answers
+            text_stats = await responses_collection.aggregate([
+                {"$match": {"form_id": ObjectId(form_id)}},
+                {"$match": {f"answers.{question_id}": {"$exists": True}}},
+                {"$count": "response_count"}
+            ]).to_list(None)
+            
+            # Get sample answers (limit to 5)
+            sample_answers = await responses_collection.aggregate([
+                {"$match": {"form_id": ObjectId(form_id)}},
+                {"$match": {f"answers.{question_id}": {"$exists": True}}},
+                {"$project": {"answer": f"$answers.{question_id}"}},
+                {"$limit": 5}
+            ]).to_list(None)
+            
+            response_count = text_stats[0]["response_count"] if text_stats else 0
+            question_stats[question_id] = {
+                "type": question_type,
+                "title": question["title"],
+                "response_count": response_count,
+                "sample_answers": [item["answer"] for item in sample_answers]
+            }
+    
+    # Completion rate statistics
+    total_starts = await responses_collection.count_documents({"form_id": ObjectId(form_id)})
+    completion_stats = {
+        "started": total_starts,
+        "completed": response_count,  # Assuming all submitted forms are complete
+        "completion_rate": (response_count / total_starts * 100) if total_starts > 0 else 0.0
+    }
+    
+    return {
+        "response_count": response_count,
+        "daily_responses": [
+            {
+                "date": f"{item['_id']['year']}-{item['_id']['month']:02d}-{item['_id']['day']:02d}",
+                "count": item["count"]
+            }
+            for item in daily_responses
+        ],
+        "question_stats": question_stats,
+        "completion_stats": completion_stats,
+    }
+
+
+async def facet_form_stats(app_module, form):
+    """The exact=true stats path: build_stats_pipeline's single $facet aggregation."""
+    from datetime import datetime, timedelta
+
+    since = datetime.now() - timedelta(days=30)
+    facets = (await app_module.responses_collection.aggregate(
+        app_module.build_stats_pipeline(form, since)
+    ).to_list(None))[0]
+    return app_module.summarize_stats_facets(form, facets)
+
+
+async def time_stats(app_module, args):
+    from datetime import datetime, timedelta
+
+    from bson import ObjectId
+
+    form = build_form(args.questions, file_question=True)
+    form.update(_id=ObjectId(), response_count=args.stats_responses)
+    now = datetime.now()
+    responses = []
+    for _ in range(args.stats_responses):
+        answers = build_answers(form)
+        if random.random() < 0.2:
+            answers["upload"] = {"filename": "a.txt", "content_type": "text/plain", "size": 1, "file_id": str(ObjectId())}
+        responses.append({"form_id": form["_id"], "answers": answers,
+                          "created_at": now - timedelta(minutes=random.randint(0, 60 * 24 * 60))})
+    collection = app_module.responses_collection
+    await collection.insert_many(responses)
+    try:
+        runs = max(1, args.iterations // 400)
+        timings = {}
+        for name, compute in (("baseline", lambda: baseline_form_stats(collection, form)),
+                              ("facet", lambda: facet_form_stats(app_module, form))):
+            await compute()
+            start = time.perf_counter()
+            for _ in range(runs):
+                await compute()
+            timings[name] = (time.perf_counter() - start) / runs
+    finally:
+        await collection.delete_many({"form_id": form["_id"]})
+    print(f"questions: {len(form['questions'])}, responses: {args.stats_responses}, runs: {runs}")
+    print(f"baseline (per-question pipelines): {timings['baseline'] * 1000:10.1f} ms")
+    print(f"facet (one aggregation):           {timings['facet'] * 1000:10.1f} ms ({timings['baseline'] / timings['facet']:.1f}x)")
+
+
+def micro_stats(args):
+    # Times both stats paths on a generated form in MONGODB_URI's database, or in memory with --in-memory
+    if args.in_memory:
+        with in_memory_database() as app_module:
+            asyncio.run(time_stats(app_module, args))
+    else:
+        os.environ.setdefault("SECRET_KEY", "benchmark")
+        import main
+        asyncio.run(time_stats(main, args))
+
+
+async def time_requests(app, path, runs):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path)
+        start = time.perf_counter()
+        for _ in range(runs):
+            await client.get(path)
+        return (time.perf_counter() - start) / runs
+
+
+async def time_asgi_calls(app, runs):
+    scope = {"type": "http", "method": "GET", "path": "/forms/public/abc", "route": None}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / runs
+
+
+def micro_metrics(args):
+    from types import SimpleNamespace
+
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    from main import CommandMetricsListener, MetricsMiddleware, app, request_command_count
+
+    # Middleware cost per request: the same no-op endpoint called bare and wrapped
+    async def endpoint(scope, receive, send):
+        scope["route"] = SimpleNamespace(path="/forms/public/{slug}")
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    runs = args.iterations * 10
+    wrapped = MetricsMiddleware(endpoint)
+    bare = min(asyncio.run(time_asgi_calls(endpoint, runs)) for _ in range(5))
+    instrumented = min(asyncio.run(time_asgi_calls(wrapped, runs)) for _ in range(5))
+    per_request = instrumented - bare
+
+    # Listener cost per MongoDB command: one started/succeeded pair
+    listener = CommandMetricsListener()
+    started = SimpleNamespace(command={"find": "forms"}, command_name="find", request_id=1, database_name="formbuilder")
+    succeeded = SimpleNamespace(command_name="find", request_id=1, duration_micros=800, database_name="formbuilder")
+    token = request_command_count.set([0])
+
+    def command():
+        listener.started(started)
+        listener.succeeded(succeeded)
+
+    per_command = min(timeit.repeat(command, number=runs, repeat=5)) / runs
+    request_command_count.reset(token)
+
+    # /health runs the whole middleware stack with no database work, the cheapest request there is
+    request = min(asyncio.run(time_requests(app, "/health", args.iterations)) for _ in range(3))
+    print(f"middleware:       {per_request * 1e6:8.2f} us/request ({per_request / request * 100:.2f}% of {request * 1e6:.0f} us for /health)")
+    if os.getenv("MONGODB_URI"):
+        from pymongo import MongoClient
+
+        mongo = MongoClient(os.environ["MONGODB_URI"])
+        mongo.admin.command("ping")
+        round_trip = min(timeit.repeat(lambda: mongo.admin.command("ping"), number=200, repeat=3)) / 200
+        mongo.close()
+        print(f"command listener: {per_command * 1e6:8.2f} us/command ({per_command / round_trip * 100:.2f}% of a {round_trip * 1e6:.0f} us ping)")
+    else:
+        print(f"command listener: {per_command * 1e6:8.2f} us/command (set MONGODB_URI to compare with a round trip)")
+
+
+MICROBENCHMARKS = {
+    "dynamic": micro_dynamic,
+    "metrics": micro_metrics,
+    "stats": micro_stats,
+    "validator": micro_validator,
+}
+
+
+async def seed(args):
+    import main as app_module
+
+    manifest = await seed_database(app_module, args.users, args.forms_per_user, args.question_counts, args.responses)
+    with open(args.manifest, "w") as handle:
+        json.dump(manifest, handle, indent=2)
+    print(f"wrote {len(manifest['users'])} users and {len(manifest['forms'])} forms to {args.manifest}")
+
+
+async def run_scenario(client, args, app_module=None):
+    if args.scenario == "cap":
+        context = await setup(client, args.questions, args.max_responses)
+        await run_cap_stress(client, context, args.submitters, args.max_responses)
+        return None
+    if args.scenario == "suite":
+        if app_module is not None:
+            manifest = await seed_database(app_module, args.users, args.forms_per_user, args.question_counts, args.responses)
+        else:
+            with open(args.manifest) as handle:
+                manifest = json.load(handle)
+        mix = parse_mix(args.mix)
+        return await run_suite(client, manifest, args.duration, args.concurrency, mix, args.pages, args.file_size)
+    context = await setup(client, args.questions)
+    if args.scenario == "login-storm":
+        return await run_login_storm(client, context, args.duration, args.concurrency, args.logins)
+    return await run_mixed(client, context, args.duration, args.concurrency, args.stats_ratio)
+
+
+async def main(args):
+    if args.in_memory:
+        # The app runs in this process: the numbers include the load generator's own CPU time
+        with in_memory_database() as app_module:
+            await app_module.app.router.startup()
+            try:
+                transport = httpx.ASGITransport(app=app_module.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+                    summary = await run_scenario(client, args, app_module)
+            finally:
+                await app_module.app.router.shutdown()
+    else:
+        limits = httpx.Limits(max_connections=max(args.concurrency + args.logins, args.submitters))
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+            summary = await run_scenario(client, args)
+    if summary is None:
+        return
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(summary, handle, indent=2)
+    if args.baseline:
+        check_baseline(summary, args.baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Form Builder API load benchmark")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run the load")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent virtual clients")
+    parser.add_argument("--questions", type=int, default=20, help="Questions in the generated form")
+    parser.add_argument("--stats-ratio", type=float, default=0.1, help="Fraction of requests that hit /stats")
+    parser.add_argument("--output", help="Write the summary as JSON to this path")
+    parser.add_argument("--scenario", choices=["mixed", "cap", "login-storm", "scaling", "suite"], default="mixed", help="Load scenario to run")
+    parser.add_argument("--submitters", type=int, default=500, help="Parallel submitters for the cap scenario")
+    parser.add_argument("--max-responses", type=int, default=100, help="Form cap for the cap scenario")
+    parser.add_argument("--logins", type=int, default=20, help="Concurrent login loops for the login-storm scenario")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts for the scaling scenario")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two saved summaries")
+    parser.add_argument("--micro", choices=sorted(MICROBENCHMARKS), help="Run an in-process microbenchmark")
+    parser.add_argument("--iterations", type=int, default=2000, help="Iterations per microbenchmark timing")
+    parser.add_argument("--seed", action="store_true", help="Seed MONGODB_URI with a data set for the suite scenario")
+    parser.add_argument("--manifest", default="benchmark-seed.json", help="Seeded users and forms, written by --seed")
+    parser.add_argument("--users", type=int, default=20, help="Users to seed")
+    parser.add_argument("--forms-per-user", type=int, default=5, help="Forms to seed per user")
+    parser.add_argument("--question-counts", type=int, nargs="+", default=[5, 20, 50, 200], help="Question counts the seeded forms cycle through")
+    parser.add_argument("--responses", type=int, default=1_000_000, help="Responses to seed across all forms")
+    parser.add_argument("--stats-responses", type=int, default=5000, help="Responses generated for the stats microbenchmark")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Suite operation weights, e.g. view=50,submit=25,list=10")
+    parser.add_argument("--pages", type=int, default=3, help="Response pages each suite listing follows")
+    parser.add_argument("--file-size", type=int, default=64 * 1024, help="Bytes per file in suite file submits")
+    parser.add_argument("--in-memory", action="store_true", help="Run the app in-process on mongomock-motor instead of --base-url")
+    parser.add_argument("--baseline", help="Fail when results regress beyond --tolerance against this saved summary")
+    parser.add_argument("--tolerance", type=float, default=20.0, help="Allowed p99 and throughput regression, in percent")
+    parser.add_argument("--random-seed", type=int, help="Seed Python's RNG so data and request mixes repeat exactly")
+    args = parser.parse_args()
+
+    if args.random_seed is not None:
+        random.seed(args.random_seed)
+    if args.compare:
+        compare(*args.compare)
+    elif args.micro:
+        MICROBENCHMARKS[args.micro](args)
+    elif args.seed:
+        asyncio.run(seed(args))
+    elif args.scenario == "scaling":
+        run_scaling(args)
+    else:
+        asyncio.run(main(args))
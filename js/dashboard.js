@@ -13,20 +13,17 @@ document.addEventListener("DOMContentLoaded", async function() {
     }
     
     try {
-        // Fetch dashboard summary data
-        const [forms, responses] = await Promise.all([
-            fetchForms(token),
-            fetchResponses(token)
-        ]);
+        // Fetch dashboard summary data (forms, counts and recent responses in one request)
+        const summary = await fetchDashboardSummary(token);
         
         // Update dashboard summary
-        updateDashboardSummary(forms, responses);
+        updateDashboardSummary(summary);
         
         // Update recent forms list
-        updateRecentForms(forms);
+        updateRecentForms(summary.forms);
         
         // Update recent responses list
-        updateRecentResponses(responses);
+        updateRecentResponses(summary.recent_responses);
         
     } catch (error) {
         console.error("Error loading dashboard data:", error);
@@ -110,69 +107,39 @@ function initUserDropdown() {
     });
 }
 
-async function fetchForms(token) {
-    const response = await fetch(`${API_URL}/forms`, {
+async function fetchDashboardSummary(token) {
+    const response = await fetch(`${API_URL}/dashboard/summary`, {
         headers: {
             "Authorization": `Bearer ${token}`
         }
     });
     
     if (!response.ok) {
-        throw new Error("Failed to fetch forms");
+        throw new Error("Failed to fetch dashboard summary");
     }
     
     return await response.json();
 }
 
-async function fetchResponses(token) {
-
-    let allResponses = [];
-    
-    const forms = await fetchForms(token);
-    
-    for (const form of forms.slice(0, 5)) { // Limit to first 5 forms for performance
-        const response = await fetch(`${API_URL}/forms/${form._id}/responses`, {
-            headers: {
-                "Authorization": `Bearer ${token}`
-            }
-        });
-        
-        if (response.ok) {
-            const formResponses = await response.json();
-            formResponses.forEach(r => {
-                r.formTitle = form.title; // Add form title to each response
-                r.formId = form._id;
-            });
-            allResponses = allResponses.concat(formResponses);
-        }
-    }
-    
-    // Sort by date, newest first
-    allResponses.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
-    
-    return allResponses;
-}
-
-function updateDashboardSummary(forms, responses) {
+function updateDashboardSummary(summary) {
     const totalForms = document.getElementById("total-forms");
     const totalResponses = document.getElementById("total-responses");
     const responseRate = document.getElementById("response-rate");
     const activeForms = document.getElementById("active-forms");
     
-    if (totalForms) totalForms.textContent = forms.length;
-    if (totalResponses) totalResponses.textContent = responses.length;
+    if (totalForms) totalForms.textContent = summary.total_forms;
+    if (totalResponses) totalResponses.textContent = summary.total_responses;
     
     // Calculate response rate
-    const totalPossibleResponses = forms.reduce((sum, form) => sum + (form.max_responses || 100), 0);
+    const totalPossibleResponses = summary.forms.reduce((sum, form) => sum + (form.max_responses || 100), 0);
     const rate = totalPossibleResponses > 0 
-        ? Math.round((responses.length / totalPossibleResponses) * 100) 
+        ? Math.round((summary.total_responses / totalPossibleResponses) * 100) 
         : 0;
     
     if (responseRate) responseRate.textContent = `${rate}%`;
     
     // Count active forms
-    const activeCount = forms.filter(form => form.is_active).length;
-    if (activeForms) activeForms.textContent = activeCount;
+    if (activeForms) activeForms.textContent = summary.active_forms;
 }
 
 function updateRecentForms(forms) {
@@ -188,13 +155,14 @@ function updateRecentForms(forms) {
     // Clear empty state
     recentFormsList.innerHTML = '';
     
-    // Show up to 5 most recent forms
+    // Show up to 5 most recent forms (the summary lists newest first)
     forms.slice(0, 5).forEach(form => {
         const formElement = document.createElement('div');
         formElement.className = 'recent-form-item';
         
         const formDate = new Date(form.created_at);
         const formattedDate = formDate.toLocaleDateString();
+        const weekCount = form.daily_responses.reduce((sum, count) => sum + count, 0);
         
         formElement.innerHTML = `
             <div class="recent-form-header">
@@ -205,7 +173,7 @@ function updateRecentForms(forms) {
             </div>
             <div class="recent-form-meta">
                 <span class="recent-form-date">Created on ${formattedDate}</span>
-                <span class="recent-form-responses">${form.response_count} responses</span>
+                <span class="recent-form-responses">${form.response_count} responses (${weekCount} this week)</span>
             </div>
             <div class="recent-form-actions">
                 <a href="edit-form.html?id=${form._id}" class="btn btn-small btn-outline">Edit</a>
@@ -247,14 +215,14 @@ function updateRecentResponses(responses) {
         
         responseElement.innerHTML = `
             <div class="recent-response-header">
-                <h3 class="recent-response-title">${response.formTitle}</h3>
+                <h3 class="recent-response-title">${response.form_title}</h3>
                 <span class="recent-response-date">${formattedDate} at ${formattedTime}</span>
             </div>
             <div class="recent-response-preview">
                 <p>${displayAnswer}</p>
             </div>
             <div class="recent-response-actions">
-                <a href="response-details.html?formId=${response.formId}&responseId=${response._id}" class="btn btn-small btn-outline">View Details</a>
+                <a href="response-details.html?formId=${response.form_id}&responseId=${response._id}" class="btn btn-small btn-outline">View Details</a>
             </div>
         `;
         
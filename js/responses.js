@@ -1894,7 +1894,7 @@ function closeAllModals() {
     });
 }
 
-function exportResponsesToCSV() {
+async function exportResponsesToCSV() {
     if (!window.responsesState.form || !window.responsesState.responses.length) {
         showNotification("No responses to export", "warning");
         return;
@@ -1903,60 +1903,26 @@ function exportResponsesToCSV() {
     try {
         showLoadingIndicator();
         
-        // Get all responses (no pagination for export)
-        const responses = window.responsesState.responses;
+        const token = localStorage.getItem("token");
         const form = window.responsesState.form;
         
-        // Create CSV header row
-        let csvContent = "data:text/csv;charset=utf-8,";
-        
-        // Add basic headers
-        let headers = ["Response ID", "Submission Date"];
-        
-        // Add a column for each question
-        form.questions.forEach(question => {
-            headers.push(question.title.replace(/,/g, " ")); // Remove commas from headers
+        // The server streams every response, not just the ones loaded on this page
+        const response = await fetch(`${API_URL}/forms/${form._id}/export?format=csv`, {
+            headers: {
+                "Authorization": `Bearer ${token}`
+            }
         });
         
-        csvContent += headers.join(",") + "\r\n";
+        if (!response.ok) {
+            throw new Error("Failed to export responses");
+        }
         
-        // Add each response as a row
-        responses.forEach(response => {
-            const date = new Date(response.created_at).toLocaleString();
-            let row = [response._id, date];
-            
-            // Add answer for each question
-            form.questions.forEach(question => {
-                const answer = response.answers[question.id];
-                let formattedAnswer = "";
-                
-                if (answer === undefined || answer === null) {
-                    formattedAnswer = "";
-                } else if (Array.isArray(answer)) {
-                    formattedAnswer = answer.join("; ").replace(/,/g, ";"); // Replace commas with semicolons
-                } else if (typeof answer === 'object') {
-                    // Handle file uploads
-                    if (answer.file_id) {
-                        formattedAnswer = answer.filename || "File uploaded";
-                    } else {
-                        formattedAnswer = JSON.stringify(answer).replace(/,/g, ";");
-                    }
-                } else {
-                    formattedAnswer = String(answer).replace(/,/g, " "); // Remove commas from answers
-                }
-                
-                // Wrap in quotes to handle multiline text
-                formattedAnswer = `"${formattedAnswer}"`;
-                row.push(formattedAnswer);
-            });
-            
-            csvContent += row.join(",") + "\r\n";
-        });
+        const blob = await response.blob();
+        const url = URL.createObjectURL(blob);
         
         // Create download link
-        const encodedUri = encodeURI(csvContent);
         const link = document.createElement("a");
-        link.setAttribute("href", encodedUri);
+        link.setAttribute("href", url);
         link.setAttribute("download", `${form.title}_responses_${new Date().toLocaleDateString().replace(/\//g, '-')}.csv`);
         document.body.appendChild(link);
         
@@ -1965,6 +1931,7 @@ function exportResponsesToCSV() {
         
         // Clean up
         document.body.removeChild(link);
+        URL.revokeObjectURL(url);
         hideLoadingIndicator();
         showNotification("CSV file exported successfully", "success");
         
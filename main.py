@@ -1,18 +1,22 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Request, Form, File, UploadFile, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, status, Request, Form, File, UploadFile, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from typing import List, Optional, Dict, Any, Union, Annotated, ClassVar
+from typing import List, Optional, Dict, Any, Union, Annotated, ClassVar, Callable, Tuple
 from pydantic import BaseModel, EmailStr, Field, validator, ConfigDict
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridIn, AsyncIOMotorGridOut
+from pymongo import ASCENDING, TEXT, IndexModel, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from bson import ObjectId
 import random
 import string
 import uvicorn
 import os
+import sys
 from dotenv import load_dotenv
 import time
 import asyncio
@@ -23,9 +27,24 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import logging
 from enum import Enum
-import gridfs
 import io
+import csv
+import zlib
+import math
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import base64
+import hashlib
+import json
+import re
+from collections import OrderedDict, Counter
+from multipart.multipart import MultipartParser, parse_options_header
+from multipart.exceptions import MultipartParseError
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import tempfile
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter as MetricCounter, Histogram, generate_latest, multiprocess
 
 # Load environment variables
 load_dotenv()
@@ -45,10 +64,38 @@ app = FastAPI(
 )
 
 # Rate limiting setup
-limiter = Limiter(key_func=get_remote_address)
+# Counters live in RATE_LIMIT_STORAGE_URI so every worker shares them (e.g. redis://host:6379);
+# the default memory:// keeps them in-process, for tests and single-worker runs
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "sliding-window-counter")
+limiter = Limiter(
+    key_func=get_remote_address,
+    enabled=os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true",
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    strategy=RATE_LIMIT_STRATEGY,
+    key_prefix="formbuilder",
+    # If the shared store is unreachable, keep limiting per process instead of failing requests
+    in_memory_fallback_enabled=True,
+    swallow_errors=True,
+)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+# Public submissions are limited per visitor per form and per form overall,
+# so one busy form cannot use up the quota of the others
+FORM_SUBMIT_RATE_LIMIT = os.getenv("FORM_SUBMIT_RATE_LIMIT", "30/minute")
+FORM_SUBMIT_TOTAL_RATE_LIMIT = os.getenv("FORM_SUBMIT_TOTAL_RATE_LIMIT", "1200/minute")
+
+def form_visitor_key(request: Request) -> str:
+    return f"{request.path_params.get('slug', '')}:{get_remote_address(request)}"
+
+def form_key(request: Request) -> str:
+    return request.path_params.get("slug", "")
+
+# Shared scopes so JSON and multipart submissions to a form draw on the same quotas
+form_submit_limit = limiter.shared_limit(FORM_SUBMIT_RATE_LIMIT, scope="form-submit", key_func=form_visitor_key)
+form_submit_total_limit = limiter.shared_limit(FORM_SUBMIT_TOTAL_RATE_LIMIT, scope="form-submit-total", key_func=form_key)
+
 # CORS middleware setup
 app.add_middleware(
     CORSMiddleware,
@@ -56,20 +103,180 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Content-Disposition"],
 )
 
 # Security setup
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Raising BCRYPT_ROUNDS upgrades existing hashes the next time each user logs in
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-# MongoDB setup
-client = MongoClient(os.getenv("MONGODB_URI"))
+# Metrics, exposed at /metrics. Under `main.py serve` each worker writes to PROMETHEUS_MULTIPROC_DIR
+# and a scrape aggregates all of them.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # When set, /metrics requires "Authorization: Bearer <token>"
+MONGODB_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ["method", "route"]
+)
+http_requests_total = MetricCounter(
+    "http_requests_total", "HTTP requests by route template and status code", ["method", "route", "status"]
+)
+mongodb_command_duration = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command round-trip latency", ["command", "collection"],
+    buckets=MONGODB_LATENCY_BUCKETS
+)
+mongodb_commands_per_request = Histogram(
+    "mongodb_commands_per_request", "MongoDB round trips made while serving one request", ["route"],
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 64)
+)
+gridfs_bytes_written = MetricCounter("gridfs_bytes_written_total", "Bytes of uploaded files stored in GridFS")
+gridfs_bytes_read = MetricCounter("gridfs_bytes_read_total", "Bytes of files served from GridFS")
+
+# Round trips of the request being served; Motor copies the context into its executor threads
+request_command_count: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar(
+    "request_command_count", default=None
+)
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Times every MongoDB command by name and collection and counts it against the current request."""
+
+    def __init__(self):
+        self._collections: Dict[int, str] = {}
+        self._histograms: Dict[tuple, Any] = {}
+
+    def started(self, event):
+        command = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            command = event.command.get("collection")
+        self._collections[event.request_id] = command if isinstance(command, str) else event.database_name
+        counter = request_command_count.get()
+        if counter is not None:
+            counter[0] += 1
+
+    def succeeded(self, event):
+        self._observe(event)
+
+    def failed(self, event):
+        self._observe(event)
+
+    def _observe(self, event):
+        collection = self._collections.pop(event.request_id, event.database_name)
+        # Labelled children are cached; .labels() takes a lock and builds a key on every call
+        histogram = self._histograms.get((event.command_name, collection))
+        if histogram is None:
+            histogram = self._histograms[(event.command_name, collection)] = mongodb_command_duration.labels(
+                event.command_name, collection
+            )
+        histogram.observe(event.duration_micros / 1e6)
+
+class MetricsMiddleware:
+    """
+    Record latency, status and MongoDB round trips for every HTTP request.
+
+    Requests are labelled by route template (/forms/{form_id}, not the raw
+    path) so label cardinality stays bounded; anything that matched no
+    route is counted as "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_metrics: Dict[tuple, tuple] = {}
+        self._request_counters: Dict[tuple, Any] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+        counter = [0]
+        token = request_command_count.set(counter)
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_command_count.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            key = (scope["method"], route_path)
+            route_metrics = self._route_metrics.get(key)
+            if route_metrics is None:
+                route_metrics = self._route_metrics[key] = (
+                    http_request_duration.labels(*key), mongodb_commands_per_request.labels(route_path)
+                )
+            route_metrics[0].observe(elapsed)
+            route_metrics[1].observe(counter[0])
+            requests_counter = self._request_counters.get((key, status_code))
+            if requests_counter is None:
+                requests_counter = self._request_counters[(key, status_code)] = http_requests_total.labels(
+                    *key, str(status_code)
+                )
+            requests_counter.inc()
+
+app.add_middleware(MetricsMiddleware)
+
+# MongoDB setup (async driver so queries never block the event loop)
+client = AsyncIOMotorClient(
+    os.getenv("MONGODB_URI"),
+    maxPoolSize=int(os.getenv("MONGODB_MAX_POOL_SIZE", "100")),
+    minPoolSize=int(os.getenv("MONGODB_MIN_POOL_SIZE", "0")),
+    maxIdleTimeMS=int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000")),
+    waitQueueTimeoutMS=int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "10000")),
+    event_listeners=[CommandMetricsListener()],
+)
+# Connections each worker opens at startup, so its first requests skip the connection handshakes
+MONGODB_WARM_CONNECTIONS = int(os.getenv("MONGODB_WARM_CONNECTIONS", "4"))
+
+# Seconds a worker waits for in-flight requests after SIGTERM before it shuts down
+GRACEFUL_SHUTDOWN_TIMEOUT = int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30"))
 db = client.formbuilder
 users_collection = db.users
 forms_collection = db.forms
 responses_collection = db.responses
 templates_collection = db.templates
-fs = gridfs.GridFS(db)  # Setup GridFS for file storage
+stats_collection = db.form_stats  # Incrementally maintained stats rollups, one per form
+deletions_collection = db.form_deletions  # Progress of background form deletions, one per deleted form
+
+# Indexes backing every query pattern in this module, created at startup
+ENSURE_INDEXES = os.getenv("ENSURE_INDEXES", "true").lower() == "true"
+REQUIRED_INDEXES = {
+    "users": [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "forms": [
+        # Unique slug also serves the public {"slug", "is_active"} lookups
+        IndexModel([("slug", ASCENDING)], name="slug_unique", unique=True),
+        # Serves the owner's form list in keyset (created_at, _id) order
+        IndexModel([("creator_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+                   name="creator_id_created_at_id"),
+    ],
+    "responses": [
+        # Serves date filters and keyset pages; per-question answer filters
+        # (e.g. answers.<id>.file_id) always run after this form_id match
+        IndexModel([("form_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+                   name="form_id_created_at_id"),
+        # Full-text search over text/paragraph answers, always scoped to one form
+        IndexModel([("form_id", ASCENDING), ("search_text", TEXT)],
+                   name="form_id_search_text", default_language="none"),
+    ],
+    "templates": [
+        IndexModel([("category", ASCENDING)], name="category"),
+    ],
+    "form_deletions": [
+        IndexModel([("status", ASCENDING)], name="status"),
+        # Finished jobs stay readable for a week
+        IndexModel([("finished_at", ASCENDING)], name="finished_at_ttl", expireAfterSeconds=7 * 86400),
+    ],
+}
 
 # Token settings
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -79,6 +286,32 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
 # Maximum file size (5MB)
 MAX_FILE_SIZE = 5 * 1024 * 1024
 
+# GridFS chunk size for streamed uploads
+GRIDFS_CHUNK_SIZE = 255 * 1024
+MAX_FORM_FIELD_SIZE = 1024 * 1024  # Non-file multipart fields are held in memory up to this size
+
+# Public form cache settings
+FORM_CACHE_SIZE = int(os.getenv("FORM_CACHE_SIZE", "1024"))
+FORM_CACHE_TTL = float(os.getenv("FORM_CACHE_TTL", "60"))  # seconds
+
+# bcrypt runs on its own thread pool; hashing requests beyond workers + queue limit get a 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+
+# Verified-principal cache; a revocation reaches other workers once their entry expires
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "30"))  # seconds
+
+# Per-user dashboard summary cache
+DASHBOARD_CACHE_SIZE = int(os.getenv("DASHBOARD_CACHE_SIZE", "10000"))
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "5"))  # seconds
+
+# Write-behind submission queue: "off", "flush" (ack after the batch is written) or "enqueue" (ack on enqueue)
+SUBMISSION_QUEUE_MODE = os.getenv("SUBMISSION_QUEUE_MODE", "off")
+SUBMISSION_QUEUE_SIZE = int(os.getenv("SUBMISSION_QUEUE_SIZE", "10000"))
+SUBMISSION_BATCH_SIZE = int(os.getenv("SUBMISSION_BATCH_SIZE", "500"))
+SUBMISSION_FLUSH_INTERVAL = float(os.getenv("SUBMISSION_FLUSH_INTERVAL", "0.05"))  # seconds
+
 # Question types enum
 class QuestionType(str, Enum):
     TEXT = "text"
@@ -140,6 +373,8 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     username: Optional[str] = None
+    user_id: Optional[str] = None
+    token_version: int = 0
 
 class Option(BaseModel):
     value: str
@@ -316,15 +551,110 @@ class Template(BaseModel):
     )
 
 # Helper functions
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+password_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+password_hash_slots = asyncio.Semaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def run_password_hashing(function, *args):
+    """
+    Run a bcrypt call on the password hashing pool.
+    
+    bcrypt takes hundreds of milliseconds by design and releases the GIL,
+    so it runs off the event loop and submissions are not held up while
+    it works. Once the pool and its queue are full, callers are turned
+    away rather than left to pile up.
+    """
+    if password_hash_slots.locked():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in requests in progress, please try again",
+            headers={"Retry-After": "1"}
+        )
+    async with password_hash_slots:
+        return await asyncio.get_running_loop().run_in_executor(password_hash_executor, function, *args)
+
+async def verify_and_update_password(plain_password, hashed_password):
+    # Returns (valid, new_hash); new_hash is set when the stored hash uses outdated settings
+    return await run_password_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash(password):
+    return await run_password_hashing(pwd_context.hash, password)
 
 def generate_slug(length=6):
     return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
 
+SLUG_ATTEMPTS = 5  # Random slugs drawn before a collision is reported as a server error
+
+def slug_taken_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Custom URL already in use. Please choose another."
+    )
+
+async def insert_form(form_dict: dict, custom_slug: Optional[str] = None):
+    """
+    Insert a new form under custom_slug, or under a fresh random slug.
+    
+    The unique slug index is the authority: a taken custom slug is a 400 and
+    a colliding random slug is simply redrawn.
+    """
+    for attempt in range(SLUG_ATTEMPTS):
+        form_dict["slug"] = custom_slug or generate_slug(8)
+        try:
+            return await forms_collection.insert_one(form_dict)
+        except DuplicateKeyError:
+            if custom_slug:
+                raise slug_taken_error()
+            if attempt == SLUG_ATTEMPTS - 1:
+                raise
+
+# Keyset pagination: pages are ordered by (created_at, _id) and continue after an opaque cursor
+PAGE_SORT = [("created_at", ASCENDING), ("_id", ASCENDING)]
+
+def encode_page_cursor(document: dict) -> str:
+    position = {"created_at": document["created_at"].isoformat(), "id": str(document["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+def page_cursor_filter(cursor: str) -> dict:
+    """Translate a cursor from encode_page_cursor() into a filter for the documents after it."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = datetime.fromisoformat(position["created_at"])
+        last_id = ObjectId(position["id"])
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+    return {"$or": [
+        {"created_at": {"$gt": created_at}},
+        {"created_at": created_at, "_id": {"$gt": last_id}},
+    ]}
+
+async def fetch_page(
+    collection,
+    query: dict,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    response: Response,
+    projection: Optional[dict] = None
+) -> List[dict]:
+    """
+    Fetch one page in (created_at, _id) order.
+    
+    With a cursor the page starts right after it, so deep pages cost the
+    same as the first; otherwise skip/limit is applied for older clients.
+    When the page is full, the cursor for the next one is sent in the
+    X-Next-Cursor header.
+    """
+    if cursor:
+        documents = await collection.find({**query, **page_cursor_filter(cursor)}, projection).sort(PAGE_SORT).limit(limit).to_list(None)
+    else:
+        documents = await collection.find(query, projection).sort(PAGE_SORT).skip(skip).limit(limit).to_list(None)
+    if limit > 0 and len(documents) == limit:
+        response.headers["X-Next-Cursor"] = encode_page_cursor(documents[-1])
+    return documents
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -335,6 +665,222 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# Per-form answer validation
+NUMERIC_QUESTION_TYPES = {QuestionType.RATING, QuestionType.SCALE, QuestionType.NUMBER}
+CHOICE_QUESTION_TYPES = {QuestionType.MULTIPLE_CHOICE, QuestionType.DROPDOWN}
+SEARCHABLE_QUESTION_TYPES = {QuestionType.TEXT, QuestionType.PARAGRAPH}
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def is_blank(value):
+    return value is None or value == "" or value == []
+
+def compile_question_pattern(question: dict):
+    """Compile a question's validation pattern, or return None when it has none; raises re.error for a bad one."""
+    validation = question.get("validation") or {}
+    return re.compile(validation["pattern"]) if validation.get("pattern") else None
+
+def validate_question_patterns(questions: List["Question"]):
+    """Reject a form whose validation patterns do not compile, before it is stored."""
+    for question in questions:
+        try:
+            compile_question_pattern(question.model_dump())
+        except re.error as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Question '{question.title}' has an invalid validation pattern: {e}"
+            )
+
+class AnswerValidator:
+    """
+    Validates submitted answers against a form's questions.
+    
+    Built once per form: questions are indexed by id and each one gets a
+    type-specific check derived from its QuestionType, min_value/max_value,
+    options and validation settings. validate() looks every answer up in
+    O(1), so a submit costs O(answers + required questions).
+    """
+    def __init__(self, questions: List[dict]):
+        self.questions = {question["id"]: question for question in questions}
+        self.required = [question for question in questions if question.get("required")]
+        self.checks = {question["id"]: self.build_check(question) for question in questions}
+
+    @staticmethod
+    def build_check(question: dict):
+        title = question["title"]
+        question_type = question["type"]
+        options = question.get("options") or []
+        allowed = frozenset(option["value"] for option in options) if options else None
+        validation = question.get("validation") or {}
+
+        if question_type in NUMERIC_QUESTION_TYPES:
+            min_value = question.get("min_value")
+            max_value = question.get("max_value")
+
+            def check(value):
+                if not is_number(value):
+                    return f"Question '{title}' expects a number"
+                if min_value is not None and value < min_value:
+                    return f"Question '{title}' must be at least {min_value:g}"
+                if max_value is not None and value > max_value:
+                    return f"Question '{title}' must be at most {max_value:g}"
+                return None
+        elif question_type in CHOICE_QUESTION_TYPES:
+            def check(value):
+                if not isinstance(value, str):
+                    return f"Question '{title}' expects a single option"
+                if allowed is not None and value not in allowed:
+                    return f"Question '{title}' has an invalid option: {value}"
+                return None
+        elif question_type == QuestionType.CHECKBOX:
+            def check(value):
+                if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                    return f"Question '{title}' expects a list of options"
+                if allowed is not None:
+                    for item in value:
+                        if item not in allowed:
+                            return f"Question '{title}' has an invalid option: {item}"
+                return None
+        elif question_type == QuestionType.FILE:
+            def check(value):
+                if isinstance(value, list) and question.get("multiple"):
+                    value_ok = all(isinstance(item, dict) for item in value)
+                else:
+                    value_ok = isinstance(value, dict)
+                return None if value_ok else f"Question '{title}' expects a file"
+        else:
+            min_length = validation.get("min_length")
+            max_length = validation.get("max_length")
+            try:
+                pattern = compile_question_pattern(question)
+            except re.error as e:
+                # Forms stored before patterns were checked on save: skip the pattern instead of failing every submit
+                logger.warning(f"Ignoring invalid pattern on question {question['id']}: {str(e)}")
+                pattern = None
+            is_email = question_type == QuestionType.EMAIL
+
+            def check(value):
+                if not isinstance(value, str):
+                    return f"Question '{title}' expects text"
+                if min_length is not None and len(value) < min_length:
+                    return f"Question '{title}' must be at least {min_length} characters"
+                if max_length is not None and len(value) > max_length:
+                    return f"Question '{title}' must be at most {max_length} characters"
+                if is_email and not EMAIL_PATTERN.match(value):
+                    return f"Question '{title}' expects a valid email address"
+                if pattern is not None and not pattern.search(value):
+                    return f"Question '{title}' has an invalid format"
+                return None
+        return check
+
+    def validate(self, answers: Dict[str, Any]) -> Optional[str]:
+        """Return the first validation error for the answers, or None if they are valid."""
+        checks = self.checks
+        for question_id, value in answers.items():
+            check = checks.get(question_id)
+            # Unknown question ids and blank answers are stored as submitted
+            if check is None or is_blank(value):
+                continue
+            error = check(value)
+            if error:
+                return error
+        for question in self.required:
+            if is_blank(answers.get(question["id"])):
+                return f"Question '{question['title']}' is required"
+        return None
+
+# Compiled public forms, cached by slug so hot forms are served without Mongo
+class CompiledForm:
+    """
+    Read-only view of an active form prepared once for the public endpoints.
+    
+    Holds the raw form document, its questions indexed by id, the answer
+    validator, the file question ids, the compiled end screen dynamic content
+    and the serialized public JSON body. The body is
+    rendered once per revision (updated_at) and reused by later compilations
+    of the same revision, so its ETag stays stable.
+    """
+    def __init__(self, form: dict, previous: Optional["CompiledForm"] = None):
+        self.form = form
+        self.id = form["_id"]
+        self.slug = form["slug"]
+        self.revision = (form["_id"], form["updated_at"])
+        self.validator = AnswerValidator(form["questions"])
+        self.questions = self.validator.questions
+        self.file_question_ids = [q["id"] for q in form["questions"] if q["type"] == QuestionType.FILE]
+        self.search_question_ids = [q["id"] for q in form["questions"] if q["type"] in SEARCHABLE_QUESTION_TYPES]
+        self.dynamic_content = DynamicContentEvaluator(form["end_screen"].get("dynamic_content"))
+        if previous is not None and previous.revision == self.revision:
+            self.body = previous.body
+            self.etag = previous.etag
+        else:
+            # response_count is left out so the body only changes with the revision
+            self.body = Form(**form).model_dump_json(by_alias=True, exclude={"response_count"}).encode()
+            self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+class TTLCache:
+    """Bounded LRU cache with a per-entry TTL; key(entry) gives the key an entry is stored under."""
+    def __init__(self, max_size: int, ttl: float, key: Callable[[Any], Any]):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.key = key
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()  # key -> (stored_at, entry)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        stored = self._entries.get(key)
+        if stored is None or time.monotonic() - stored[0] > self.ttl:
+            # Expired entries stay until replaced so peek() can still hand them out
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return stored[1]
+
+    def peek(self, key: Any) -> Optional[Any]:
+        """The entry under key even if it has expired, without counting a hit or miss."""
+        stored = self._entries.get(key)
+        return stored[1] if stored is not None else None
+
+    def put(self, entry: Any):
+        key = self.key(entry)
+        self._entries[key] = (time.monotonic(), entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *keys: Any):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+# Compiled forms keyed by slug
+form_cache = TTLCache(FORM_CACHE_SIZE, FORM_CACHE_TTL, key=lambda compiled: compiled.slug)
+
+async def get_compiled_form(slug: str) -> Optional[CompiledForm]:
+    compiled = form_cache.get(slug)
+    if compiled is None:
+        form = await forms_collection.find_one({"slug": slug, "is_active": True})
+        if not form:
+            return None
+        compiled = CompiledForm(form, previous=form_cache.peek(slug))
+        form_cache.put(compiled)
+    return compiled
+
 # Enhanced function to recursively evaluate nested dynamic content conditions
 def evaluate_dynamic_content(dynamic_content, answers):
     """
@@ -419,8 +965,580 @@ def evaluate_dynamic_content(dynamic_content, answers):
     
     return None
 
+class DynamicContentEvaluator:
+    """
+    Compiled form of an end screen's dynamic_content tree.
+    
+    The tree is parsed once per form revision: "operator:value" keys are split,
+    numeric thresholds converted to floats and "equals" branches put in hash
+    tables. evaluate() returns exactly what evaluate_dynamic_content() returns
+    for the same tree and answers, including branch order and fallbacks.
+    """
+    CONTENT_KEYS = ("title", "description", "custom_html")
+    NUMERIC_OPERATORS = ("greater_than", "less_than")
+    TEXT_OPERATORS = ("not_equals", "contains", "not_contains")
+
+    def __init__(self, dynamic_content):
+        self.root = self.compile_node(dynamic_content)
+
+    @classmethod
+    def compile_node(cls, node):
+        if not node or not isinstance(node, dict):
+            return None
+        
+        # Direct "question_id:value" keys: question_id -> {value: (position, content)}
+        direct = {}
+        for position, (key, content) in enumerate(node.items()):
+            if ":" in key and key != "default":
+                question_id, expected = key.split(":", 1)
+                direct.setdefault(question_id, {})[expected] = (position, content)
+        
+        # question_id -> conditions, each question split into equals lookups and ordered other branches
+        questions = []
+        for question_id, conditions in node.items():
+            if question_id in cls.CONTENT_KEYS or ":" in question_id or not isinstance(conditions, dict):
+                continue
+            equals = {}
+            branches = []
+            for position, (condition_key, next_level) in enumerate(conditions.items()):
+                if ":" not in condition_key:
+                    continue
+                operator, expected = condition_key.split(":", 1)
+                target = cls.compile_target(next_level)
+                if operator == "equals":
+                    equals[expected] = (position, target)
+                elif operator in cls.TEXT_OPERATORS:
+                    branches.append((position, operator, expected, target))
+                elif operator in cls.NUMERIC_OPERATORS and expected.replace('.', '', 1).isdigit():
+                    try:
+                        threshold = float(expected)
+                    except ValueError:
+                        threshold = expected  # float() raises again at evaluation, as the original does
+                    branches.append((position, operator, threshold, target))
+            questions.append((question_id, equals, branches))
+        
+        return direct, questions, "default" in node, node.get("default")
+
+    @classmethod
+    def compile_target(cls, next_level):
+        # (is_subtree, value): terminal content is returned as is, other dicts are evaluated
+        if isinstance(next_level, dict) and not any(k in next_level for k in cls.CONTENT_KEYS):
+            return True, cls.compile_node(next_level)
+        return False, next_level
+
+    def evaluate(self, answers: Dict[str, Any]):
+        return self.evaluate_node(self.root, answers, {})
+
+    def evaluate_node(self, node, answers, answer_strs):
+        if node is None:
+            return None
+        direct, questions, has_default, default = node
+        
+        # Earliest matching direct key wins
+        best = None
+        for question_id, values in direct.items():
+            if question_id in answers:
+                match = values.get(self.answer_str(question_id, answers, answer_strs))
+                if match is not None and (best is None or match[0] < best[0]):
+                    best = match
+        if best is not None:
+            return best[1]
+        
+        for question_id, equals, branches in questions:
+            if question_id not in answers:
+                continue
+            answer = answers[question_id]
+            answer_str = self.answer_str(question_id, answers, answer_strs)
+            equals_match = equals.get(answer_str)
+            
+            for position, operator, expected, target in branches:
+                if equals_match is not None and equals_match[0] < position:
+                    result = self.follow(equals_match[1], answers, answer_strs)
+                    if result is not None:
+                        return result[0]
+                    equals_match = None
+                
+                if operator == "not_equals":
+                    matches = answer_str != expected
+                elif operator == "contains":
+                    matches = expected in answer_str
+                elif operator == "not_contains":
+                    matches = expected not in answer_str
+                elif answer_str.replace('.', '', 1).isdigit():
+                    value = float(answer)
+                    threshold = expected if isinstance(expected, float) else float(expected)
+                    matches = value > threshold if operator == "greater_than" else value < threshold
+                else:
+                    matches = False
+                
+                if matches:
+                    result = self.follow(target, answers, answer_strs)
+                    if result is not None:
+                        return result[0]
+            
+            if equals_match is not None:
+                result = self.follow(equals_match[1], answers, answer_strs)
+                if result is not None:
+                    return result[0]
+        
+        if has_default:
+            return default
+        return None
+
+    def follow(self, target, answers, answer_strs):
+        # Returns a 1-tuple holding the result when the branch decides the outcome
+        is_subtree, value = target
+        if not is_subtree:
+            return (value,)
+        deeper_result = self.evaluate_node(value, answers, answer_strs)
+        return (deeper_result,) if deeper_result else None
+
+    @staticmethod
+    def answer_str(question_id, answers, answer_strs):
+        answer_str = answer_strs.get(question_id)
+        if answer_str is None:
+            answer_str = answer_strs[question_id] = str(answers[question_id])
+        return answer_str
+
+
+async def store_base64_file(answer: dict) -> dict:
+    """Decode a base64 (data URL) file answer into GridFS and return its FileMetadata dict."""
+    # Process base64 encoded file data
+    file_data = answer.get("data", "").split(",")[-1]  # Remove data URL prefix if present
+    file_content = base64.b64decode(file_data)
+    file_name = answer.get("name", "uploaded_file")
+    content_type = answer.get("type", "application/octet-stream")
+    
+    # Check file size
+    if len(file_content) > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File {file_name} exceeds maximum size of 5MB"
+        )
+    
+    # Store file in GridFS
+    grid_in = AsyncIOMotorGridIn(
+        db.fs,
+        filename=file_name,
+        content_type=content_type
+    )
+    await grid_in.write(file_content)
+    await grid_in.close()
+    gridfs_bytes_written.inc(len(file_content))
+    
+    return {
+        "filename": file_name,
+        "content_type": content_type,
+        "size": len(file_content),
+        "file_id": str(grid_in._id)
+    }
+
+async def delete_stored_files(file_ids: List[ObjectId]) -> int:
+    """Remove GridFS files and their chunks, returning how many files were deleted."""
+    if not file_ids:
+        return 0
+    deleted = (await db.fs.files.delete_many({"_id": {"$in": file_ids}})).deleted_count
+    await db.fs.chunks.delete_many({"files_id": {"$in": file_ids}})
+    return deleted
+
+class MultipartSubmissionParser:
+    """
+    Parse a multipart submission while it is still arriving on the request stream.
+    
+    Parts named after one of the form's file questions are written to GridFS as
+    their bytes arrive, so an upload over MAX_FILE_SIZE is answered with 413
+    before the rest of the body is read. Other fields are kept in memory up to
+    MAX_FORM_FIELD_SIZE. If parsing fails, the files it already stored are removed.
+    """
+    def __init__(self, request: Request, file_question_ids: List[str]):
+        self.request = request
+        self.file_question_ids = set(file_question_ids)
+        self.fields: Dict[str, str] = {}
+        self.files: Dict[str, dict] = {}  # question id -> FileMetadata dict
+        self._part: Optional[dict] = None
+        self._events = []
+        self._headers = {}
+        self._header_name = b""
+        self._header_value = b""
+    
+    # The parser calls these synchronously from write(); they queue events for parse() to await
+    def on_part_begin(self):
+        self._headers = {}
+    
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+    
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+    
+    def on_header_end(self):
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+    
+    def on_headers_finished(self):
+        self._events.append(("begin", self._headers))
+    
+    def on_part_data(self, data: bytes, start: int, end: int):
+        self._events.append(("data", data[start:end]))
+    
+    def on_part_end(self):
+        self._events.append(("end", None))
+    
+    async def parse(self):
+        content_type, params = parse_options_header(self.request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a multipart/form-data body"
+            )
+        parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        })
+        try:
+            try:
+                async for chunk in self.request.stream():
+                    parser.write(chunk)
+                    events, self._events = self._events, []
+                    for event, value in events:
+                        if event == "begin":
+                            self._part = self.begin_part(value)
+                        elif event == "data":
+                            await self.write_part(value)
+                        else:
+                            await self.end_part()
+                parser.finalize()
+            except MultipartParseError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid multipart body"
+                )
+        except Exception:
+            if self._part and "grid_in" in self._part:
+                await self._part["grid_in"].abort()
+            await delete_stored_files([ObjectId(file["file_id"]) for file in self.files.values()])
+            raise
+        return self.fields, self.files
+    
+    def begin_part(self, headers: dict) -> Optional[dict]:
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" not in options:
+            return {"name": name, "data": bytearray()}
+        if name not in self.file_question_ids or name in self.files:
+            # Not an answer to a file question: read past it without storing anything
+            return None
+        file_name = options[b"filename"].decode("utf-8", "replace") or "uploaded_file"
+        content_type = headers.get(b"content-type", b"").decode("latin-1") or "application/octet-stream"
+        grid_in = AsyncIOMotorGridIn(
+            db.fs,
+            filename=file_name,
+            content_type=content_type,
+            chunk_size=GRIDFS_CHUNK_SIZE
+        )
+        return {"name": name, "filename": file_name, "content_type": content_type, "grid_in": grid_in, "size": 0}
+    
+    async def write_part(self, data: bytes):
+        part = self._part
+        if part is None:
+            return
+        if "grid_in" not in part:
+            part["data"] += data
+            if len(part["data"]) > MAX_FORM_FIELD_SIZE:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Field '{part['name']}' is too large"
+                )
+            return
+        part["size"] += len(data)
+        if part["size"] > MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File {part['filename']} exceeds maximum size of 5MB"
+            )
+        await part["grid_in"].write(data)
+    
+    async def end_part(self):
+        part, self._part = self._part, None
+        if part is None:
+            return
+        if "grid_in" not in part:
+            self.fields[part["name"]] = part["data"].decode("utf-8", "replace")
+            return
+        await part["grid_in"].close()
+        gridfs_bytes_written.inc(part["size"])
+        self.files[part["name"]] = {
+            "filename": part["filename"],
+            "content_type": part["content_type"],
+            "size": part["size"],
+            "file_id": str(part["grid_in"]._id)
+        }
+
+async def store_file_answers(compiled: CompiledForm, answers: Dict[str, Any]) -> List[ObjectId]:
+    """
+    Store base64 file answers in GridFS, replacing them with FileMetadata dicts.
+    
+    Returns the ids of the files it stored. If one file fails, the ones stored
+    before it are removed again.
+    """
+    stored = []
+    for question_id in compiled.file_question_ids:
+        answer = answers.get(question_id)
+        if not (isinstance(answer, dict) and "data" in answer):
+            continue
+        try:
+            answers[question_id] = await store_base64_file(answer)
+        except Exception as e:
+            await delete_stored_files(stored)
+            if isinstance(e, HTTPException):
+                raise
+            logger.error(f"Error processing file upload: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Error processing file upload: {str(e)}"
+            )
+        stored.append(ObjectId(answers[question_id]["file_id"]))
+    return stored
+
+def open_form_filter(form_id: ObjectId) -> dict:
+    """Match the form only while it is active, unexpired and below max_responses (0 or missing means unlimited)."""
+    return {
+        "_id": form_id,
+        "is_active": True,
+        "$and": [
+            {"$or": [{"expiration_date": None}, {"expiration_date": {"$gt": datetime.now()}}]},
+            {"$or": [
+                {"max_responses": {"$in": [None, 0]}},
+                {"$expr": {"$lt": ["$response_count", "$max_responses"]}},
+            ]},
+        ],
+    }
+
+def form_closed_error(form: dict) -> HTTPException:
+    """The error for a submit the database turned away although the cached form still looked open."""
+    if form.get("max_responses"):
+        return HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="This form has reached its maximum number of responses"
+        )
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Form not found or inactive"
+    )
+
+async def reserve_response_slot(form_id: ObjectId) -> Optional[dict]:
+    """
+    Atomically count a new response against the form.
+    
+    The increment only applies while the form is open (see open_form_filter),
+    so concurrent submitters cannot exceed the cap. Returns the updated
+    count, or None if rejected.
+    """
+    return await forms_collection.find_one_and_update(
+        open_form_filter(form_id),
+        {"$inc": {"response_count": 1}},
+        projection={"response_count": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+
+async def release_response_slot(form_id: ObjectId):
+    await forms_collection.update_one({"_id": form_id}, {"$inc": {"response_count": -1}})
+
+class SubmissionQueue:
+    """
+    Bounded in-process queue that writes accepted responses in batches.
+    
+    A background task collects up to batch_size responses or waits
+    flush_interval seconds, then stores them with one insert_many and one
+    bulk $inc of response_count and stats rollup update per form. In "flush" mode a submit is
+    acknowledged once its batch is written; in "enqueue" mode as soon as it
+    is queued. A full queue answers 429, and stop() drains it on shutdown.
+    """
+    def __init__(self, mode: str, max_size: int, batch_size: int, flush_interval: float):
+        self.mode = mode
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.accepting = False
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.flushed = 0
+        self.batches = 0
+        self.rejected = 0
+        self.failed = 0
+
+    def accepts(self, form: dict) -> bool:
+        # Capped forms keep the atomic reservation path so max_responses stays exact
+        return self.accepting and not form.get("max_responses")
+
+    def start(self):
+        if self.mode not in ("flush", "enqueue"):
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self.run())
+        self.accepting = True
+        logger.info(f"Submission queue started in {self.mode} mode")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self.accepting = False
+        await self._queue.put(None)  # Sentinel: flush what is queued, then exit
+        await self._task
+        self._task = None
+        logger.info(f"Submission queue drained ({self.flushed} responses in {self.batches} batches)")
+
+    def full_error(self) -> HTTPException:
+        self.rejected += 1
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many submissions right now, please try again shortly"
+        )
+
+    def check_capacity(self):
+        # Lets a submit be refused before its files are written; put() still checks, as the queue may fill meanwhile
+        if self._queue.full():
+            raise self.full_error()
+
+    async def put(self, document: dict, questions: List[dict]) -> ObjectId:
+        document["_id"] = ObjectId()
+        ack = asyncio.get_running_loop().create_future() if self.mode == "flush" else None
+        try:
+            self._queue.put_nowait((document, rollup_update(questions, document), ack))
+        except asyncio.QueueFull:
+            raise self.full_error()
+        self.enqueued += 1
+        if ack is not None:
+            try:
+                await ack
+            except Exception:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Submission could not be saved, please try again"
+                )
+        return document["_id"]
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self.flush(batch)
+            if stopping:
+                return
+
+    def fail(self, items: list, error: Exception):
+        self.failed += len(items)
+        for _, _, ack in items:
+            if ack is not None and not ack.done():
+                ack.set_exception(error)
+
+    async def flush(self, batch: list):
+        try:
+            await responses_collection.insert_many([document for document, _, _ in batch], ordered=False)
+            rejected = set()
+        except BulkWriteError as e:
+            # Unordered inserts store every document that has no write error of its own
+            rejected = {error["index"] for error in e.details.get("writeErrors", [])}
+            logger.error(f"{len(rejected)} of {len(batch)} queued submissions were rejected: {str(e)}")
+            self.fail([item for index, item in enumerate(batch) if index in rejected], e)
+        except Exception as e:
+            logger.error(f"Error flushing {len(batch)} queued submissions: {str(e)}")
+            self.fail(batch, e)
+            return
+        stored = [item for index, item in enumerate(batch) if index not in rejected]
+        if not stored:
+            return
+        
+        self.flushed += len(stored)
+        self.batches += 1
+        for _, _, ack in stored:
+            if ack is not None and not ack.done():
+                ack.set_result(None)
+        
+        # The responses are saved, so a failed counter update is logged rather than failing their submits
+        counts = Counter(document["form_id"] for document, _, _ in stored)
+        try:
+            await forms_collection.bulk_write(
+                [UpdateOne({"_id": form_id}, {"$inc": {"response_count": count}}) for form_id, count in counts.items()],
+                ordered=False
+            )
+        except Exception as e:
+            logger.error(f"Error counting {len(stored)} flushed submissions in response_count: {str(e)}")
+        
+        # Stats rollups are best effort and do not hold up the acknowledgements
+        stats_updates = {}
+        for document, stats_update, _ in stored:
+            stats_updates.setdefault(document["form_id"], []).append(stats_update)
+        try:
+            await stats_collection.bulk_write(
+                [UpdateOne({"_id": form_id}, merge_rollup_updates(updates), upsert=True)
+                 for form_id, updates in stats_updates.items()],
+                ordered=False
+            )
+        except Exception as e:
+            logger.error(f"Error updating stats rollups for {len(stats_updates)} forms: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_size": self.max_size,
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "rejected": self.rejected,
+            "failed": self.failed,
+        }
+
+submission_queue = SubmissionQueue(
+    SUBMISSION_QUEUE_MODE, SUBMISSION_QUEUE_SIZE, SUBMISSION_BATCH_SIZE, SUBMISSION_FLUSH_INTERVAL
+)
+
+def user_token_claims(user: dict) -> dict:
+    # ver must match the user's token_version; bumping it revokes every token issued before
+    return {"sub": user["username"], "uid": str(user["_id"]), "ver": user.get("token_version", 0)}
+
+class Principal:
+    """A verified user and the token version valid for them, cached by user id."""
+    def __init__(self, user: dict):
+        self.user = User(**user)
+        self.user_id = str(user["_id"])
+        self.token_version = user.get("token_version", 0)
+
+principal_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL, key=lambda principal: principal.user_id)
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    """
+    Resolve the bearer token to its user.
+    
+    Tokens carry the user id and token version, so a cached principal
+    authenticates the request without touching Mongo. Tokens issued before
+    these claims existed are still looked up by username.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -431,13 +1549,26 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
+        token_data = TokenData(username=username, user_id=payload.get("uid"), token_version=payload.get("ver", 0))
+    except (JWTError, ValueError):
         raise credentials_exception
-    user = users_collection.find_one({"username": token_data.username})
-    if user is None:
+    
+    principal = principal_cache.get(token_data.user_id) if token_data.user_id else None
+    if principal is None:
+        if token_data.user_id:
+            if not ObjectId.is_valid(token_data.user_id):
+                raise credentials_exception
+            user = await users_collection.find_one({"_id": ObjectId(token_data.user_id)})
+        else:
+            user = await users_collection.find_one({"username": token_data.username})
+        if user is None:
+            raise credentials_exception
+        principal = Principal(user)
+        principal_cache.put(principal)
+    
+    if token_data.token_version != principal.token_version:
         raise credentials_exception
-    return User(**user)
+    return principal.user
 
 # API endpoints
 @app.get("/health")
@@ -449,26 +1580,33 @@ async def health_check(request: Request):
 @limiter.limit("5/minute")
 async def register_user(request: Request, user: UserCreate):
     # Check if username or email already exists
-    if users_collection.find_one({"username": user.username}):
+    if await users_collection.find_one({"username": user.username}):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
-    if users_collection.find_one({"email": user.email}):
+    if await users_collection.find_one({"email": user.email}):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Create new user with hashed password
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     user_dict = user.model_dump(by_alias=True)  # Updated for Pydantic v2
     user_dict.pop("password")
     user_dict["hashed_password"] = hashed_password
     user_dict["created_at"] = datetime.now()
     
-    result = users_collection.insert_one(user_dict)
-    created_user = users_collection.find_one({"_id": result.inserted_id})
+    try:
+        result = await users_collection.insert_one(user_dict)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent registration for the same username or email
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username or email already registered"
+        )
+    created_user = await users_collection.find_one({"_id": result.inserted_id})
     
     return User(**created_user)
 
@@ -478,21 +1616,38 @@ async def login_for_access_token(
     request: Request, form_data: OAuth2PasswordRequestForm = Depends()
 ):
     # Find user by username
-    user = users_collection.find_one({"username": form_data.username})
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    user = await users_collection.find_one({"username": form_data.username})
+    valid, new_hash = await verify_and_update_password(form_data.password, user["hashed_password"]) if user else (False, None)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    if new_hash:
+        # Re-hash with the current BCRYPT_ROUNDS while the plain password is at hand
+        await users_collection.update_one({"_id": user["_id"]}, {"$set": {"hashed_password": new_hash}})
+    
     # Generate access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user["username"]}, expires_delta=access_token_expires
+        data=user_token_claims(user), expires_delta=access_token_expires
     )
+    principal_cache.put(Principal(user))
     return {"access_token": access_token, "token_type": "bearer"}
 
+@app.post("/token/revoke", status_code=status.HTTP_204_NO_CONTENT)
+@limiter.limit("10/minute")
+async def revoke_tokens(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """Sign out everywhere: bump the user's token version so every token issued so far stops validating."""
+    await users_collection.update_one({"_id": current_user.id}, {"$inc": {"token_version": 1}})
+    principal_cache.invalidate(str(current_user.id))
+    return None
+
 @app.post("/forms", response_model=Form)
 @limiter.limit("30/minute")
 async def create_form(
@@ -500,27 +1655,23 @@ async def create_form(
     form_data: FormCreate,
     current_user: User = Depends(get_current_user)
 ):
-    # Generate slug (short URL)
-    slug = form_data.custom_slug or generate_slug(8)
+    validate_question_patterns(form_data.questions)
     
     # Check if custom slug already exists
-    if form_data.custom_slug and forms_collection.find_one({"slug": slug}):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Custom URL already in use. Please choose another."
-        )
+    if form_data.custom_slug and await forms_collection.find_one({"slug": form_data.custom_slug}):
+        raise slug_taken_error()
     
     # Create new form
     form_dict = form_data.model_dump(by_alias=True)  # Updated for Pydantic v2
     form_dict["creator_id"] = current_user.id
     form_dict["created_at"] = datetime.now()
     form_dict["updated_at"] = datetime.now()
-    form_dict["slug"] = slug
     form_dict["is_active"] = True
     form_dict["response_count"] = 0
     
-    result = forms_collection.insert_one(form_dict)
-    created_form = forms_collection.find_one({"_id": result.inserted_id})
+    # Generate slug (short URL)
+    result = await insert_form(form_dict, form_data.custom_slug)
+    created_form = await forms_collection.find_one({"_id": result.inserted_id})
     
     return Form(**created_form)
 
@@ -528,13 +1679,13 @@ async def create_form(
 @limiter.limit("60/minute")
 async def get_user_forms(
     request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
-    forms = list(forms_collection.find(
-        {"creator_id": current_user.id}
-    ).skip(skip).limit(limit))
+    forms = await fetch_page(forms_collection, {"creator_id": current_user.id}, skip, limit, cursor, response)
     
     return [Form(**form) for form in forms]
 
@@ -551,7 +1702,7 @@ async def get_form_by_id(
             detail="Invalid form ID format"
         )
     
-    form = forms_collection.find_one({"_id": ObjectId(form_id)})
+    form = await forms_collection.find_one({"_id": ObjectId(form_id)})
     if not form:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -570,12 +1721,13 @@ async def get_form_by_id(
 @app.get("/f/{slug}")
 @limiter.limit("120/minute")
 async def get_public_form(request: Request, slug: str):
-    form = forms_collection.find_one({"slug": slug, "is_active": True})
-    if not form:
+    compiled = await get_compiled_form(slug)
+    if not compiled:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Form not found or inactive"
         )
+    form = compiled.form
     
     # Check if form has reached max responses
     if form.get("max_responses") and form["response_count"] >= form["max_responses"]:
@@ -591,34 +1743,35 @@ async def get_public_form(request: Request, slug: str):
             content={"detail": "This form has expired"}
         )
     
-    # Return the form data for display
-    return Form(**form)
+    # Return the pre-serialized form data for display, or 304 if the client has it
+    headers = {"ETag": compiled.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        client_etags = [tag.strip() for tag in if_none_match.split(",")]
+        if "*" in client_etags or compiled.etag in client_etags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=compiled.body, media_type="application/json", headers=headers)
 
-@app.post("/f/{slug}/submit")
-@limiter.limit("30/minute")
-async def submit_form_response(
+async def process_submission(
     request: Request,
     slug: str,
-    answers: Dict[str, Any]
+    answers: Dict[str, Any],
+    stored_files: Optional[Dict[str, dict]] = None
 ):
     """
-    Handle form submission and generate personalized response based on answers.
+    Validate and store a submission and build the personalized end screen.
     
-    Args:
-        request: The FastAPI request object
-        slug: The form's unique slug
-        answers: Dictionary of question_id -> answer values
-        
-    Returns:
-        JSON response with submission result and personalized end screen content
+    Shared by the JSON and multipart submit endpoints. stored_files maps file
+    question ids to the FileMetadata of multipart files already in GridFS.
     """
     # Find the form
-    form = forms_collection.find_one({"slug": slug, "is_active": True})
-    if not form:
+    compiled = await get_compiled_form(slug)
+    if not compiled:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Form not found or inactive"
         )
+    form = compiled.form
     
     # Check if form has reached max responses
     if form.get("max_responses") and form["response_count"] >= form["max_responses"]:
@@ -634,54 +1787,18 @@ async def submit_form_response(
             detail="This form has expired"
         )
     
-    # Process file uploads in the answers
-    for question_id, answer in list(answers.items()):  # Use list to allow modification during iteration
-        question = next((q for q in form["questions"] if q["id"] == question_id), None)
-        if question and question["type"] == "file" and isinstance(answer, dict) and "data" in answer:
-            try:
-                # Process base64 encoded file data
-                file_data = answer.get("data", "").split(",")[-1]  # Remove data URL prefix if present
-                file_content = base64.b64decode(file_data)
-                file_name = answer.get("name", "uploaded_file")
-                content_type = answer.get("type", "application/octet-stream")
-                
-                # Check file size
-                if len(file_content) > MAX_FILE_SIZE:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"File {file_name} exceeds maximum size of 5MB"
-                    )
-                
-                # Store file in GridFS
-                file_id = fs.put(
-                    file_content,
-                    filename=file_name,
-                    content_type=content_type
-                )
-                
-                # Replace file data with metadata
-                answers[question_id] = {
-                    "filename": file_name,
-                    "content_type": content_type,
-                    "size": len(file_content),
-                    "file_id": str(file_id)
-                }
-            except Exception as e:
-                logger.error(f"Error processing file upload: {str(e)}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Error processing file upload: {str(e)}"
-                )
+    # Multipart files were stored while the body was read
+    answers.update(stored_files or {})
     
-    # Validate required questions
-    for question in form["questions"]:
-        if question["required"] and question["id"] not in answers:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Question '{question['title']}' is required"
-            )
+    # Validate answer types, ranges, options and required questions
+    validation_error = compiled.validator.validate(answers)
+    if validation_error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=validation_error
+        )
     
-    # Create response record
+    # Create response record (file answers are replaced in place once stored)
     response_data = {
         "form_id": form["_id"],
         "answers": answers,
@@ -690,14 +1807,49 @@ async def submit_form_response(
         "user_agent": request.headers.get("user-agent", "")
     }
     
-    # Save response
-    response_id = responses_collection.insert_one(response_data).inserted_id
+    search_text = build_search_text(compiled.search_question_ids, answers)
+    if search_text:
+        response_data["search_text"] = search_text
     
-    # Update form response count
-    forms_collection.update_one(
-        {"_id": form["_id"]},
-        {"$inc": {"response_count": 1}}
-    )
+    if submission_queue.accepts(form):
+        # The cached form may be stale, so confirm it is still open before queueing, as the reservation does
+        if not await forms_collection.find_one(open_form_filter(form["_id"]), {"_id": 1}):
+            form_cache.invalidate(slug)
+            raise form_closed_error(form)
+        
+        # Write-behind mode: the queue batches the insert and the response_count update
+        submission_queue.check_capacity()
+        stored_file_ids = await store_file_answers(compiled, answers)
+        try:
+            response_id = await submission_queue.put(response_data, form["questions"])
+        except Exception:
+            # Refused or not saved: no response will refer to the files
+            await delete_stored_files(stored_file_ids)
+            raise
+        form["response_count"] += 1
+    else:
+        # Reserve a response slot first so max_responses holds under concurrency
+        reserved = await reserve_response_slot(form["_id"])
+        if not reserved:
+            form_cache.invalidate(slug)
+            raise form_closed_error(form)
+        form["response_count"] = reserved["response_count"]
+        
+        stored_file_ids = []
+        try:
+            # Process file uploads in the answers
+            stored_file_ids = await store_file_answers(compiled, answers)
+            
+            # Save response
+            response_id = (await responses_collection.insert_one(response_data)).inserted_id
+        except Exception:
+            # Give the slot back and drop the files if the response could not be stored
+            await delete_stored_files(stored_file_ids)
+            await release_response_slot(form["_id"])
+            raise
+        
+        # Fold the response into the form's stats rollup
+        await record_response_stats(form["_id"], rollup_update(form["questions"], response_data))
     
     # Determine the appropriate end screen content based on answers
     end_screen = form["end_screen"]
@@ -707,7 +1859,7 @@ async def submit_form_response(
     if "dynamic_content" in end_screen and end_screen["dynamic_content"]:
         try:
             logger.info(f"Evaluating dynamic content for form {slug} with answers for questions: {list(answers.keys())}")
-            custom_content = evaluate_dynamic_content(end_screen["dynamic_content"], answers)
+            custom_content = compiled.dynamic_content.evaluate(answers)
             logger.info(f"Dynamic content evaluation result: {custom_content is not None}")
             if custom_content:
                 logger.info(f"Found matching dynamic content with title: {custom_content.get('title', 'No title')}")
@@ -738,6 +1890,125 @@ async def submit_form_response(
         "end_screen": end_screen_response
     }
 
+@app.post("/f/{slug}/submit")
+@form_submit_total_limit
+@form_submit_limit
+async def submit_form_response(
+    request: Request,
+    slug: str,
+    answers: Dict[str, Any]
+):
+    """
+    Handle form submission and generate personalized response based on answers.
+    
+    Args:
+        request: The FastAPI request object
+        slug: The form's unique slug
+        answers: Dictionary of question_id -> answer values
+        
+    Returns:
+        JSON response with submission result and personalized end screen content
+    """
+    return await process_submission(request, slug, answers)
+
+@app.post("/f/{slug}/submit-multipart")
+@form_submit_total_limit
+@form_submit_limit
+async def submit_form_response_multipart(request: Request, slug: str):
+    """
+    Handle a multipart/form-data submission.
+    
+    The "answers" field holds the non-file answers as JSON; each file is sent
+    as a part named after its question id and streamed into GridFS instead of
+    being base64 encoded inside the JSON body.
+    """
+    compiled = await get_compiled_form(slug)
+    if not compiled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Form not found or inactive"
+        )
+    fields, files = await MultipartSubmissionParser(request, compiled.file_question_ids).parse()
+    try:
+        try:
+            answers = json.loads(fields.get("answers") or "{}")
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Field 'answers' must be a JSON object"
+            )
+        if not isinstance(answers, dict):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Field 'answers' must be a JSON object"
+            )
+        return await process_submission(request, slug, answers, files)
+    except Exception:
+        # No response refers to the files unless the submission was stored
+        await delete_stored_files([ObjectId(file["file_id"]) for file in files.values()])
+        raise
+
+def not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETag was sent."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        client_etags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in client_etags or etag in client_etags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+def parse_byte_range(range_header: str, length: int):
+    """
+    Parse a single "bytes=" range into inclusive (start, end) offsets.
+    
+    Returns None when the header should be ignored (other units, multiple
+    ranges or an invalid range such as last < first) and False when the
+    range starts beyond the end of the file.
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    first, _, last = ranges.strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            suffix = int(last)
+            if suffix <= 0:
+                return False
+            return max(0, length - suffix), length - 1
+        start = int(first)
+        end = int(last) if last else None
+    except ValueError:
+        return None
+    if end is not None and end < start:
+        return None
+    if start >= length:
+        return False
+    return start, length - 1 if end is None else min(end, length - 1)
+
+async def iter_gridfs_file(grid_out: AsyncIOMotorGridOut, start: int, count: int):
+    """Yield count bytes of a GridFS file from offset start, one stored chunk at a time."""
+    if count <= 0:
+        return
+    grid_out.seek(start)
+    remaining = count
+    while remaining > 0:
+        chunk = await grid_out.readchunk()
+        if not chunk:
+            break
+        chunk = chunk[:remaining]
+        remaining -= len(chunk)
+        gridfs_bytes_read.inc(len(chunk))
+        yield chunk
+
 @app.get("/files/{file_id}")
 @limiter.limit("120/minute")
 async def get_file(request: Request, file_id: str):
@@ -747,21 +2018,52 @@ async def get_file(request: Request, file_id: str):
             detail="Invalid file ID format"
         )
     
-    # Check if file exists in GridFS
-    if not fs.exists(ObjectId(file_id)):
+    # Single metadata lookup; the GridOut below reuses this document
+    file_doc = await db.fs.files.find_one({"_id": ObjectId(file_id)})
+    if not file_doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="File not found"
         )
     
-    # Retrieve file from GridFS
-    grid_out = fs.get(ObjectId(file_id))
+    # GridFS files are immutable, so md5 (legacy files) or the id and upload date identify the content
+    length = file_doc["length"]
+    upload_date = file_doc["uploadDate"].replace(tzinfo=timezone.utc)
+    etag = f'"{file_doc["md5"]}"' if file_doc.get("md5") else f'"{file_id}-{int(upload_date.timestamp() * 1000)}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(upload_date, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename={file_doc.get('filename')}",
+    }
+    
+    if not_modified(request, etag, upload_date):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    # Create a streaming response
+    # Serve a single byte range when asked (If-Range falls back to the full file if it is stale)
+    start, end = 0, length - 1
+    status_code = status.HTTP_200_OK
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and length > 0 and (not if_range or if_range in (etag, headers["Last-Modified"])):
+        byte_range = parse_byte_range(range_header, length)
+        if byte_range is False:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{length}"}
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+    headers["Content-Length"] = str(end - start + 1 if length > 0 else 0)
+    
+    grid_out = AsyncIOMotorGridOut(db.fs, file_document=file_doc)
     return StreamingResponse(
-        io.BytesIO(grid_out.read()),
-        media_type=grid_out.content_type,
-        headers={"Content-Disposition": f"attachment; filename={grid_out.filename}"}
+        iter_gridfs_file(grid_out, start, end - start + 1),
+        status_code=status_code,
+        media_type=file_doc.get("contentType") or "application/octet-stream",
+        headers=headers
     )
 
 @app.put("/forms/{form_id}", response_model=Form)
@@ -779,7 +2081,7 @@ async def update_form(
         )
     
     # Check if form exists and user is the owner
-    form = forms_collection.find_one({"_id": ObjectId(form_id)})
+    form = await forms_collection.find_one({"_id": ObjectId(form_id)})
     if not form:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -791,14 +2093,12 @@ async def update_form(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this form"
         )
+    validate_question_patterns(form_data.questions)
     
     # Check if custom slug is changed and already exists
     if form_data.custom_slug and form_data.custom_slug != form.get("custom_slug"):
-        if forms_collection.find_one({"slug": form_data.custom_slug, "_id": {"$ne": ObjectId(form_id)}}):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Custom URL already in use. Please choose another."
-            )
+        if await forms_collection.find_one({"slug": form_data.custom_slug, "_id": {"$ne": ObjectId(form_id)}}):
+            raise slug_taken_error()
     
     # Update form
     form_dict = form_data.model_dump(by_alias=True)  # Updated for Pydantic v2
@@ -810,21 +2110,137 @@ async def update_form(
     else:
         form_dict["slug"] = form_data.custom_slug
     
-    forms_collection.update_one(
-        {"_id": ObjectId(form_id)},
-        {"$set": form_dict}
-    )
+    try:
+        await forms_collection.update_one(
+            {"_id": ObjectId(form_id)},
+            {"$set": form_dict}
+        )
+    except DuplicateKeyError:
+        # Another form claimed the custom slug after the check above
+        raise slug_taken_error()
+    form_cache.invalidate(form["slug"], form_dict["slug"])
+    analytics_cache.invalidate(form["_id"])
     
-    updated_form = forms_collection.find_one({"_id": ObjectId(form_id)})
+    updated_form = await forms_collection.find_one({"_id": ObjectId(form_id)})
     return Form(**updated_form)
 
-@app.delete("/forms/{form_id}", status_code=status.HTTP_204_NO_CONTENT)
+# Form deletion: the form disappears at once; a resumable job removes its responses and files in batches
+FORM_DELETE_BATCH_SIZE = int(os.getenv("FORM_DELETE_BATCH_SIZE", "1000"))
+FORM_DELETE_LEASE = timedelta(seconds=60)  # A job whose worker stops renewing this is taken over by the sweeper
+FORM_DELETE_RETRY_DELAY = timedelta(seconds=30)  # Wait before a failed job is claimed again
+FORM_DELETE_SWEEP_INTERVAL = float(os.getenv("FORM_DELETE_SWEEP_INTERVAL", "60"))  # seconds
+
+def deletion_progress(job: dict) -> dict:
+    return {
+        "form_id": str(job["_id"]),
+        "status": job["status"],
+        "total_responses": job["total_responses"],
+        "responses_deleted": job["responses_deleted"],
+        "files_deleted": job["files_deleted"],
+        "last_error": job.get("last_error"),
+        "started_at": job["created_at"],
+        "finished_at": job.get("finished_at"),
+    }
+
+async def claim_form_deletion(form_id: ObjectId) -> Optional[dict]:
+    """Take the lease on an unfinished deletion job, or return None when another worker holds it."""
+    now = datetime.now()
+    return await deletions_collection.find_one_and_update(
+        {"_id": form_id, "status": "running", "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]},
+        {"$set": {"lease_until": now + FORM_DELETE_LEASE}},
+        return_document=ReturnDocument.AFTER
+    )
+
+async def delete_response_batch(job: dict) -> bool:
+    """
+    Delete one batch of a deleted form's responses and their GridFS files.
+    
+    Every answer with a file_id counts, not just the form's current file
+    questions, so files under questions edited away are removed too. The
+    files go in two bulk deletes on fs.files and fs.chunks. Responses are
+    removed last, so an interrupted batch is simply found again on resume.
+    Returns False once no responses are left.
+    """
+    batch = await responses_collection.find({"form_id": job["_id"]}, {"answers": 1}).limit(FORM_DELETE_BATCH_SIZE).to_list(None)
+    if not batch:
+        return False
+    
+    file_ids = []
+    for response in batch:
+        for answer in response.get("answers", {}).values():
+            file_id = answer.get("file_id") if isinstance(answer, dict) else None
+            if file_id and ObjectId.is_valid(file_id):
+                file_ids.append(ObjectId(file_id))
+    files_deleted = await delete_stored_files(file_ids)
+    
+    result = await responses_collection.delete_many({"_id": {"$in": [response["_id"] for response in batch]}})
+    await deletions_collection.update_one(
+        {"_id": job["_id"]},
+        {
+            "$inc": {"responses_deleted": result.deleted_count, "files_deleted": files_deleted},
+            "$set": {"updated_at": datetime.now(), "lease_until": datetime.now() + FORM_DELETE_LEASE},
+        }
+    )
+    return True
+
+async def run_form_deletion(form_id: ObjectId):
+    """Run a deletion job to completion; safe to call again after an interruption."""
+    job = await claim_form_deletion(form_id)
+    if not job:
+        return
+    try:
+        while await delete_response_batch(job):
+            pass
+        await deletions_collection.update_one(
+            {"_id": form_id},
+            {"$set": {"status": "done", "finished_at": datetime.now(), "lease_until": None}}
+        )
+        logger.info(f"Finished deleting form {form_id}")
+    except Exception as e:
+        logger.error(f"Deleting form {form_id} failed: {str(e)}")
+        try:
+            # The sweeper claims the job again once this lease runs out and resumes from the remaining responses
+            await deletions_collection.update_one(
+                {"_id": form_id},
+                {
+                    "$set": {"last_error": str(e), "updated_at": datetime.now(),
+                             "lease_until": datetime.now() + FORM_DELETE_RETRY_DELAY},
+                    "$inc": {"attempts": 1},
+                }
+            )
+        except Exception as retry_error:
+            logger.error(f"Scheduling a retry for deleting form {form_id} failed: {str(retry_error)}")
+
+async def resume_form_deletions():
+    """Restart deletion jobs whose lease ran out, after a failed attempt or a worker that stopped or crashed."""
+    try:
+        now = datetime.now()
+        query = {"status": "running", "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]}
+        async for job in deletions_collection.find(query, {"_id": 1}):
+            await run_form_deletion(job["_id"])
+    except Exception as e:
+        logger.error(f"Resuming form deletions failed: {str(e)}")
+
+async def sweep_form_deletions():
+    # Runs for the life of the worker, so no failed or abandoned job waits for a restart
+    while True:
+        await resume_form_deletions()
+        await asyncio.sleep(FORM_DELETE_SWEEP_INTERVAL)
+
+@app.delete("/forms/{form_id}", status_code=status.HTTP_202_ACCEPTED)
 @limiter.limit("20/minute")
 async def delete_form(
     request: Request,
     form_id: str,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user)
 ):
+    """
+    Delete a form immediately and its responses and files in the background.
+    
+    Returns the deletion job's progress, which GET /forms/{form_id}/deletion
+    keeps reporting until the job is done.
+    """
     if not ObjectId.is_valid(form_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -832,7 +2248,7 @@ async def delete_form(
         )
     
     # Check if form exists and user is the owner
-    form = forms_collection.find_one({"_id": ObjectId(form_id)})
+    form = await forms_collection.find_one({"_id": ObjectId(form_id)})
     if not form:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -845,36 +2261,151 @@ async def delete_form(
             detail="Not authorized to delete this form"
         )
     
-    # Find all file uploads in responses to this form
-    responses = responses_collection.find({"form_id": ObjectId(form_id)})
-    for response in responses:
-        for question_id, answer in response.get("answers", {}).items():
-            if isinstance(answer, dict) and "file_id" in answer:
-                try:
-                    # Delete file from GridFS
-                    file_id = answer["file_id"]
-                    if ObjectId.is_valid(file_id) and fs.exists(ObjectId(file_id)):
-                        fs.delete(ObjectId(file_id))
-                except Exception as e:
-                    logger.error(f"Error deleting file {file_id}: {str(e)}")
+    # Record the job before the form goes, so a crash in between still leaves it resumable
+    job = {
+        "_id": form["_id"],
+        "creator_id": form["creator_id"],
+        "status": "running",
+        "total_responses": form.get("response_count", 0),
+        "responses_deleted": 0,
+        "files_deleted": 0,
+        "created_at": datetime.now(),
+        "updated_at": datetime.now(),
+        "lease_until": None,
+    }
+    try:
+        await deletions_collection.insert_one(job)
+    except DuplicateKeyError:
+        # A concurrent request is already deleting this form
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Form not found"
+        )
     
     # Delete form
-    forms_collection.delete_one({"_id": ObjectId(form_id)})
+    await forms_collection.delete_one({"_id": form["_id"]})
+    form_cache.invalidate(form["slug"])
+    analytics_cache.invalidate(form["_id"])
+    await stats_collection.delete_one({"_id": form["_id"]})
     
-    # Delete all responses for this form
-    responses_collection.delete_many({"form_id": ObjectId(form_id)})
+    background_tasks.add_task(run_form_deletion, form["_id"])
+    return deletion_progress(job)
+
+@app.get("/forms/{form_id}/deletion")
+@limiter.limit("60/minute")
+async def get_form_deletion(
+    request: Request,
+    form_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    if not ObjectId.is_valid(form_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid form ID format"
+        )
     
-    return None
+    job = await deletions_collection.find_one({"_id": ObjectId(form_id)})
+    if not job or str(job["creator_id"]) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Form deletion not found"
+        )
+    return deletion_progress(job)
+
+# Server-side response filtering
+ANSWER_FILTER_OPERATORS = {"eq", "ne", "in", "gt", "gte", "lt", "lte"}
+ANSWER_RANGE_OPERATORS = {"gt": "$gt", "gte": "$gte", "lt": "$lt", "lte": "$lte"}
+# Date ("YYYY-MM-DD") and time ("HH:MM") answers are strings that sort chronologically
+RANGE_QUESTION_TYPES = NUMERIC_QUESTION_TYPES | {QuestionType.DATE, QuestionType.TIME}
+
+def parse_answer_filter(expression: str):
+    """Split a "<question_id>:<operator>:<value>" filter; values for "in" are comma separated."""
+    try:
+        question_id, operator, value = expression.split(":", 2)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid filter {expression!r}, expected <question_id>:<operator>:<value>"
+        )
+    if operator not in ANSWER_FILTER_OPERATORS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported filter operator {operator!r}"
+        )
+    return question_id, operator, value.split(",") if operator == "in" else [value]
+
+def answer_field(questions: Dict[str, dict], question_id: str) -> str:
+    """Dotted path to a question's answer, for questions whose id can be used in one."""
+    if question_id not in questions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown question {question_id}"
+        )
+    if not question_id or "." in question_id or question_id.startswith("$"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Question {question_id} cannot be filtered on"
+        )
+    return f"answers.{question_id}"
+
+def answer_filters_query(questions: Dict[str, dict], expressions: List[str]) -> List[dict]:
+    """Translate answer filters into Mongo conditions (a checkbox answer matches if any selected option does)."""
+    conditions = []
+    for expression in expressions:
+        question_id, operator, values = parse_answer_filter(expression)
+        field = answer_field(questions, question_id)
+        question_type = questions[question_id]["type"]
+        if question_type in NUMERIC_QUESTION_TYPES:
+            try:
+                values = [float(value) for value in values]
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Filter on {question_id} needs a numeric value"
+                )
+        if operator in ANSWER_RANGE_OPERATORS:
+            if question_type not in RANGE_QUESTION_TYPES:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Operator {operator!r} only applies to numeric, date and time questions"
+                )
+            conditions.append({field: {ANSWER_RANGE_OPERATORS[operator]: values[0]}})
+        elif operator == "in":
+            conditions.append({field: {"$in": values}})
+        elif operator == "ne":
+            conditions.append({field: {"$ne": values[0]}})
+        else:
+            conditions.append({field: values[0]})
+    return conditions
+
+def build_search_text(question_ids: List[str], answers: dict) -> str:
+    # Text and paragraph answers, denormalized into one field so a text index can serve search
+    return "\n".join(answers[question_id] for question_id in question_ids if isinstance(answers.get(question_id), str))
 
 @app.get("/forms/{form_id}/responses", response_model=List[FormResponse])
 @limiter.limit("60/minute")
 async def get_form_responses(
     request: Request,
+    response: Response,
     form_id: str,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    where: List[str] = Query(default=[]),
+    search: Optional[str] = None,
+    fields: List[str] = Query(default=[]),
     current_user: User = Depends(get_current_user)
 ):
+    """
+    List a form's responses, oldest first, a page at a time.
+    
+    Optional filters: created_at in [start, end), answer filters
+    (where=<question_id>:<operator>:<value>, as in the analytics endpoint)
+    and a full-text search over text and paragraph answers. `fields`
+    limits the returned answers to the given question ids.
+    """
     if not ObjectId.is_valid(form_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -882,7 +2413,7 @@ async def get_form_responses(
         )
     
     # Check if form exists and user is the owner
-    form = forms_collection.find_one({"_id": ObjectId(form_id)})
+    form = await forms_collection.find_one({"_id": ObjectId(form_id)})
     if not form:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -895,12 +2426,294 @@ async def get_form_responses(
             detail="Not authorized to view responses for this form"
         )
     
+    # Every filter runs inside the form_id index range
+    questions = {question["id"]: question for question in form.get("questions", [])}
+    query = {"form_id": ObjectId(form_id)}
+    created_at = {}
+    if start:
+        created_at["$gte"] = as_stored_time(start)
+    if end:
+        created_at["$lt"] = as_stored_time(end)
+    if created_at:
+        query["created_at"] = created_at
+    conditions = answer_filters_query(questions, where)
+    if conditions:
+        query["$and"] = conditions
+    if search:
+        query["$text"] = {"$search": search}
+    
+    projection = None
+    if fields:
+        projection = {"form_id": 1, "created_at": 1, "ip_address": 1, "user_agent": 1}
+        projection.update({answer_field(questions, question_id): 1 for question_id in fields})
+    
     # Get responses
-    responses = list(responses_collection.find(
-        {"form_id": ObjectId(form_id)}
-    ).skip(skip).limit(limit))
+    responses = await fetch_page(responses_collection, query, skip, limit, cursor, response, projection)
+    
+    return [FormResponse(**item) for item in responses]
+
+# Streaming export of all responses to a form
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+}
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 500))
+# Rows per Parquet row group / Arrow record batch; bounds memory for columnar exports
+COLUMNAR_BATCH_SIZE = int(os.getenv("COLUMNAR_BATCH_SIZE", 10000))
+
+def as_stored_time(value: Optional[datetime]) -> Optional[datetime]:
+    """Response timestamps are stored as naive server-local time (datetime.now()), so aware query values are converted to match."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+def export_value(value):
+    """Make a stored answer JSON-serializable (file answers carry an ObjectId)."""
+    if isinstance(value, dict):
+        return {key: export_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [export_value(item) for item in value]
+    if isinstance(value, (ObjectId, datetime)):
+        return str(value)
+    return value
+
+def export_cell(value) -> str:
+    """Flatten an answer into one CSV cell, the way the responses page always has."""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "; ".join(str(item) for item in value)
+    if isinstance(value, dict):
+        if value.get("file_id"):
+            return value.get("filename") or "File uploaded"
+        return json.dumps(export_value(value))
+    return str(value)
+
+async def iter_export_lines(cursor, questions: List[dict], export_format: ExportFormat):
+    """Yield the export one cursor batch at a time, so memory stays flat however many responses there are."""
+    question_ids = [question["id"] for question in questions]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == ExportFormat.CSV:
+        writer.writerow(["Response ID", "Submission Date"] + [question["title"] for question in questions])
+    
+    rows = 0
+    async for document in cursor:
+        answers = document.get("answers", {})
+        if export_format == ExportFormat.CSV:
+            writer.writerow(
+                [str(document["_id"]), document["created_at"].isoformat()]
+                + [export_cell(answers.get(question_id)) for question_id in question_ids]
+            )
+        else:
+            buffer.write(json.dumps({
+                "_id": str(document["_id"]),
+                "created_at": document["created_at"].isoformat(),
+                "answers": {question_id: export_value(answers.get(question_id)) for question_id in question_ids},
+            }))
+            buffer.write("\n")
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+# Columnar (Parquet / Arrow) exports: one typed column per question
+ARROW_FILE_TYPE = pa.struct([
+    ("file_id", pa.string()),
+    ("filename", pa.string()),
+    ("content_type", pa.string()),
+    ("size", pa.int64()),
+])
+
+def arrow_question_column(question: dict):
+    """Return the Arrow type for a question's column and a function coercing stored answers to it."""
+    question_type = question.get("type")
+    if question_type in NUMERIC_QUESTION_TYPES:
+        return pa.float64(), lambda value: float(value) if is_number(value) else None
+    if question_type == QuestionType.CHECKBOX:
+        return pa.list_(pa.string()), lambda value: (
+            [str(item) for item in value] if isinstance(value, list)
+            else None if value is None else [str(value)]
+        )
+    if question_type in CHOICE_QUESTION_TYPES:
+        # Few distinct values repeated over many rows, so store them dictionary-encoded
+        return pa.dictionary(pa.int32(), pa.string()), lambda value: None if value is None else str(value)
+    if question_type == QuestionType.FILE:
+        return ARROW_FILE_TYPE, lambda value: {
+            "file_id": value.get("file_id"),
+            "filename": value.get("filename"),
+            "content_type": value.get("content_type"),
+            "size": value.get("size") if is_number(value.get("size")) else None,
+        } if isinstance(value, dict) else None
+    return pa.string(), lambda value: (
+        None if value is None
+        else value if isinstance(value, str)
+        else json.dumps(export_value(value))
+    )
+
+def arrow_schema(questions: List[dict]):
+    fields = [pa.field("_id", pa.string()), pa.field("created_at", pa.timestamp("ms"))]
+    fields += [pa.field(question["id"], arrow_question_column(question)[0]) for question in questions]
+    return pa.schema(fields)
+
+def build_record_batch(schema, questions: List[dict], documents: List[dict]):
+    columns = [
+        pa.array([str(document["_id"]) for document in documents], type=pa.string()),
+        pa.array([document["created_at"] for document in documents], type=pa.timestamp("ms")),
+    ]
+    for question in questions:
+        arrow_type, coerce = arrow_question_column(question)
+        values = [coerce(document.get("answers", {}).get(question["id"])) for document in documents]
+        if pa.types.is_dictionary(arrow_type):
+            columns.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            columns.append(pa.array(values, type=arrow_type))
+    return pa.record_batch(columns, schema=schema)
+
+class ExportSink(io.RawIOBase):
+    """Write-only file object the Arrow writers append to; drain() hands back what they wrote since the last call."""
+    
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self.position
+    
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+async def iter_columnar_export(cursor, questions: List[dict], export_format: ExportFormat):
+    """
+    Yield a Parquet file or Arrow IPC stream built batch by batch from the cursor.
+    
+    Each COLUMNAR_BATCH_SIZE responses become one row group / record batch, so
+    only one batch is held in memory. Arrow uses the IPC stream format because
+    the file format cannot change a column's dictionary between batches.
+    """
+    schema = arrow_schema(questions)
+    sink = ExportSink()
+    if export_format == ExportFormat.PARQUET:
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    
+    documents = []
+    async for document in cursor:
+        documents.append(document)
+        if len(documents) == COLUMNAR_BATCH_SIZE:
+            writer.write_batch(build_record_batch(schema, questions, documents))
+            documents = []
+            yield sink.drain()
+    
+    if documents:
+        writer.write_batch(build_record_batch(schema, questions, documents))
+    writer.close()
+    yield sink.drain()
+
+def export_cursor(form: dict, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Cursor over a form's responses in submission order, optionally limited to start <= created_at < end."""
+    query = {"form_id": form["_id"]}
+    created_at = {}
+    if start:
+        created_at["$gte"] = as_stored_time(start)
+    if end:
+        created_at["$lt"] = as_stored_time(end)
+    if created_at:
+        query["created_at"] = created_at
+    return responses_collection.find(query, {"answers": 1, "created_at": 1}).sort(PAGE_SORT).batch_size(EXPORT_BATCH_SIZE)
+
+def export_content(form: dict, export_format: ExportFormat, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    cursor = export_cursor(form, start, end)
+    questions = form.get("questions", [])
+    if export_format in (ExportFormat.PARQUET, ExportFormat.ARROW):
+        return iter_columnar_export(cursor, questions, export_format)
+    return iter_export_lines(cursor, questions, export_format)
+
+async def gzip_stream(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+@app.get("/forms/{form_id}/export")
+@limiter.limit("10/minute")
+async def export_form_responses(
+    request: Request,
+    form_id: str,
+    export_format: ExportFormat = Query(default=ExportFormat.CSV, alias="format"),
+    gzip: bool = False,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream every response to a form as CSV, NDJSON, Parquet or Arrow.
+    
+    Columns follow the form's questions. Rows come straight off a Mongo
+    cursor in submission order, optionally limited to start <= created_at < end
+    and gzip-compressed on the fly.
+    """
+    if not ObjectId.is_valid(form_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid form ID format"
+        )
     
-    return [FormResponse(**response) for response in responses]
+    # Check if form exists and user is the owner
+    form = await forms_collection.find_one({"_id": ObjectId(form_id)})
+    if not form:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Form not found"
+        )
+    
+    if str(form["creator_id"]) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view responses for this form"
+        )
+    
+    content = export_content(form, export_format, start, end)
+    
+    filename = f"{form['slug']}-responses.{export_format.value}"
+    media_type = EXPORT_MEDIA_TYPES[export_format]
+    if gzip:
+        content = gzip_stream(content)
+        filename += ".gz"
+        media_type = "application/gzip"
+    
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @app.get("/templates", response_model=List[Template])
 @limiter.limit("60/minute")
@@ -915,34 +2728,653 @@ async def get_templates(
     if category:
         query["category"] = category
     
-    templates = list(templates_collection.find(query).skip(skip).limit(limit))
-    return [Template(**template) for template in templates]
+    templates = await templates_collection.find(query).skip(skip).limit(limit).to_list(None)
+    return [Template(**template) for template in templates]
+
+@app.get("/templates/{template_id}", response_model=Template)
+@limiter.limit("60/minute")
+async def get_template_by_id(request: Request, template_id: str):
+    if not ObjectId.is_valid(template_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid template ID format"
+        )
+    
+    template = await templates_collection.find_one({"_id": ObjectId(template_id)})
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Template not found"
+        )
+    
+    return Template(**template)
+
+@app.post("/forms/{form_id}/duplicate", response_model=Form)
+@limiter.limit("30/minute")
+async def duplicate_form(
+    request: Request,
+    form_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    if not ObjectId.is_valid(form_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid form ID format"
+        )
+    
+    # Check if form exists and user is the owner
+    form = await forms_collection.find_one({"_id": ObjectId(form_id)})
+    if not form:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Form not found"
+        )
+    
+    if str(form["creator_id"]) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to duplicate this form"
+        )
+    
+    # Create a duplicate form
+    form_copy = form.copy()
+    form_copy.pop("_id")
+    form_copy["title"] = f"{form['title']} (Copy)"
+    form_copy["created_at"] = datetime.now()
+    form_copy["updated_at"] = datetime.now()
+    form_copy["response_count"] = 0
+    
+    result = await insert_form(form_copy)
+    duplicated_form = await forms_collection.find_one({"_id": result.inserted_id})
+    
+    return Form(**duplicated_form)
+
+@app.post("/forms/{form_id}/toggle-status", response_model=Form)
+@limiter.limit("30/minute")
+async def toggle_form_status(
+    request: Request,
+    form_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    if not ObjectId.is_valid(form_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid form ID format"
+        )
+    
+    # Check if form exists and user is the owner
+    form = await forms_collection.find_one({"_id": ObjectId(form_id)})
+    if not form:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Form not found"
+        )
+    
+    if str(form["creator_id"]) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to modify this form"
+        )
+    
+    # Toggle is_active status
+    new_status = not form["is_active"]
+    await forms_collection.update_one(
+        {"_id": ObjectId(form_id)},
+        {"$set": {"is_active": new_status, "updated_at": datetime.now()}}
+    )
+    form_cache.invalidate(form["slug"])
+    
+    updated_form = await forms_collection.find_one({"_id": ObjectId(form_id)})
+    return Form(**updated_form)
+
+@app.get("/cache/stats")
+@limiter.limit("60/minute")
+async def get_cache_stats(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    return {
+        "forms": form_cache.stats(),
+        "analytics": analytics_cache.stats(),
+        "principals": principal_cache.stats(),
+        "dashboard": dashboard_cache.stats(),
+        "submission_queue": submission_queue.stats(),
+    }
+
+@app.get("/metrics")
+@limiter.limit("60/minute")
+async def get_metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(content=generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
+    return Response(content=generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+@app.get("/user/profile", response_model=User)
+@limiter.limit("60/minute")
+async def get_user_profile(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    return current_user
+
+# Dashboard summary: every form's counts and recent activity from one aggregation, cached briefly per user
+DASHBOARD_DAYS = 7
+DASHBOARD_RECENT_RESPONSES = 5
+
+class DashboardSummary:
+    def __init__(self, user_id: str, body: dict):
+        self.user_id = user_id
+        self.body = body
+
+dashboard_cache = TTLCache(DASHBOARD_CACHE_SIZE, DASHBOARD_CACHE_TTL, key=lambda summary: summary.user_id)
+
+def build_dashboard_pipeline(form_ids: List[ObjectId], since: datetime) -> List[dict]:
+    return [
+        {"$match": {"form_id": {"$in": form_ids}}},
+        {"$facet": {
+            "forms": [
+                {"$group": {"_id": "$form_id", "count": {"$sum": 1}, "last_response_at": {"$max": "$created_at"}}}
+            ],
+            "daily": [
+                {"$match": {"created_at": {"$gte": since}}},
+                {"$group": {
+                    "_id": {"form_id": "$form_id", "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}},
+                    "count": {"$sum": 1}
+                }}
+            ],
+            "recent": [
+                {"$sort": {"created_at": -1}},
+                {"$limit": DASHBOARD_RECENT_RESPONSES},
+                {"$project": {"form_id": 1, "created_at": 1, "answers": 1}}
+            ],
+        }}
+    ]
+
+async def build_dashboard_summary(user_id: ObjectId) -> dict:
+    forms = await forms_collection.find(
+        {"creator_id": user_id},
+        {"title": 1, "slug": 1, "is_active": 1, "created_at": 1, "max_responses": 1, "response_count": 1}
+    ).sort("created_at", -1).to_list(None)
+    
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    days = [(today - timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(DASHBOARD_DAYS - 1, -1, -1)]
+    facets = {"forms": [], "daily": [], "recent": []}
+    if forms:
+        pipeline = build_dashboard_pipeline([form["_id"] for form in forms], today - timedelta(days=DASHBOARD_DAYS - 1))
+        facets = (await responses_collection.aggregate(pipeline).to_list(None))[0]
+    
+    totals = {group["_id"]: group for group in facets["forms"]}
+    daily = {(group["_id"]["form_id"], group["_id"]["day"]): group["count"] for group in facets["daily"]}
+    titles = {form["_id"]: form["title"] for form in forms}
+    
+    form_summaries = []
+    for form in forms:
+        total = totals.get(form["_id"], {})
+        form_summaries.append({
+            "_id": str(form["_id"]),
+            "title": form["title"],
+            "slug": form["slug"],
+            "is_active": form.get("is_active", True),
+            "created_at": form["created_at"],
+            "max_responses": form.get("max_responses"),
+            "response_count": total.get("count", 0),
+            "last_response_at": total.get("last_response_at"),
+            "daily_responses": [daily.get((form["_id"], day), 0) for day in days],
+        })
+    
+    return {
+        "total_forms": len(forms),
+        "active_forms": sum(1 for form in form_summaries if form["is_active"]),
+        "total_responses": sum(form["response_count"] for form in form_summaries),
+        "days": days,
+        "forms": form_summaries,
+        "recent_responses": [
+            {
+                "_id": str(response["_id"]),
+                "form_id": str(response["form_id"]),
+                "form_title": titles.get(response["form_id"]),
+                "created_at": response["created_at"],
+                "answers": response.get("answers", {}),
+            }
+            for response in facets["recent"]
+        ],
+    }
+
+@app.get("/dashboard/summary")
+@limiter.limit("60/minute")
+async def get_dashboard_summary(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Everything the dashboard shows in one request.
+    
+    Per-form response counts, last response time and daily counts for the
+    last DASHBOARD_DAYS days, plus the most recent responses across all of
+    the user's forms. The result is cached per user for DASHBOARD_CACHE_TTL
+    seconds.
+    """
+    summary = dashboard_cache.get(str(current_user.id))
+    if summary is None:
+        summary = DashboardSummary(str(current_user.id), await build_dashboard_summary(current_user.id))
+        dashboard_cache.put(summary)
+    response.headers["Cache-Control"] = f"private, max-age={int(DASHBOARD_CACHE_TTL)}"
+    return summary.body
+
+def build_stats_pipeline(form: dict, since: datetime) -> List[dict]:
+    """
+    Build the single $facet aggregation behind the stats endpoint.
+    
+    Every statistic that used to be its own pipeline over the form's responses
+    becomes one facet, so the responses are read once. Facets are named by
+    question position ("q{index}_...") because question ids may contain
+    characters that are not allowed in field names.
+    """
+    facets = {
+        "total": [{"$count": "count"}],
+        "daily": [
+            {"$match": {"created_at": {"$gte": since}}},
+            {
+                "$group": {
+                    "_id": {
+                        "year": {"$year": "$created_at"},
+                        "month": {"$month": "$created_at"},
+                        "day": {"$dayOfMonth": "$created_at"}
+                    },
+                    "count": {"$sum": 1}
+                }
+            },
+            {"$sort": {"_id.year": 1, "_id.month": 1, "_id.day": 1}}
+        ],
+    }
+    for index, question in enumerate(form["questions"]):
+        question_id = question["id"]
+        question_type = question["type"]
+        answer_path = f"$answers.{question_id}"
+        
+        if question_type in [QuestionType.MULTIPLE_CHOICE, QuestionType.CHECKBOX, QuestionType.DROPDOWN]:
+            facets[f"q{index}_options"] = [
+                {"$unwind": {"path": answer_path, "preserveNullAndEmptyArrays": True}},
+                {"$group": {"_id": answer_path, "count": {"$sum": 1}}}
+            ]
+        elif question_type in [QuestionType.RATING, QuestionType.SCALE, QuestionType.NUMBER]:
+            facets[f"q{index}_numeric"] = [
+                {
+                    "$group": {
+                        "_id": None,
+                        "average": {"$avg": answer_path},
+                        "min": {"$min": answer_path},
+                        "max": {"$max": answer_path},
+                        "count": {"$sum": 1}
+                    }
+                }
+            ]
+            facets[f"q{index}_distribution"] = [
+                {"$group": {"_id": answer_path, "count": {"$sum": 1}}},
+                {"$sort": {"_id": 1}}
+            ]
+        else:
+            # File questions count answers that reference a stored file, other questions any answer
+            answered = f"answers.{question_id}.file_id" if question_type == QuestionType.FILE else f"answers.{question_id}"
+            facets[f"q{index}_count"] = [
+                {"$match": {answered: {"$exists": True}}},
+                {"$count": "count"}
+            ]
+            facets[f"q{index}_samples"] = [
+                {"$match": {answered: {"$exists": True}}},
+                {"$project": {"sample": answer_path}},
+                {"$limit": 5}
+            ]
+    
+    return [
+        {"$match": {"form_id": form["_id"]}},
+        {"$facet": facets}
+    ]
+
+def summarize_stats_facets(form: dict, facets: dict) -> dict:
+    """Shape the output of build_stats_pipeline into the stats endpoint's summary fields."""
+    # Get total responses
+    response_count = form["response_count"]
+    
+    # Get response over time data (last 30 days)
+    daily_responses = [
+        {
+            "date": f"{item['_id']['year']}-{item['_id']['month']:02d}-{item['_id']['day']:02d}",
+            "count": item["count"]
+        }
+        for item in facets["daily"]
+    ]
+    
+    # Prepare response summary for each question
+    question_stats = {}
+    for index, question in enumerate(form["questions"]):
+        question_id = question["id"]
+        question_type = question["type"]
+        
+        if question_type in [QuestionType.MULTIPLE_CHOICE, QuestionType.CHECKBOX, QuestionType.DROPDOWN]:
+            # For choice-based questions, count occurrences of each option
+            option_counts = facets[f"q{index}_options"]
+            question_stats[question_id] = {
+                "type": question_type,
+                "title": question["title"],
+                "option_counts": {str(item["_id"]): item["count"] for item in option_counts}
+            }
+        elif question_type in [QuestionType.RATING, QuestionType.SCALE, QuestionType.NUMBER]:
+            # For numeric questions, calculate average and distribution
+            numeric_stats = facets[f"q{index}_numeric"]
+            value_distribution = facets[f"q{index}_distribution"]
+            
+            stats_data = {"type": question_type, "title": question["title"]}
+            if numeric_stats:
+                stats_data.update({
+                    "average": numeric_stats[0]["average"],
+                    "min": numeric_stats[0]["min"],
+                    "max": numeric_stats[0]["max"],
+                    "count": numeric_stats[0]["count"],
+                })
+            stats_data["distribution"] = {str(item["_id"]): item["count"] for item in value_distribution}
+            question_stats[question_id] = stats_data
+        elif question_type == QuestionType.FILE:
+            # For file uploads, count number of files and get sample metadata
+            file_stats = facets[f"q{index}_count"]
+            sample_files = facets[f"q{index}_samples"]
+            
+            file_count = file_stats[0]["count"] if file_stats else 0
+            
+            question_stats[question_id] = {
+                "type": question_type,
+                "title": question["title"],
+                "file_count": file_count,
+                "sample_files": [item["sample"] for item in sample_files]
+            }
+        else:
+            # For text-based questions, count responses and get sample answers
+            text_stats = facets[f"q{index}_count"]
+            sample_answers = facets[f"q{index}_samples"]
+            
+            response_count = text_stats[0]["count"] if text_stats else 0
+            question_stats[question_id] = {
+                "type": question_type,
+                "title": question["title"],
+                "response_count": response_count,
+                "sample_answers": [item["sample"] for item in sample_answers]
+            }
+    
+    total = facets["total"]
+    return {
+        "response_count": response_count,
+        "daily_responses": daily_responses,
+        "question_stats": question_stats,
+        "total_starts": total[0]["count"] if total else 0,
+    }
+
+# Incrementally maintained per-form statistics
+STATS_CHOICE_TYPES = {QuestionType.MULTIPLE_CHOICE, QuestionType.CHECKBOX, QuestionType.DROPDOWN}
+
+def rollup_key(value: str) -> str:
+    # Answer values and question ids become field names, which cannot be empty or contain "." or lead with "$"
+    return "_" + value.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+def rollup_value(key: str) -> str:
+    return key[1:].replace("%24", "$").replace("%2E", ".").replace("%25", "%")
+
+def stats_schema(questions: List[dict]) -> str:
+    """Fingerprint of the question ids and types a rollup was built for."""
+    return hashlib.sha1("\n".join(f"{q['id']}:{q['type']}" for q in questions).encode()).hexdigest()
+
+def rollup_update(questions: List[dict], response: dict) -> dict:
+    """
+    Build the update that folds one response into its form's stats rollup.
+    
+    The rollup holds the total, per-day counts, per-option counts for choice
+    questions, running sum/min/max and value counts for numeric questions and
+    counts plus the first five samples for file and text questions.
+    """
+    answers = response["answers"]
+    # generation counts the writes to a rollup, so a rebuild can tell whether any landed while it scanned
+    inc = {"total": 1, "generation": 1, f"daily.{response['created_at'].strftime('%Y-%m-%d')}": 1}
+    min_values, max_values, push = {}, {}, {}
+    for question in questions:
+        question_id = question["id"]
+        question_type = question["type"]
+        prefix = f"questions.{rollup_key(question_id)}"
+        answer = answers.get(question_id)
+        
+        if question_type in STATS_CHOICE_TYPES:
+            # Mirrors $unwind with preserveNullAndEmptyArrays: missing and empty answers count as None
+            values = answer if isinstance(answer, list) and answer else [answer]
+            for value in values:
+                path = f"{prefix}.options.{rollup_key(str(value))}"
+                inc[path] = inc.get(path, 0) + 1
+        elif question_type in NUMERIC_QUESTION_TYPES:
+            inc[f"{prefix}.distribution.{rollup_key(str(answer))}"] = 1
+            if is_number(answer):
+                inc[f"{prefix}.sum"] = answer
+                inc[f"{prefix}.numeric_count"] = 1
+                min_values[f"{prefix}.min"] = answer
+                max_values[f"{prefix}.max"] = answer
+        elif question_type == QuestionType.FILE:
+            if isinstance(answer, dict) and "file_id" in answer:
+                inc[f"{prefix}.count"] = 1
+                push[f"{prefix}.samples"] = {"$each": [answer], "$slice": 5}
+        elif question_id in answers:
+            inc[f"{prefix}.count"] = 1
+            push[f"{prefix}.samples"] = {"$each": [answer], "$slice": 5}
+    
+    update = {"$inc": inc}
+    if min_values:
+        update["$min"] = min_values
+        update["$max"] = max_values
+    if push:
+        update["$push"] = push
+    return update
+
+def merge_rollup_updates(updates: List[dict]) -> dict:
+    """Combine rollup updates for the same form into one, in submission order."""
+    merged = {"$inc": {}, "$min": {}, "$max": {}, "$push": {}}
+    for update in updates:
+        for path, amount in update.get("$inc", {}).items():
+            merged["$inc"][path] = merged["$inc"].get(path, 0) + amount
+        for path, value in update.get("$min", {}).items():
+            merged["$min"][path] = min(merged["$min"].get(path, value), value)
+        for path, value in update.get("$max", {}).items():
+            merged["$max"][path] = max(merged["$max"].get(path, value), value)
+        for path, value in update.get("$push", {}).items():
+            merged["$push"].setdefault(path, {"$each": [], "$slice": 5})["$each"].extend(value["$each"])
+    return {operator: fields for operator, fields in merged.items() if fields}
+
+def apply_rollup_update(rollup: dict, update: dict):
+    """Apply a rollup_update() result to an in-memory rollup document."""
+    def parent(path):
+        node = rollup
+        *parents, leaf = path.split(".")
+        for name in parents:
+            node = node.setdefault(name, {})
+        return node, leaf
+    
+    for path, amount in update.get("$inc", {}).items():
+        node, leaf = parent(path)
+        node[leaf] = node.get(leaf, 0) + amount
+    for path, value in update.get("$min", {}).items():
+        node, leaf = parent(path)
+        node[leaf] = min(node.get(leaf, value), value)
+    for path, value in update.get("$max", {}).items():
+        node, leaf = parent(path)
+        node[leaf] = max(node.get(leaf, value), value)
+    for path, value in update.get("$push", {}).items():
+        node, leaf = parent(path)
+        node[leaf] = (node.get(leaf, []) + value["$each"])[:value["$slice"]]
+
+async def record_response_stats(form_id: ObjectId, update: dict):
+    # Stats are best effort; a failed rollup update must not fail the submission
+    try:
+        await stats_collection.update_one({"_id": form_id}, update, upsert=True)
+    except Exception as e:
+        logger.error(f"Error updating stats rollup for form {form_id}: {str(e)}")
+
+STATS_REBUILD_ATTEMPTS = 3
+
+async def rebuild_stats_rollup(form: dict) -> Optional[dict]:
+    """
+    Recompute a form's stats rollup from its raw responses and store it.
+    
+    Submits keep updating the stored rollup during the scan, each bumping its
+    generation. The rebuilt rollup only replaces the stored one while the
+    generation is unchanged, so no concurrent update is overwritten; otherwise
+    the scan is repeated, up to STATS_REBUILD_ATTEMPTS times. Returns None if
+    every attempt was overtaken by new responses.
+    """
+    for attempt in range(STATS_REBUILD_ATTEMPTS):
+        stored = await stats_collection.find_one({"_id": form["_id"]}, {"generation": 1})
+        rollup = {"_id": form["_id"], "schema": stats_schema(form["questions"]), "rebuilt_at": datetime.now()}
+        responses = responses_collection.find(
+            {"form_id": form["_id"]},
+            {"answers": 1, "created_at": 1}
+        )
+        async for response in responses:
+            apply_rollup_update(rollup, rollup_update(form["questions"], response))
+        
+        if stored is None:
+            rollup["generation"] = 0
+            try:
+                await stats_collection.insert_one(rollup)
+                replaced = True
+            except DuplicateKeyError:
+                replaced = False  # A submit created the rollup during the scan
+        else:
+            rollup["generation"] = stored.get("generation", 0)
+            result = await stats_collection.replace_one({"_id": form["_id"], "generation": stored.get("generation")}, rollup)
+            replaced = result.matched_count == 1
+        if replaced:
+            logger.info(f"Rebuilt stats rollup for form {form['_id']} from {rollup.get('total', 0)} responses")
+            return rollup
+    logger.warning(f"Stats rollup for form {form['_id']} kept changing during {STATS_REBUILD_ATTEMPTS} rebuilds")
+    return None
+
+# Forms whose rollup is being rebuilt in the background, so each is rebuilt once at a time per worker
+stats_rebuilds: Dict[ObjectId, asyncio.Task] = {}
+
+async def run_stats_rebuild(form: dict):
+    try:
+        await rebuild_stats_rollup(form)
+    except Exception as e:
+        logger.error(f"Error rebuilding stats rollup for form {form['_id']}: {str(e)}")
+    finally:
+        stats_rebuilds.pop(form["_id"], None)
+
+def schedule_stats_rebuild(form: dict):
+    if form["_id"] not in stats_rebuilds:
+        stats_rebuilds[form["_id"]] = asyncio.create_task(run_stats_rebuild(form))
+
+async def get_stats_rollup(form: dict):
+    """
+    Return the form's stored rollup and whether it is current.
+    
+    A rollup that is missing or was built for other questions is rebuilt in
+    the background; until then the stored one (or an empty one) is served.
+    """
+    rollup = await stats_collection.find_one({"_id": form["_id"]})
+    if rollup and rollup.get("schema") == stats_schema(form["questions"]):
+        return rollup, True
+    schedule_stats_rebuild(form)
+    return rollup or {}, False
+
+def distribution_order(key: str):
+    # Approximates the BSON order of the aggregation's $sort: missing values, numbers, then the rest
+    if key == "None":
+        return (0, 0.0, "")
+    try:
+        return (1, float(key), "")
+    except ValueError:
+        return (2, 0.0, key)
+
+def summarize_stats_rollup(form: dict, rollup: dict) -> dict:
+    """Shape a stats rollup into the same summary fields as summarize_stats_facets()."""
+    # Get total responses
+    response_count = form["response_count"]
+    total = rollup.get("total", 0)
+    
+    # Get response over time data (last 30 days)
+    first_day = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    daily_responses = [
+        {"date": day, "count": count}
+        for day, count in sorted(rollup.get("daily", {}).items())
+        if day >= first_day
+    ]
+    
+    # Prepare response summary for each question
+    question_stats = {}
+    for question in form["questions"]:
+        question_id = question["id"]
+        question_type = question["type"]
+        data = rollup.get("questions", {}).get(rollup_key(question_id), {})
+        
+        if question_type in STATS_CHOICE_TYPES:
+            question_stats[question_id] = {
+                "type": question_type,
+                "title": question["title"],
+                "option_counts": {rollup_value(key): count for key, count in data.get("options", {}).items()}
+            }
+        elif question_type in NUMERIC_QUESTION_TYPES:
+            stats_data = {"type": question_type, "title": question["title"]}
+            if total:
+                numeric_count = data.get("numeric_count", 0)
+                stats_data.update({
+                    "average": data["sum"] / numeric_count if numeric_count else None,
+                    "min": data.get("min"),
+                    "max": data.get("max"),
+                    "count": total,
+                })
+            distribution = {rollup_value(key): count for key, count in data.get("distribution", {}).items()}
+            stats_data["distribution"] = {key: distribution[key] for key in sorted(distribution, key=distribution_order)}
+            question_stats[question_id] = stats_data
+        elif question_type == QuestionType.FILE:
+            question_stats[question_id] = {
+                "type": question_type,
+                "title": question["title"],
+                "file_count": data.get("count", 0),
+                "sample_files": data.get("samples", [])
+            }
+        else:
+            response_count = data.get("count", 0)
+            question_stats[question_id] = {
+                "type": question_type,
+                "title": question["title"],
+                "response_count": response_count,
+                "sample_answers": data.get("samples", [])
+            }
+    
+    return {
+        "response_count": response_count,
+        "daily_responses": daily_responses,
+        "question_stats": question_stats,
+        "total_starts": total,
+    }
 
-@app.get("/templates/{template_id}", response_model=Template)
+@app.get("/forms/{form_id}/stats")
 @limiter.limit("60/minute")
-async def get_template_by_id(request: Request, template_id: str):
-    if not ObjectId.is_valid(template_id):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid template ID format"
-        )
-    
-    template = templates_collection.find_one({"_id": ObjectId(template_id)})
-    if not template:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Template not found"
-        )
-    
-    return Template(**template)
-
-@app.post("/forms/{form_id}/duplicate", response_model=Form)
-@limiter.limit("30/minute")
-async def duplicate_form(
+async def get_form_stats(
     request: Request,
     form_id: str,
+    exact: bool = False,
     current_user: User = Depends(get_current_user)
 ):
+    """
+    Summarize a form's responses.
+    
+    Served from the incrementally maintained rollup by default; exact=true
+    recomputes everything from the raw responses in one aggregation.
+    stats_status is "rebuilding" while a missing or outdated rollup is
+    recomputed in the background.
+    """
     if not ObjectId.is_valid(form_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -950,7 +3382,7 @@ async def duplicate_form(
         )
     
     # Check if form exists and user is the owner
-    form = forms_collection.find_one({"_id": ObjectId(form_id)})
+    form = await forms_collection.find_one({"_id": ObjectId(form_id)})
     if not form:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -960,26 +3392,47 @@ async def duplicate_form(
     if str(form["creator_id"]) != str(current_user.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to duplicate this form"
+            detail="Not authorized to view stats for this form"
         )
     
-    # Create a duplicate form
-    form_copy = form.copy()
-    form_copy.pop("_id")
-    form_copy["title"] = f"{form['title']} (Copy)"
-    form_copy["created_at"] = datetime.now()
-    form_copy["updated_at"] = datetime.now()
-    form_copy["slug"] = generate_slug(8)
-    form_copy["response_count"] = 0
+    if exact:
+        # One aggregation computes every statistic over a single scan of the form's responses
+        thirty_days_ago = datetime.now() - timedelta(days=30)
+        facets = (await responses_collection.aggregate(
+            build_stats_pipeline(form, thirty_days_ago)
+        ).to_list(None))[0]
+        summary = summarize_stats_facets(form, facets)
+        stats_status = "exact"
+    else:
+        rollup, current = await get_stats_rollup(form)
+        summary = summarize_stats_rollup(form, rollup)
+        stats_status = "current" if current else "rebuilding"
     
-    result = forms_collection.insert_one(form_copy)
-    duplicated_form = forms_collection.find_one({"_id": result.inserted_id})
+    # Completion rate statistics
+    response_count = summary["response_count"]
+    total_starts = summary["total_starts"]
+    completion_stats = {
+        "started": total_starts,
+        "completed": response_count,  # Assuming all submitted forms are complete
+        "completion_rate": (response_count / total_starts * 100) if total_starts > 0 else 0.0
+    }
     
-    return Form(**duplicated_form)
+    return {
+        "form_id": form_id,
+        "title": form["title"],
+        "response_count": response_count,
+        "daily_responses": summary["daily_responses"],
+        "question_stats": summary["question_stats"],
+        "completion_stats": completion_stats,
+        "stats_status": stats_status,
+        "is_active": form["is_active"],
+        "created_at": form["created_at"].isoformat(),
+        "updated_at": form["updated_at"].isoformat()
+    }
 
-@app.post("/forms/{form_id}/toggle-status", response_model=Form)
-@limiter.limit("30/minute")
-async def toggle_form_status(
+@app.post("/forms/{form_id}/stats/rebuild")
+@limiter.limit("5/minute")
+async def rebuild_form_stats(
     request: Request,
     form_id: str,
     current_user: User = Depends(get_current_user)
@@ -991,7 +3444,7 @@ async def toggle_form_status(
         )
     
     # Check if form exists and user is the owner
-    form = forms_collection.find_one({"_id": ObjectId(form_id)})
+    form = await forms_collection.find_one({"_id": ObjectId(form_id)})
     if not form:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1004,39 +3457,277 @@ async def toggle_form_status(
             detail="Not authorized to modify this form"
         )
     
-    # Toggle is_active status
-    new_status = not form["is_active"]
-    forms_collection.update_one(
-        {"_id": ObjectId(form_id)},
-        {"$set": {"is_active": new_status, "updated_at": datetime.now()}}
-    )
+    rollup = await rebuild_stats_rollup(form)
+    if rollup is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Responses kept arriving during the rebuild, please try again"
+        )
+    return {"form_id": form_id, "total": rollup.get("total", 0), "rebuilt_at": rollup["rebuilt_at"].isoformat()}
+
+# Vectorized analytics over a form's answers, held in NumPy columns per form
+class FormColumns:
+    """
+    A form's answers loaded into NumPy columns.
     
-    updated_form = forms_collection.find_one({"_id": ObjectId(form_id)})
-    return Form(**updated_form)
+    Numeric questions become float64 arrays (NaN when unanswered), single
+    choice questions int32 codes into their categories (-1 when unanswered)
+    and checkbox questions a boolean matrix with one column per category.
+    Other question types are not loaded.
+    """
+    def __init__(self, form: dict):
+        self.form_id = form["_id"]
+        self.questions = {}
+        for question in form.get("questions", []):
+            if question["type"] in NUMERIC_QUESTION_TYPES | STATS_CHOICE_TYPES:
+                self.questions[question["id"]] = question
+        self.projection = {"created_at": 1, **{f"answers.{question_id}": 1 for question_id in self.questions}}
+        self.size = 0
+        self.created_at = np.empty(0, dtype="datetime64[ms]")
+        self.numeric: Dict[str, np.ndarray] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        self.selected: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, List[str]] = {}
+        self.lookups: Dict[str, Dict[str, int]] = {}
+        for question_id, question in self.questions.items():
+            if question["type"] in NUMERIC_QUESTION_TYPES:
+                self.numeric[question_id] = np.empty(0, dtype=np.float64)
+                continue
+            # Declared options come first, in form order; unexpected stored values are appended as seen
+            values = [str(option["value"]) for option in question.get("options") or []]
+            self.categories[question_id] = list(dict.fromkeys(values))
+            self.lookups[question_id] = {value: index for index, value in enumerate(self.categories[question_id])}
+            if question["type"] == QuestionType.CHECKBOX:
+                self.selected[question_id] = np.zeros((0, len(self.categories[question_id])), dtype=bool)
+            else:
+                self.codes[question_id] = np.empty(0, dtype=np.int32)
+        self.latest: Optional[datetime] = None  # created_at of the newest loaded row
+        self.recent: Dict[ObjectId, datetime] = {}  # Loaded rows inside the append overlap window
+    
+    @classmethod
+    async def load(cls, form: dict) -> "FormColumns":
+        columns = cls(form)
+        await columns.extend()
+        return columns
+    
+    def code(self, question_id: str, value) -> int:
+        value = str(value)
+        lookup = self.lookups[question_id]
+        if value not in lookup:
+            lookup[value] = len(self.categories[question_id])
+            self.categories[question_id].append(value)
+        return lookup[value]
+    
+    async def extend(self):
+        """
+        Append the responses stored since the newest loaded row.
+        
+        A keyset read on (created_at, _id) from ANALYTICS_APPEND_OVERLAP before
+        that row: a queued submit can be stored after a later one, so rows in
+        the overlap are re-read and those already loaded are skipped. The
+        columns are swapped in without awaiting, so readers never see a
+        partial append.
+        """
+        query = {"form_id": self.form_id}
+        if self.latest is not None:
+            query["created_at"] = {"$gte": self.latest - ANALYTICS_APPEND_OVERLAP}
+        numeric = {question_id: [] for question_id in self.numeric}
+        codes = {question_id: [] for question_id in self.codes}
+        selected = {question_id: ([], []) for question_id in self.selected}
+        created_at = []
+        recent = {}
+        cursor = responses_collection.find(query, self.projection).sort(PAGE_SORT).batch_size(EXPORT_BATCH_SIZE)
+        async for document in cursor:
+            if document["_id"] in self.recent:
+                continue
+            row = len(created_at)
+            created_at.append(document["created_at"])
+            recent[document["_id"]] = document["created_at"]
+            answers = document.get("answers", {})
+            for question_id, values in numeric.items():
+                value = answers.get(question_id)
+                values.append(float(value) if is_number(value) else math.nan)
+            for question_id, values in codes.items():
+                value = answers.get(question_id)
+                values.append(-1 if value is None else self.code(question_id, value))
+            for question_id, (rows, values) in selected.items():
+                value = answers.get(question_id)
+                for item in value if isinstance(value, list) else [] if value is None else [value]:
+                    rows.append(row)
+                    values.append(self.code(question_id, item))
+        if not created_at:
+            return
+        
+        size = self.size + len(created_at)
+        latest = max(created_at) if self.latest is None else max(self.latest, max(created_at))
+        created_at_column = np.concatenate([self.created_at, np.array(created_at, dtype="datetime64[ms]")])
+        numeric_columns = {question_id: np.concatenate([self.numeric[question_id], np.array(values, dtype=np.float64)])
+                           for question_id, values in numeric.items()}
+        code_columns = {question_id: np.concatenate([self.codes[question_id], np.array(values, dtype=np.int32)])
+                        for question_id, values in codes.items()}
+        selected_columns = {}
+        for question_id, (rows, values) in selected.items():
+            previous = self.selected[question_id]
+            matrix = np.zeros((size, len(self.categories[question_id])), dtype=bool)
+            matrix[:self.size, :previous.shape[1]] = previous
+            matrix[self.size + np.array(rows, dtype=np.int64), np.array(values, dtype=np.int64)] = True
+            selected_columns[question_id] = matrix
+        
+        self.size = size
+        self.created_at = created_at_column
+        self.numeric = numeric_columns
+        self.codes = code_columns
+        self.selected = selected_columns
+        self.latest = latest
+        self.recent = {response_id: submitted for response_id, submitted in {**self.recent, **recent}.items()
+                       if submitted >= latest - ANALYTICS_APPEND_OVERLAP}
+    
+    def question(self, question_id: str) -> dict:
+        if question_id not in self.questions:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Question {question_id} is not a numeric or choice question of this form"
+            )
+        return self.questions[question_id]
+    
+    def filter_mask(self, expression: str) -> np.ndarray:
+        """Evaluate a parse_answer_filter() expression over the loaded columns."""
+        question_id, operator, values = parse_answer_filter(expression)
+        self.question(question_id)
+        
+        if question_id in self.numeric:
+            column = self.numeric[question_id]
+            try:
+                numbers = [float(item) for item in values]
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Filter on {question_id} needs a numeric value"
+                )
+            comparisons = {
+                "eq": np.equal, "ne": np.not_equal, "gt": np.greater,
+                "gte": np.greater_equal, "lt": np.less, "lte": np.less_equal,
+            }
+            if operator == "in":
+                return np.isin(column, numbers)
+            return comparisons[operator](column, numbers[0]) & ~np.isnan(column)
+        
+        if operator not in ("eq", "ne", "in"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Operator {operator!r} only applies to numeric questions"
+            )
+        categories = self.categories[question_id]
+        indexes = [categories.index(item) for item in values if item in categories]
+        if question_id in self.codes:
+            column = self.codes[question_id]
+            mask = np.isin(column, indexes)
+            return mask if operator != "ne" else ~mask & (column >= 0)
+        matrix = self.selected[question_id]
+        mask = matrix[:, indexes].any(axis=1)
+        return mask if operator != "ne" else ~mask & matrix.any(axis=1)
+    
+    def groups(self, question_id: str, mask: np.ndarray):
+        """Split the masked rows by a question's answer; a checkbox row belongs to every option it selected."""
+        if question_id in self.numeric:
+            column = self.numeric[question_id]
+            for value in np.unique(column[mask & ~np.isnan(column)]):
+                yield float(value), mask & (column == value)
+        elif question_id in self.codes:
+            column = self.codes[question_id]
+            for index, value in enumerate(self.categories[question_id]):
+                yield value, mask & (column == index)
+        else:
+            matrix = self.selected[question_id]
+            for index, value in enumerate(self.categories[question_id]):
+                yield value, mask & matrix[:, index]
+    
+    def summarize(self, question_id: str, mask: np.ndarray, percentiles: List[float]) -> dict:
+        """Percentiles and mean (plus NPS on 0-10 scales) for numeric questions, counts per option otherwise."""
+        question = self.questions[question_id]
+        if question_id in self.numeric:
+            values = self.numeric[question_id][mask]
+            values = values[~np.isnan(values)]
+            summary = {"count": int(values.size)}
+            if values.size:
+                summary.update(
+                    mean=float(values.mean()),
+                    min=float(values.min()),
+                    max=float(values.max()),
+                    percentiles=dict(zip((f"p{p:g}" for p in percentiles), np.percentile(values, percentiles).tolist()))
+                )
+                if question.get("max_value") == 10:
+                    promoters = np.count_nonzero(values >= 9)
+                    detractors = np.count_nonzero(values <= 6)
+                    summary["nps"] = round(100 * (promoters - detractors) / values.size, 1)
+            return summary
+        
+        categories = self.categories[question_id]
+        if question_id in self.codes:
+            column = self.codes[question_id][mask]
+            answered = column[column >= 0]
+            counts = np.bincount(answered, minlength=len(categories))
+            count = answered.size
+        else:
+            matrix = self.selected[question_id][mask]
+            counts = matrix.sum(axis=0)
+            count = np.count_nonzero(matrix.any(axis=1))
+        return {"count": int(count), "options": dict(zip(categories, counts.tolist()))}
 
-@app.get("/user/profile", response_model=User)
-@limiter.limit("60/minute")
-async def get_user_profile(
-    request: Request,
-    current_user: User = Depends(get_current_user)
-):
-    return current_user
+ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "32"))
+ANALYTICS_APPEND_OVERLAP = timedelta(seconds=5)  # Covers queue flush delays and clock skew between workers
+ANALYTICS_CACHE_TTL = float(os.getenv("ANALYTICS_CACHE_TTL", "300"))  # seconds; bounds staleness of question edits from other workers
 
-@app.get("/forms/{form_id}/stats")
-@limiter.limit("60/minute")
-async def get_form_stats(
+analytics_cache = TTLCache(ANALYTICS_CACHE_SIZE, ANALYTICS_CACHE_TTL, key=lambda columns: columns.form_id)
+analytics_loads: Dict[ObjectId, asyncio.Task] = {}  # In-flight load or extend per form
+
+async def refresh_form_columns(form: dict) -> FormColumns:
+    columns = analytics_cache.get(form["_id"])
+    if columns is None:
+        columns = await FormColumns.load(form)
+        analytics_cache.put(columns)
+    elif form.get("response_count", 0) != columns.size:
+        await columns.extend()
+    return columns
+
+async def get_form_columns(form: dict) -> FormColumns:
+    """The form's cached columns, brought up to date; concurrent requests for a form share one load."""
+    load = analytics_loads.get(form["_id"])
+    if load is None:
+        load = asyncio.ensure_future(refresh_form_columns(form))
+        analytics_loads[form["_id"]] = load
+        load.add_done_callback(lambda _: analytics_loads.pop(form["_id"], None))
+    # Shielded so a disconnecting client does not cancel the load other requests are waiting on
+    return await asyncio.shield(load)
+
+@app.get("/forms/{form_id}/analytics")
+@limiter.limit("120/minute")
+async def get_form_analytics(
     request: Request,
     form_id: str,
+    metric: Optional[str] = None,
+    group_by: Optional[str] = None,
+    where: List[str] = Query(default=[]),
+    percentiles: List[float] = Query(default=[25, 50, 75, 90]),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
     current_user: User = Depends(get_current_user)
 ):
+    """
+    Cross-tabulate a form's answers.
+    
+    Responses are filtered by every `where` expression and the date range,
+    then `metric` is summarized overall and for each answer to `group_by`
+    (e.g. metric=rating&group_by=attendance). Runs over cached NumPy columns,
+    extended with the responses stored since they were loaded.
+    """
     if not ObjectId.is_valid(form_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid form ID format"
         )
     
-    # Check if form exists and user is the owner
-    form = forms_collection.find_one({"_id": ObjectId(form_id)})
+    form = await forms_collection.find_one({"_id": ObjectId(form_id)})
     if not form:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1046,167 +3737,43 @@ async def get_form_stats(
     if str(form["creator_id"]) != str(current_user.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view stats for this form"
+            detail="Not authorized to view analytics for this form"
         )
     
-    # Get total responses
-    response_count = form["response_count"]
-    
-    # Get response over time data (last 30 days)
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    daily_responses = list(responses_collection.aggregate([
-        {
-            "$match": {
-                "form_id": ObjectId(form_id),
-                "created_at": {"$gte": thirty_days_ago}
-            }
-        },
-        {
-            "$group": {
-                "_id": {
-                    "year": {"$year": "$created_at"},
-                    "month": {"$month": "$created_at"},
-                    "day": {"$dayOfMonth": "$created_at"}
-                },
-                "count": {"$sum": 1}
-            }
-        },
-        {"$sort": {"_id.year": 1, "_id.month": 1, "_id.day": 1}}
-    ]))
+    if any(not 0 <= p <= 100 for p in percentiles):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Percentiles must be between 0 and 100"
+        )
     
-    # Prepare response summary for each question
-    question_stats = {}
-    for question in form["questions"]:
-        question_id = question["id"]
-        question_type = question["type"]
-        
-        if question_type in [QuestionType.MULTIPLE_CHOICE, QuestionType.CHECKBOX, QuestionType.DROPDOWN]:
-            # For choice-based questions, count occurrences of each option
-            option_counts = list(responses_collection.aggregate([
-                {"$match": {"form_id": ObjectId(form_id)}},
-                {"$unwind": {"path": f"$answers.{question_id}", "preserveNullAndEmptyArrays": True}},
-                {
-                    "$group": {
-                        "_id": f"$answers.{question_id}",
-                        "count": {"$sum": 1}
-                    }
-                }
-            ]))
-            question_stats[question_id] = {
-                "type": question_type,
-                "title": question["title"],
-                "option_counts": {str(item["_id"]): item["count"] for item in option_counts}
-            }
-        elif question_type in [QuestionType.RATING, QuestionType.SCALE, QuestionType.NUMBER]:
-            # For numeric questions, calculate average and distribution
-            numeric_stats = list(responses_collection.aggregate([
-                {"$match": {"form_id": ObjectId(form_id)}},
-                {
-                    "$group": {
-                        "_id": None,
-                        "average": {"$avg": f"$answers.{question_id}"},
-                        "min": {"$min": f"$answers.{question_id}"},
-                        "max": {"$max": f"$answers.{question_id}"},
-                        "count": {"$sum": 1}
-                    }
-                }
-            ]))
-            
-            # Get distribution of values
-            value_distribution = list(responses_collection.aggregate([
-                {"$match": {"form_id": ObjectId(form_id)}},
-                {
-                    "$group": {
-                        "_id": f"$answers.{question_id}",
-                        "count": {"$sum": 1}
-                    }
-                },
-                {"$sort": {"_id": 1}}
-            ]))
-            
-            stats_data = {"type": question_type, "title": question["title"]}
-            if numeric_stats:
-                stats_data.update({
-                    "average": numeric_stats[0]["average"],
-                    "min": numeric_stats[0]["min"],
-                    "max": numeric_stats[0]["max"],
-                    "count": numeric_stats[0]["count"],
-                })
-            stats_data["distribution"] = {str(item["_id"]): item["count"] for item in value_distribution}
-            question_stats[question_id] = stats_data
-        elif question_type == QuestionType.FILE:
-            # For file uploads, count number of files and get statistics
-            file_stats = list(responses_collection.aggregate([
-                {"$match": {"form_id": ObjectId(form_id)}},
-                {"$match": {f"answers.{question_id}.file_id": {"$exists": True}}},
-                {"$count": "file_count"}
-            ]))
-            
-            file_count = file_stats[0]["file_count"] if file_stats else 0
-            
-            # Get sample file metadata (limit to 5)
-            sample_files = list(responses_collection.aggregate([
-                {"$match": {"form_id": ObjectId(form_id)}},
-                {"$match": {f"answers.{question_id}.file_id": {"$exists": True}}},
-                {"$project": {"file_metadata": f"$answers.{question_id}"}},
-                {"$limit": 5}
-            ]))
-            
-            question_stats[question_id] = {
-                "type": question_type,
-                "title": question["title"],
-                "file_count": file_count,
-                "sample_files": [item["file_metadata"] for item in sample_files]
-            }
-        else:
-            # For text-based questions, count responses and get sample answers
-            text_stats = list(responses_collection.aggregate([
-                {"$match": {"form_id": ObjectId(form_id)}},
-                {"$match": {f"answers.{question_id}": {"$exists": True}}},
-                {"$count": "response_count"}
-            ]))
-            
-            # Get sample answers (limit to 5)
-            sample_answers = list(responses_collection.aggregate([
-                {"$match": {"form_id": ObjectId(form_id)}},
-                {"$match": {f"answers.{question_id}": {"$exists": True}}},
-                {"$project": {"answer": f"$answers.{question_id}"}},
-                {"$limit": 5}
-            ]))
-            
-            response_count = text_stats[0]["response_count"] if text_stats else 0
-            question_stats[question_id] = {
-                "type": question_type,
-                "title": question["title"],
-                "response_count": response_count,
-                "sample_answers": [item["answer"] for item in sample_answers]
-            }
+    columns = await get_form_columns(form)
+    for question_id in (metric, group_by):
+        if question_id:
+            columns.question(question_id)
     
-    # Completion rate statistics
-    total_starts = responses_collection.count_documents({"form_id": ObjectId(form_id)})
-    completion_stats = {
-        "started": total_starts,
-        "completed": response_count,  # Assuming all submitted forms are complete
-        "completion_rate": (response_count / total_starts * 100) if total_starts > 0 else 0.0
-    }
+    mask = np.ones(columns.size, dtype=bool)
+    for expression in where:
+        mask &= columns.filter_mask(expression)
+    if start:
+        mask &= columns.created_at >= np.datetime64(as_stored_time(start), "ms")
+    if end:
+        mask &= columns.created_at < np.datetime64(as_stored_time(end), "ms")
     
-    return {
+    result = {
         "form_id": form_id,
-        "title": form["title"],
-        "response_count": response_count,
-        "daily_responses": [
-            {
-                "date": f"{item['_id']['year']}-{item['_id']['month']:02d}-{item['_id']['day']:02d}",
-                "count": item["count"]
-            }
-            for item in daily_responses
-        ],
-        "question_stats": question_stats,
-        "completion_stats": completion_stats,
-        "is_active": form["is_active"],
-        "created_at": form["created_at"].isoformat(),
-        "updated_at": form["updated_at"].isoformat()
+        "total_responses": columns.size,
+        "matched_responses": int(np.count_nonzero(mask)),
     }
+    if metric:
+        result["metric"] = {"question_id": metric, **columns.summarize(metric, mask, percentiles)}
+    if group_by:
+        result["groups"] = []
+        for value, group_mask in columns.groups(group_by, mask):
+            group = {"value": value, "responses": int(np.count_nonzero(group_mask))}
+            if metric:
+                group["metric"] = columns.summarize(metric, group_mask, percentiles)
+            result["groups"].append(group)
+    return result
 
 @app.post("/forms/from-template", response_model=Form)
 @limiter.limit("30/minute")
@@ -1223,7 +3790,7 @@ async def create_form_from_template(
         )
     
     # Get template
-    template = templates_collection.find_one({"_id": ObjectId(template_id)})
+    template = await templates_collection.find_one({"_id": ObjectId(template_id)})
     if not template:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1240,12 +3807,11 @@ async def create_form_from_template(
     form_data["creator_id"] = current_user.id
     form_data["created_at"] = datetime.now()
     form_data["updated_at"] = datetime.now()
-    form_data["slug"] = generate_slug(8)
     form_data["is_active"] = True
     form_data["response_count"] = 0
     
-    result = forms_collection.insert_one(form_data)
-    created_form = forms_collection.find_one({"_id": result.inserted_id})
+    result = await insert_form(form_data)
+    created_form = await forms_collection.find_one({"_id": result.inserted_id})
     
     return Form(**created_form)
 
@@ -1259,16 +3825,83 @@ async def create_template(
     # Create a new template
     template_dict = template_data.model_dump(by_alias=True, exclude={"id"})  # Updated for Pydantic v2
     
-    result = templates_collection.insert_one(template_dict)
-    created_template = templates_collection.find_one({"_id": result.inserted_id})
+    result = await templates_collection.insert_one(template_dict)
+    created_template = await templates_collection.find_one({"_id": result.inserted_id})
     
     return Template(**created_template)
 
-# Background task to keep the server alive on Render's free tier
-@app.on_event("startup")
-async def startup_event():
+async def ensure_indexes():
+    """Create any missing REQUIRED_INDEXES and log indexes that have never been used."""
+    for collection_name, models in REQUIRED_INDEXES.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        for model in models:
+            name = model.document["name"]
+            if name in existing:
+                continue
+            try:
+                await collection.create_indexes([model])
+                logger.info(f"Created missing index {collection_name}.{name}")
+            except Exception as e:
+                # Most likely duplicate data blocking a unique index; the rest can still be created
+                logger.error(f"Could not create index {collection_name}.{name}: {str(e)}")
+        
+        required = {model.document["name"] for model in models} | {"_id_"}
+        try:
+            usage = await collection.aggregate([{"$indexStats": {}}]).to_list(None)
+        except Exception:
+            continue  # $indexStats needs extra privileges on some deployments
+        for index in usage:
+            if index["name"] not in required and index["accesses"]["ops"] == 0:
+                logger.warning(
+                    f"Index {collection_name}.{index['name']} is not required by the API and unused "
+                    f"since {index['accesses']['since']}"
+                )
+
+# Representative filter for each query pattern; check-indexes fails if any needs a collection scan.
+# Answer filters (where=) and file-answer matches have no index of their own and must stay inside the form_id range.
+INDEX_CHECK_QUERIES = [
+    ("users", {"username": "check"}, None),
+    ("users", {"email": "check@example.com"}, None),
+    ("forms", {"slug": "check", "is_active": True}, None),
+    ("forms", {"creator_id": ObjectId()}, PAGE_SORT),
+    ("forms", {"_id": ObjectId()}, None),
+    ("responses", {"form_id": ObjectId()}, PAGE_SORT),
+    ("responses", {"form_id": ObjectId(), "created_at": {"$gte": datetime(2000, 1, 1)}}, None),
+    ("responses", {"form_id": ObjectId(), "$text": {"$search": "check"}}, PAGE_SORT),
+    ("responses", {"form_id": ObjectId(), "$and": [{"answers.check": {"$gte": 1}}]}, PAGE_SORT),
+    ("responses", {"form_id": ObjectId(), "answers.check.file_id": {"$exists": True}}, None),
+    ("templates", {"category": "check"}, None),
+    ("form_deletions", {"status": "running"}, None),
+]
+
+def plan_stages(plan: dict):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+async def find_collection_scans() -> List[str]:
+    """Explain every INDEX_CHECK_QUERIES entry and return the ones planned as COLLSCAN."""
+    scans = []
+    for collection_name, query, sort in INDEX_CHECK_QUERIES:
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explained = await cursor.explain()
+        if "COLLSCAN" in plan_stages(explained["queryPlanner"]["winningPlan"]):
+            scans.append(f"{collection_name}: {query}")
+    return scans
+
+async def prepare_database():
+    # Make sure every query pattern is backed by an index
+    if ENSURE_INDEXES:
+        await ensure_indexes()
+    
     # Initialize default templates if none exist
-    if templates_collection.count_documents({}) == 0:
+    if await templates_collection.count_documents({}) == 0:
         default_templates = [
             {
                 "title": "Customer Feedback",
@@ -1500,8 +4133,29 @@ async def startup_event():
             }
         ]
         
-        templates_collection.insert_many(default_templates)
+        await templates_collection.insert_many(default_templates)
         logger.info("Default templates created")
+
+async def warm_connection_pool():
+    # Concurrent pings each check out their own connection, so this opens that many before traffic arrives
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(MONGODB_WARM_CONNECTIONS)))
+    except Exception as e:
+        # Connections are opened on demand instead; a briefly unavailable MongoDB must not stop the server starting
+        logger.warning(f"MongoDB connection pool warm-up failed: {str(e)}")
+        return
+    logger.info(f"Warmed {MONGODB_WARM_CONNECTIONS} MongoDB connections in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+# Background task to keep the server alive on Render's free tier
+@app.on_event("startup")
+async def startup_event():
+    # In production serving the supervisor prepares the database once, before any worker starts
+    if os.getenv("DATABASE_PREPARED") != "true":
+        await prepare_database()
+    
+    # Workers start accepting connections only once startup has finished
+    await warm_connection_pool()
     
     @app.get("/keep-alive")
     async def keep_alive():
@@ -1519,12 +4173,120 @@ async def startup_event():
     
     # Start the keep-alive task
     asyncio.create_task(ping_self())
+    
+    # Start the write-behind submission queue if enabled
+    submission_queue.start()
+    
+    # Pick up form deletions that failed or whose worker stopped before finishing
+    app.state.deletion_sweeper = asyncio.create_task(sweep_form_deletions())
 
-# Run the app
-if __name__ == "__main__":
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Flush queued submissions before the connection pool goes away
+    await submission_queue.stop()
+    if getattr(app.state, "deletion_sweeper", None):
+        app.state.deletion_sweeper.cancel()
+    password_hash_executor.shutdown(wait=False)
+    client.close()
+
+async def check_indexes() -> int:
+    await ensure_indexes()
+    scans = await find_collection_scans()
+    for scan in scans:
+        logger.error(f"Query uses a collection scan: {scan}")
+    if not scans:
+        logger.info(f"All {len(INDEX_CHECK_QUERIES)} query patterns use an index")
+    return 1 if scans else 0
+
+async def rebuild_all_stats(form_ids: List[str]):
+    query = {"_id": {"$in": [ObjectId(form_id) for form_id in form_ids]}} if form_ids else {}
+    async for form in forms_collection.find(query):
+        await rebuild_stats_rollup(form)
+
+async def backfill_search_text(form_ids: List[str]):
+    # Responses stored before search_text existed are only searchable once this has run
+    query = {"_id": {"$in": [ObjectId(form_id) for form_id in form_ids]}} if form_ids else {}
+    async for form in forms_collection.find(query, {"questions": 1}):
+        question_ids = [q["id"] for q in form.get("questions", []) if q["type"] in SEARCHABLE_QUESTION_TYPES]
+        if not question_ids:
+            continue
+        updates = []
+        async for document in responses_collection.find({"form_id": form["_id"], "search_text": {"$exists": False}}, {"answers": 1}):
+            search_text = build_search_text(question_ids, document.get("answers", {}))
+            if search_text:
+                updates.append(UpdateOne({"_id": document["_id"]}, {"$set": {"search_text": search_text}}))
+            if len(updates) == 1000:
+                await responses_collection.bulk_write(updates, ordered=False)
+                updates = []
+        if updates:
+            await responses_collection.bulk_write(updates, ordered=False)
+        logger.info(f"Backfilled search text for form {form['_id']}")
+
+async def export_responses_to_file(form_id: str, path: str):
+    form = await forms_collection.find_one({"_id": ObjectId(form_id)})
+    if not form:
+        raise SystemExit(f"Form {form_id} not found")
+    export_format = ExportFormat(os.path.splitext(path)[1].lstrip("."))
+    with open(path, "wb") as output:
+        async for chunk in export_content(form, export_format):
+            output.write(chunk)
+
+def worker_count() -> int:
+    # Cores this process may actually run on (container CPU sets included), unless WEB_CONCURRENCY says otherwise
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    return int(os.getenv("WEB_CONCURRENCY", str(cores)))
+
+def serve(workers: int):
+    """
+    Production serving: a supervisor process and `workers` workers sharing one socket.
+    
+    The supervisor prepares the database once before the workers start. On
+    SIGTERM each worker stops accepting connections, gives in-flight requests
+    up to GRACEFUL_SHUTDOWN_TIMEOUT seconds, then flushes the submission queue.
+    """
+    asyncio.run(prepare_database())
+    client.close()
+    os.environ["DATABASE_PREPARED"] = "true"
+    if workers > 1:
+        # Worker processes import prometheus_client after this is set, so each writes its samples where /metrics merges them
+        os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="formbuilder-metrics-"))
     uvicorn.run(
         "main:app",
         host=os.getenv("HOST", "0.0.0.0"),
         port=int(os.getenv("PORT", "8000")),
-        reload=True
+        workers=workers,
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT,
+        proxy_headers=True,
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        access_log=os.getenv("ACCESS_LOG", "false").lower() == "true"
     )
+
+# Run the app
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild-stats":
+        # Admin command: python main.py rebuild-stats [form_id ...] (all forms when no ids are given)
+        asyncio.run(rebuild_all_stats(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == "backfill-search":
+        # Admin command: python main.py backfill-search [form_id ...] indexes responses submitted before search existed
+        asyncio.run(backfill_search_text(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == "check-indexes":
+        # Run by hand against a real mongod (not in CI): exits non-zero if any query pattern needs a COLLSCAN
+        sys.exit(asyncio.run(check_indexes()))
+    elif len(sys.argv) > 1 and sys.argv[1] == "export-responses":
+        # Offline export: python main.py export-responses <form_id> <file.csv|.ndjson|.parquet|.arrow>
+        asyncio.run(export_responses_to_file(sys.argv[2], sys.argv[3]))
+    elif len(sys.argv) > 1 and sys.argv[1] == "serve":
+        # Production: python main.py serve [--workers N], N defaulting to WEB_CONCURRENCY or the available cores
+        workers = int(sys.argv[sys.argv.index("--workers") + 1]) if "--workers" in sys.argv else worker_count()
+        serve(workers)
+    else:
+        # Development: a single process that reloads on file changes
+        uvicorn.run(
+            "main:app",
+            host=os.getenv("HOST", "0.0.0.0"),
+            port=int(os.getenv("PORT", "8000")),
+            reload=True
+        )
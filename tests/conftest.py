@@ -0,0 +1,75 @@
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+COLLECTIONS = {
+    "users_collection": "users",
+    "forms_collection": "forms",
+    "responses_collection": "responses",
+    "templates_collection": "templates",
+    "stats_collection": "form_stats",
+    "deletions_collection": "form_deletions",
+}
+
+
+class MockDatabase:
+    """A mongomock-motor database whose db.fs works as Motor's: a GridFS root with async files and chunks."""
+
+    def __init__(self, database):
+        self._database = database
+        self.fs = database["fs"]
+        # Motor's GridFS classes write through .delegate, which mongomock-motor would resolve to "fs.delegate"
+        self.fs.delegate = self.fs._AsyncMongoMockCollection__collection
+        self.fs.files = database["fs.files"]
+        self.fs.chunks = database["fs.chunks"]
+
+    def __getattr__(self, name):
+        return getattr(self._database, name)
+
+    def __getitem__(self, name):
+        return self._database[name]
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """Point main at a fresh in-memory database with the required indexes."""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    mock_client = mongomock_motor.AsyncMongoMockClient()
+    database = MockDatabase(mock_client.formbuilder)
+    monkeypatch.setattr(main, "client", mock_client)
+    monkeypatch.setattr(main, "db", database)
+    for attribute, name in COLLECTIONS.items():
+        monkeypatch.setattr(main, attribute, database[name])
+    asyncio.run(main.ensure_indexes())
+    with mongomock_motor.enabled_gridfs_integration():
+        yield database
+
+
+def api_client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test")
+
+
+async def sign_up(client, username="owner"):
+    """Register a user and return the Authorization header for them."""
+    await client.post("/register", json={"username": username, "email": f"{username}@example.com", "password": "pw"})
+    response = await client.post("/token", data={"username": username, "password": "pw"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def form_payload(**fields):
+    return {
+        "title": "Survey",
+        "start_screen": {"id": "start", "title": "Start"},
+        "end_screen": {"id": "end", "title": "Done"},
+        "questions": [],
+        **fields,
+    }
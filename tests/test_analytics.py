@@ -0,0 +1,96 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+import main
+from conftest import api_client, form_payload, sign_up
+
+CHOICES = [{"value": value, "label": value} for value in ("red", "blue")]
+QUESTIONS = [
+    {"id": "score", "type": "rating", "title": "Score", "required": False, "min_value": 1, "max_value": 5},
+    {"id": "colours", "type": "checkbox", "title": "Colours", "required": False, "options": CHOICES},
+    {"id": "comment", "type": "text", "title": "Comment", "required": False},
+]
+
+
+def count_extends(monkeypatch, delay=0.0):
+    calls = []
+    extend = main.FormColumns.extend
+
+    async def counted(columns):
+        calls.append(columns.size)
+        await asyncio.sleep(delay)
+        return await extend(columns)
+
+    monkeypatch.setattr(main.FormColumns, "extend", counted)
+    return calls
+
+
+async def analytics(client, form, headers):
+    response = await client.get(f"/forms/{form['_id']}/analytics",
+                                params={"metric": "score", "group_by": "colours"}, headers=headers)
+    return response.json()
+
+
+def test_new_responses_are_appended_to_cached_columns(database, monkeypatch):
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            form = (await client.post("/forms", json=form_payload(questions=QUESTIONS), headers=headers)).json()
+            submit = f"/f/{form['slug']}/submit"
+            await client.post(submit, json={"score": 2, "colours": ["red"], "comment": "ok"})
+            await client.post(submit, json={"score": 4, "colours": ["red", "blue"]})
+            calls = count_extends(monkeypatch)
+            first = await analytics(client, form, headers)
+            await client.post(submit, json={"score": 5, "colours": ["blue"]})
+            second = await analytics(client, form, headers)
+            third = await analytics(client, form, headers)
+            return first, second, third, calls
+
+    first, second, third, calls = asyncio.run(scenario())
+    assert first["total_responses"] == 2
+    assert second["total_responses"] == third["total_responses"] == 3
+    assert second["metric"]["mean"] == (2 + 4 + 5) / 3
+    assert {group["value"]: group["responses"] for group in second["groups"]} == {"red": 2, "blue": 2}
+    # One full load, then one append of the new row; an unchanged response_count skips the read
+    assert calls == [0, 2]
+
+
+def test_concurrent_requests_share_one_load(database, monkeypatch):
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            form = (await client.post("/forms", json=form_payload(questions=QUESTIONS), headers=headers)).json()
+            await client.post(f"/f/{form['slug']}/submit", json={"score": 3})
+            calls = count_extends(monkeypatch, delay=0.05)
+            results = await asyncio.gather(*(analytics(client, form, headers) for _ in range(5)))
+            return results, calls
+
+    results, calls = asyncio.run(scenario())
+    assert [result["total_responses"] for result in results] == [1] * 5
+    assert calls == [0]
+
+
+def test_late_stored_response_inside_the_overlap_is_picked_up(database):
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            form = (await client.post("/forms", json=form_payload(questions=QUESTIONS), headers=headers)).json()
+            await client.post(f"/f/{form['slug']}/submit", json={"score": 1})
+            await analytics(client, form, headers)
+            # Submitted a moment before the loaded row, but stored after it, as by a queue flush
+            form_id = ObjectId(form["_id"])
+            await database.responses.insert_one({"form_id": form_id, "created_at": datetime.now() - timedelta(seconds=1),
+                                                 "answers": {"score": 3}})
+            await database.forms.update_one({"_id": form_id}, {"$inc": {"response_count": 1}})
+            return await analytics(client, form, headers)
+
+    result = asyncio.run(scenario())
+    assert result["total_responses"] == 2
+    assert result["metric"]["mean"] == 2
+
+
+def test_columns_project_only_loaded_questions(database):
+    columns = main.FormColumns({"_id": ObjectId(), "questions": QUESTIONS})
+    assert columns.projection == {"created_at": 1, "answers.score": 1, "answers.colours": 1}
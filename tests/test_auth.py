@@ -0,0 +1,22 @@
+import asyncio
+
+import main
+from conftest import api_client, sign_up
+
+
+def test_sign_in_is_a_503_with_retry_after_while_the_hash_pool_is_full(database, monkeypatch):
+    monkeypatch.setattr(main, "password_hash_slots", asyncio.Semaphore(1))
+    credentials = {"username": "owner", "password": "pw"}
+
+    async def scenario():
+        async with api_client() as client:
+            await sign_up(client)
+            async with main.password_hash_slots:
+                turned_away = await client.post("/token", data=credentials)
+            admitted = await client.post("/token", data=credentials)
+            return turned_away, admitted
+
+    turned_away, admitted = asyncio.run(scenario())
+    assert turned_away.status_code == 503
+    assert turned_away.headers["Retry-After"] == "1"
+    assert admitted.status_code == 200
@@ -0,0 +1,61 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+import main
+from conftest import api_client, form_payload, sign_up
+
+
+def test_dashboard_summary_matches_per_form_counts(database):
+    rng = random.Random(19)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            other_headers = await sign_up(client, "other")
+            form_ids = []
+            for title in ["Busy", "Quiet", "Empty"]:
+                form = (await client.post("/forms", json=form_payload(title=title), headers=headers)).json()
+                form_ids.append(ObjectId(form["_id"]))
+            other = (await client.post("/forms", json=form_payload(), headers=other_headers)).json()
+            responses = [
+                {"form_id": form_id, "answers": {}, "created_at": today - timedelta(days=rng.randint(0, 12), minutes=rng.randint(0, 1439))}
+                for form_id, count in [(form_ids[0], 40), (form_ids[1], 7), (ObjectId(other["_id"]), 9)]
+                for _ in range(count)
+            ]
+            await database.responses.insert_many(responses)
+            summary = (await client.get("/dashboard/summary", headers=headers)).json()
+
+            # The per-form way: one count per form, and one per form per day
+            expected = {}
+            for form_id in form_ids:
+                query = {"form_id": form_id}
+                latest = await database.responses.find(query).sort("created_at", -1).limit(1).to_list(None)
+                daily = []
+                for day in summary["days"]:
+                    start = datetime.strptime(day, "%Y-%m-%d")
+                    daily.append(await database.responses.count_documents(
+                        {**query, "created_at": {"$gte": start, "$lt": start + timedelta(days=1)}}
+                    ))
+                expected[str(form_id)] = {
+                    "response_count": await database.responses.count_documents(query),
+                    "last_response_at": latest[0]["created_at"].isoformat() if latest else None,
+                    "daily_responses": daily,
+                }
+            recent = await database.responses.find({"form_id": {"$in": form_ids}}).sort("created_at", -1) \
+                .limit(main.DASHBOARD_RECENT_RESPONSES).to_list(None)
+            return summary, expected, [str(response["_id"]) for response in recent]
+
+    summary, expected, recent_ids = asyncio.run(scenario())
+    assert summary["total_forms"] == 3
+    assert summary["total_responses"] == 47
+    assert len(summary["days"]) == main.DASHBOARD_DAYS
+    assert summary["days"][-1] == today.strftime("%Y-%m-%d")
+    assert {
+        form["_id"]: {key: form[key] for key in ("response_count", "last_response_at", "daily_responses")}
+        for form in summary["forms"]
+    } == expected
+    assert [response["_id"] for response in summary["recent_responses"]] == recent_ids
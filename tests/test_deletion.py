@@ -0,0 +1,67 @@
+import asyncio
+from datetime import timedelta
+
+from bson import ObjectId
+
+import main
+from conftest import api_client, form_payload, sign_up
+
+QUESTIONS = [{"id": "f", "type": "file", "title": "Upload", "required": False}]
+
+
+def test_failed_deletion_is_resumed(database, monkeypatch):
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            form = (await client.post("/forms", json=form_payload(questions=QUESTIONS), headers=headers)).json()
+            form_id = ObjectId(form["_id"])
+            for _ in range(3):
+                file_id = (await database.fs.files.insert_one({"length": 1})).inserted_id
+                await database.fs.chunks.insert_one({"files_id": file_id, "n": 0})
+                await database.responses.insert_one({"form_id": form_id, "answers": {"f": {"file_id": str(file_id)}}})
+
+            delete_response_batch = main.delete_response_batch
+            calls = []
+
+            async def fails_once(job):
+                calls.append(job["_id"])
+                if len(calls) == 1:
+                    raise RuntimeError("connection reset")
+                return await delete_response_batch(job)
+
+            monkeypatch.setattr(main, "delete_response_batch", fails_once)
+            monkeypatch.setattr(main, "FORM_DELETE_RETRY_DELAY", timedelta(0))
+            await client.delete(f"/forms/{form['_id']}", headers=headers)
+            failed = (await client.get(f"/forms/{form['_id']}/deletion", headers=headers)).json()
+
+            await main.resume_form_deletions()
+            resumed = (await client.get(f"/forms/{form['_id']}/deletion", headers=headers)).json()
+            left = [await collection.count_documents({})
+                    for collection in (database.responses, database.fs.files, database.fs.chunks)]
+            return failed, resumed, left
+
+    failed, resumed, left = asyncio.run(scenario())
+    assert failed["status"] == "running"
+    assert failed["last_error"] == "connection reset"
+    assert resumed["status"] == "done"
+    assert resumed["responses_deleted"] == 3
+    assert resumed["files_deleted"] == 3
+    assert left == [0, 0, 0]
+
+
+def test_deletion_removes_files_of_questions_edited_away(database):
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            form = (await client.post("/forms", json=form_payload(questions=QUESTIONS), headers=headers)).json()
+            file_id = (await database.fs.files.insert_one({"length": 1})).inserted_id
+            await database.fs.chunks.insert_one({"files_id": file_id, "n": 0})
+            await database.responses.insert_one({"form_id": ObjectId(form["_id"]),
+                                                 "answers": {"f": {"file_id": str(file_id)}}})
+            # The file question is retyped after the upload
+            retyped = [{**QUESTIONS[0], "type": "text"}]
+            await client.put(f"/forms/{form['_id']}", json=form_payload(questions=retyped), headers=headers)
+            await client.delete(f"/forms/{form['_id']}", headers=headers)
+            return [await collection.count_documents({}) for collection in (database.fs.files, database.fs.chunks)]
+
+    assert asyncio.run(scenario()) == [0, 0]
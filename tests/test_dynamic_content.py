@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from main import DynamicContentEvaluator, evaluate_dynamic_content
+
+DYNAMIC_QUESTIONS = ["q0", "q1", "q2", "q3", "default"]
+DYNAMIC_VALUES = ["a", "b", "ab", "3", "3.5", "10", "-1", "", "1.2.3"]
+DYNAMIC_OPERATORS = ["equals", "not_equals", "contains", "not_contains", "greater_than", "less_than", "unknown"]
+
+
+def random_content(rng):
+    choice = rng.random()
+    if choice < 0.6:
+        return {"title": f"Result {rng.randint(0, 999)}"}
+    if choice < 0.8:
+        return {"description": "Plain description"}
+    return rng.choice([None, "", "text result", 0])
+
+
+def random_dynamic_content(rng, depth):
+    node = {}
+    for _ in range(rng.randint(1, 3)):
+        question_id = rng.choice(DYNAMIC_QUESTIONS)
+        if rng.random() < 0.2:
+            node[f"{question_id}:{rng.choice(DYNAMIC_VALUES)}"] = random_content(rng)
+            continue
+        conditions = node.setdefault(question_id, {})
+        for _ in range(rng.randint(1, 4)):
+            key = f"{rng.choice(DYNAMIC_OPERATORS)}:{rng.choice(DYNAMIC_VALUES)}"
+            if depth > 0 and rng.random() < 0.5:
+                conditions[key] = random_dynamic_content(rng, depth - 1)
+            else:
+                conditions[key] = random_content(rng)
+    if rng.random() < 0.4:
+        node["default"] = random_content(rng)
+    if rng.random() < 0.1:
+        node["title"] = "Inline title"
+    return node
+
+
+def random_dynamic_answers(rng):
+    answers = {}
+    for question_id in DYNAMIC_QUESTIONS:
+        if rng.random() < 0.8:
+            answers[question_id] = rng.choice(DYNAMIC_VALUES + [3, 3.5, 10, ["a", "b"], True])
+    return answers
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compiled_evaluator_matches_reference_on_random_trees(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        tree = random_dynamic_content(rng, depth=3)
+        evaluator = DynamicContentEvaluator(tree)
+        for _ in range(10):
+            answers = random_dynamic_answers(rng)
+            assert evaluator.evaluate(answers) == evaluate_dynamic_content(tree, answers), (tree, answers)
+
+
+def test_personality_quiz_reaches_every_leaf():
+    levels = [("social_energy", "EI"), ("information_processing", "SN"),
+              ("decision_making", "TF"), ("lifestyle_preference", "JP")]
+
+    def build(depth, prefix):
+        question_id, letters = levels[depth]
+        branches = {}
+        for letter in letters:
+            if depth == len(levels) - 1:
+                branches[f"equals:{letter}"] = {"title": prefix + letter}
+            else:
+                branches[f"equals:{letter}"] = build(depth + 1, prefix + letter)
+        return {question_id: branches}
+
+    tree = build(0, "")
+    evaluator = DynamicContentEvaluator(tree)
+    for code in ("ESTJ", "INFP", "ENTP", "ISFJ"):
+        answers = {question_id: letter for (question_id, _), letter in zip(levels, code)}
+        assert evaluator.evaluate(answers) == evaluate_dynamic_content(tree, answers) == {"title": code}
+
+
+def test_empty_content_evaluates_to_none():
+    assert DynamicContentEvaluator(None).evaluate({"q0": "a"}) == evaluate_dynamic_content(None, {"q0": "a"})
@@ -0,0 +1,109 @@
+import asyncio
+import io
+import json
+import time
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from bson import ObjectId
+
+import main
+from conftest import api_client, form_payload, sign_up
+
+CHOICES = [{"label": letter.upper(), "value": letter} for letter in "abc"]
+COLUMNAR_QUESTIONS = [
+    {"id": "amount", "type": "number", "title": "Amount", "required": False},
+    {"id": "pick", "type": "multiple_choice", "title": "Pick", "required": False, "options": CHOICES},
+    {"id": "ticks", "type": "checkbox", "title": "Ticks", "required": False, "options": CHOICES},
+    {"id": "upload", "type": "file", "title": "Upload", "required": False},
+    {"id": "name", "type": "text", "title": "Name", "required": False},
+]
+UPLOAD = {"file_id": str(ObjectId()), "filename": "f.txt", "content_type": "text/plain", "size": 3}
+COLUMNAR_ANSWERS = [
+    {"amount": 4, "pick": "a", "ticks": ["a", "c"], "upload": UPLOAD, "name": "Ada"},
+    {"amount": 2.5, "pick": "b", "ticks": []},
+    {"pick": "c", "name": "Grace"},
+]
+
+
+@pytest.fixture
+def local_clock(monkeypatch):
+    """Run the server on a clock five and a half hours ahead of UTC."""
+    monkeypatch.setenv("TZ", "Asia/Kolkata")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+async def seed_form(client, database, headers, created_ats):
+    form = (await client.post("/forms", json=form_payload(), headers=headers)).json()
+    await database.responses.insert_many([
+        {"form_id": ObjectId(form["_id"]), "answers": {}, "created_at": created_at}
+        for created_at in created_ats
+    ])
+    return form["_id"]
+
+
+def test_offset_aware_bounds_match_local_timestamps(database, local_clock):
+    # Stored as datetime.now(): 10:00 and 12:00 local. 05:00Z is 10:30 local, so only the noon response is in range.
+    created_ats = [datetime(2026, 1, 1, 10, 0), datetime(2026, 1, 1, 12, 0)]
+    params = {"start": "2026-01-01T05:00:00+00:00", "end": "2026-01-01T14:00:00+05:30"}
+
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            form_id = await seed_form(client, database, headers, created_ats)
+            exported = await client.get(f"/forms/{form_id}/export", params={"format": "ndjson", **params}, headers=headers)
+            listed = await client.get(f"/forms/{form_id}/responses", params=params, headers=headers)
+            return exported, listed
+
+    exported, listed = asyncio.run(scenario())
+    assert exported.status_code == 200
+    assert [json.loads(line)["created_at"] for line in exported.text.splitlines()] == ["2026-01-01T12:00:00"]
+    assert listed.status_code == 200
+    assert [response["created_at"] for response in listed.json()] == ["2026-01-01T12:00:00"]
+
+
+def read_columnar(content: bytes, export_format: str) -> pa.Table:
+    if export_format == "parquet":
+        return pq.read_table(io.BytesIO(content))
+    return pa.ipc.open_stream(content).read_all()
+
+
+@pytest.mark.parametrize("export_format", ["parquet", "arrow"])
+def test_columnar_exports_round_trip_with_typed_columns(database, monkeypatch, export_format):
+    # Two rows per batch, so the export spans several row groups / record batches
+    monkeypatch.setattr(main, "COLUMNAR_BATCH_SIZE", 2)
+    created_ats = [datetime(2026, 1, 1, hour) for hour in range(len(COLUMNAR_ANSWERS))]
+
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            form = (await client.post("/forms", json=form_payload(questions=COLUMNAR_QUESTIONS), headers=headers)).json()
+            await database.responses.insert_many([
+                {"form_id": ObjectId(form["_id"]), "answers": answers, "created_at": created_at}
+                for answers, created_at in zip(COLUMNAR_ANSWERS, created_ats)
+            ])
+            return await client.get(f"/forms/{form['_id']}/export", params={"format": export_format}, headers=headers)
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    table = read_columnar(response.content, export_format)
+    schema = table.schema
+    assert schema.field("created_at").type == pa.timestamp("ms")
+    assert schema.field("amount").type == pa.float64()
+    assert pa.types.is_dictionary(schema.field("pick").type)
+    assert schema.field("ticks").type == pa.list_(pa.string())
+    assert schema.field("upload").type == main.ARROW_FILE_TYPE
+    assert schema.field("name").type == pa.string()
+
+    rows = table.to_pylist()
+    assert [row["created_at"] for row in rows] == created_ats
+    assert [row["amount"] for row in rows] == [4.0, 2.5, None]
+    assert [row["pick"] for row in rows] == ["a", "b", "c"]
+    assert [row["ticks"] for row in rows] == [["a", "c"], [], None]
+    assert [row["upload"] for row in rows] == [UPLOAD, None, None]
+    assert [row["name"] for row in rows] == ["Ada", None, "Grace"]
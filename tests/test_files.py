@@ -0,0 +1,25 @@
+import pytest
+
+from main import parse_byte_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=10-", (10, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("bytes=-100", (900, 999)),
+])
+def test_satisfiable_ranges(header, expected):
+    assert parse_byte_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=3-1", "bytes=abc", "items=0-1", "bytes=0-1,5-6"])
+def test_invalid_ranges_are_ignored(header):
+    # Ignored ranges are answered with 200 and the full body
+    assert parse_byte_range(header, 1000) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=1500-1600", "bytes=-0"])
+def test_ranges_beyond_the_file_are_unsatisfiable(header):
+    # Unsatisfiable ranges are answered with 416
+    assert parse_byte_range(header, 1000) is False
@@ -0,0 +1,64 @@
+import asyncio
+
+from bson import ObjectId
+
+import main
+from conftest import api_client, form_payload, sign_up
+
+
+class RacingForms:
+    """The forms collection as seen by a request that lost a race: its slug lookups miss a form that already exists."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    async def find_one(self, query, *args, **kwargs):
+        if "slug" in query:
+            return None
+        return await self._collection.find_one(query, *args, **kwargs)
+
+
+def test_random_slug_collision_is_redrawn(database, monkeypatch):
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            await database.forms.insert_one({"slug": "taken"})
+            slugs = iter(["taken", "taken", "fresh"])
+            monkeypatch.setattr(main, "generate_slug", lambda length=6: next(slugs))
+            return await client.post("/forms", json=form_payload(), headers=headers)
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert response.json()["slug"] == "fresh"
+
+
+def test_custom_slug_race_on_create_is_a_400(database, monkeypatch):
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            await client.post("/forms", json=form_payload(custom_slug="launch"), headers=headers)
+            monkeypatch.setattr(main, "forms_collection", RacingForms(database.forms))
+            return await client.post("/forms", json=form_payload(custom_slug="launch"), headers=headers)
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Custom URL already in use. Please choose another."
+
+
+def test_custom_slug_race_on_update_is_a_400(database, monkeypatch):
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            await client.post("/forms", json=form_payload(custom_slug="launch"), headers=headers)
+            other = (await client.post("/forms", json=form_payload(), headers=headers)).json()
+            monkeypatch.setattr(main, "forms_collection", RacingForms(database.forms))
+            response = await client.put(f"/forms/{other['_id']}", json=form_payload(custom_slug="launch"), headers=headers)
+            stored = await database.forms.find_one({"_id": ObjectId(other["_id"])})
+            return response, stored["slug"], other["slug"]
+
+    response, stored_slug, original_slug = asyncio.run(scenario())
+    assert response.status_code == 400
+    assert stored_slug == original_slug
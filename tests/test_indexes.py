@@ -0,0 +1,32 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import main
+from conftest import COLLECTIONS
+
+# Query plans only mean something on a real server, so this check is skipped in CI and under mongomock.
+# Run it manually against a scratch mongod: MONGODB_URI=mongodb://localhost:27017 python -m pytest tests/test_indexes.py
+pytestmark = pytest.mark.skipif(
+    not os.getenv("MONGODB_URI"), reason="query plans need a real MongoDB server (set MONGODB_URI)"
+)
+
+
+def test_query_patterns_do_not_collection_scan(monkeypatch):
+    async def scenario():
+        client = AsyncIOMotorClient(os.environ["MONGODB_URI"])
+        database = client[f"formbuilder_test_{uuid.uuid4().hex}"]
+        monkeypatch.setattr(main, "db", database)
+        for attribute, name in COLLECTIONS.items():
+            monkeypatch.setattr(main, attribute, database[name])
+        try:
+            await main.ensure_indexes()
+            return await main.find_collection_scans()
+        finally:
+            await client.drop_database(database.name)
+            client.close()
+
+    assert asyncio.run(scenario()) == []
@@ -0,0 +1,39 @@
+import asyncio
+
+from prometheus_client.parser import text_string_to_metric_families
+
+from conftest import api_client, form_payload, sign_up
+
+
+def request_counts(exposition: str) -> dict:
+    """http_requests_total samples keyed by (method, route, status)."""
+    return {
+        (sample.labels["method"], sample.labels["route"], sample.labels["status"]): sample.value
+        for family in text_string_to_metric_families(exposition)
+        if family.name == "http_requests"
+        for sample in family.samples
+        if sample.name == "http_requests_total"
+    }
+
+
+def test_metrics_label_requests_by_route_template(database):
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            slugs = [(await client.post("/forms", json=form_payload(), headers=headers)).json()["slug"] for _ in range(2)]
+            before = request_counts((await client.get("/metrics")).text)
+            for slug in slugs + ["missing"]:
+                await client.get(f"/f/{slug}")
+            await client.get("/no/such/path")
+            after = request_counts((await client.get("/metrics")).text)
+            return slugs, before, after
+
+    slugs, before, after = asyncio.run(scenario())
+
+    def added(key):
+        return after.get(key, 0) - before.get(key, 0)
+
+    assert added(("GET", "/f/{slug}", "200")) == 2
+    assert added(("GET", "/f/{slug}", "404")) == 1
+    assert added(("GET", "unmatched", "404")) == 1
+    assert not any(slug in route for _, route, _ in after for slug in slugs)
@@ -0,0 +1,34 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from conftest import api_client, form_payload, sign_up
+
+
+def test_cursor_walk_returns_every_response_once(database):
+    # Timestamps repeat in threes, so page boundaries fall inside runs of equal created_at
+    start = datetime(2026, 1, 1)
+
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            form = (await client.post("/forms", json=form_payload(), headers=headers)).json()
+            inserted = await database.responses.insert_many([
+                {"form_id": ObjectId(form["_id"]), "answers": {}, "created_at": start + timedelta(minutes=index // 3)}
+                for index in range(23)
+            ])
+            walked, pages = [], 0
+            params = {"limit": 5}
+            while True:
+                page = await client.get(f"/forms/{form['_id']}/responses", params=params, headers=headers)
+                assert page.status_code == 200
+                walked += [response["_id"] for response in page.json()]
+                pages += 1
+                if "X-Next-Cursor" not in page.headers:
+                    return inserted.inserted_ids, walked, pages
+                params = {"limit": 5, "cursor": page.headers["X-Next-Cursor"]}
+
+    inserted_ids, walked, pages = asyncio.run(scenario())
+    assert walked == [str(inserted_id) for inserted_id in inserted_ids]
+    assert pages == 5
@@ -0,0 +1,54 @@
+import asyncio
+
+import main
+from conftest import api_client, form_payload, sign_up
+
+REQUIRED_QUESTION = {"id": "name", "type": "text", "title": "Name", "required": True}
+
+
+def test_updating_a_form_invalidates_its_cached_copy(database):
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            form = (await client.post("/forms", json=form_payload(), headers=headers)).json()
+            before = await client.get(f"/f/{form['slug']}")
+            cached = main.form_cache.peek(form["slug"])
+            await client.put(
+                f"/forms/{form['_id']}",
+                json=form_payload(title="Renamed", questions=[REQUIRED_QUESTION]),
+                headers=headers,
+            )
+            after = await client.get(f"/f/{form['slug']}")
+            submitted = await client.post(f"/f/{form['slug']}/submit", json={})
+            return before, cached, after, submitted
+
+    before, cached, after, submitted = asyncio.run(scenario())
+    assert before.json()["title"] == "Survey"
+    assert cached is not None
+    assert after.json()["title"] == "Renamed"
+    # The submit path validates against the updated questions, not the cached empty form
+    assert submitted.status_code == 400
+
+
+def test_matching_etag_is_a_304_until_the_form_is_edited(database):
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            form = (await client.post("/forms", json=form_payload(), headers=headers)).json()
+            first = await client.get(f"/f/{form['slug']}")
+            etag = first.headers["ETag"]
+            # A new response changes response_count, not the revision, so the ETag holds
+            await client.post(f"/f/{form['slug']}/submit", json={})
+            repeat = await client.get(f"/f/{form['slug']}", headers={"If-None-Match": etag})
+            await client.put(f"/forms/{form['_id']}", json=form_payload(title="Renamed"), headers=headers)
+            edited = await client.get(f"/f/{form['slug']}", headers={"If-None-Match": etag})
+            return first, repeat, edited
+
+    first, repeat, edited = asyncio.run(scenario())
+    assert first.status_code == 200
+    assert repeat.status_code == 304
+    assert repeat.headers["ETag"] == first.headers["ETag"]
+    assert repeat.content == b""
+    assert edited.status_code == 200
+    assert edited.headers["ETag"] != first.headers["ETag"]
+    assert edited.json()["title"] == "Renamed"
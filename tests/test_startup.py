@@ -0,0 +1,15 @@
+import asyncio
+from types import SimpleNamespace
+
+from pymongo.errors import ServerSelectionTimeoutError
+
+import main
+
+
+def test_pool_warm_up_failure_does_not_abort_startup(monkeypatch, caplog):
+    async def unavailable(*args, **kwargs):
+        raise ServerSelectionTimeoutError("no servers available")
+
+    monkeypatch.setattr(main, "client", SimpleNamespace(admin=SimpleNamespace(command=unavailable)))
+    asyncio.run(main.warm_connection_pool())
+    assert "warm-up failed" in caplog.text
@@ -0,0 +1,122 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+import main
+from benchmark import baseline_form_stats
+from conftest import api_client, form_payload, sign_up
+
+QUESTIONS = [{"id": "r", "type": "rating", "title": "Rating", "required": False, "min_value": 1, "max_value": 5}]
+
+
+class InterleavedCollection:
+    """Wraps the responses collection so a submit lands while the first rebuild scan is running."""
+
+    def __init__(self, collection, during):
+        self.collection = collection
+        self.during = during
+
+    def find(self, *args, **kwargs):
+        return self.scan(self.collection.find(*args, **kwargs))
+
+    async def scan(self, cursor):
+        async for document in cursor:
+            yield document
+        if self.during:
+            during, self.during = self.during, None
+            await during()
+
+
+def test_rebuild_does_not_overwrite_updates_made_during_the_scan(database, monkeypatch):
+    form = {"_id": ObjectId(), "questions": QUESTIONS}
+
+    async def submit(value):
+        response = {"form_id": form["_id"], "answers": {"r": value}, "created_at": datetime.now()}
+        await database.responses.insert_one(response)
+        await main.record_response_stats(form["_id"], main.rollup_update(QUESTIONS, response))
+
+    async def scenario():
+        for value in (1, 2, 3):
+            await submit(value)
+        monkeypatch.setattr(main, "responses_collection", InterleavedCollection(database.responses, lambda: submit(5)))
+        await main.rebuild_stats_rollup(form)
+        return await database.form_stats.find_one({"_id": form["_id"]})
+
+    rollup = asyncio.run(scenario())
+    numbers = rollup["questions"][main.rollup_key("r")]
+    assert rollup["total"] == 4
+    assert numbers["sum"] == 11 and numbers["max"] == 5
+
+
+def test_stats_request_rebuilds_a_missing_rollup_in_the_background(database):
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            form = (await client.post("/forms", json=form_payload(questions=QUESTIONS), headers=headers)).json()
+            await client.post(f"/f/{form['slug']}/submit", json={"r": 4})
+            await database.form_stats.delete_many({})
+            first = (await client.get(f"/forms/{form['_id']}/stats", headers=headers)).json()
+            await asyncio.gather(*main.stats_rebuilds.values())
+            second = (await client.get(f"/forms/{form['_id']}/stats", headers=headers)).json()
+            return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first["stats_status"] == "rebuilding"
+    assert second["stats_status"] == "current"
+    assert second["question_stats"]["r"]["distribution"] == {"4": 1}
+
+
+CHOICES = [{"value": value, "label": value} for value in ("a", "b", "c")]
+MIXED_QUESTIONS = [
+    {"id": "pick", "type": "multiple_choice", "title": "Pick", "required": False, "options": CHOICES},
+    {"id": "ticks", "type": "checkbox", "title": "Ticks", "required": False, "options": CHOICES},
+    {"id": "menu", "type": "dropdown", "title": "Menu", "required": False, "options": CHOICES},
+    {"id": "stars", "type": "rating", "title": "Stars", "required": False, "min_value": 1, "max_value": 5},
+    {"id": "amount", "type": "number", "title": "Amount", "required": False},
+    {"id": "nps", "type": "scale", "title": "NPS", "required": False, "min_value": 0, "max_value": 10},
+    {"id": "upload", "type": "file", "title": "Upload", "required": False},
+    {"id": "name", "type": "text", "title": "Name", "required": False},
+    {"id": "mail", "type": "email", "title": "Mail", "required": False},
+]
+
+
+def random_answers(rng):
+    candidates = {
+        "pick": lambda: rng.choice("abc"),
+        "ticks": lambda: rng.sample("abc", rng.randint(0, 3)),
+        "menu": lambda: rng.choice("abc"),
+        "stars": lambda: rng.randint(1, 5),
+        "amount": lambda: rng.choice([rng.randint(-5, 100), rng.random() * 10]),
+        "nps": lambda: rng.randint(0, 10),
+        "upload": lambda: {"filename": "f.txt", "content_type": "text/plain", "size": 3, "file_id": str(ObjectId())},
+        "name": lambda: rng.choice(["Ada", "Grace", ""]),
+        "mail": lambda: "someone@example.com",
+    }
+    return {question_id: make() for question_id, make in candidates.items() if rng.random() < 0.7}
+
+
+def test_facet_stats_match_the_baseline_pipelines(database):
+    rng = random.Random(3)
+
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            created = (await client.post("/forms", json=form_payload(questions=MIXED_QUESTIONS), headers=headers)).json()
+            form_id = ObjectId(created["_id"])
+            now = datetime.now()
+            responses = [{"form_id": form_id, "answers": random_answers(rng),
+                          "created_at": now - timedelta(days=rng.randint(0, 45), minutes=rng.randint(0, 1440))}
+                         for _ in range(300)]
+            await database.responses.insert_many(responses)
+            await database.forms.update_one({"_id": form_id}, {"$set": {"response_count": len(responses)}})
+            form = await database.forms.find_one({"_id": form_id})
+            baseline = jsonable_encoder(await baseline_form_stats(database.responses, form))
+            exact = (await client.get(f"/forms/{created['_id']}/stats", params={"exact": "true"}, headers=headers)).json()
+            return baseline, exact
+
+    baseline, exact = asyncio.run(scenario())
+    assert baseline["question_stats"]["ticks"]["option_counts"]
+    assert {key: exact[key] for key in baseline} == baseline
@@ -0,0 +1,62 @@
+import asyncio
+
+from bson import ObjectId
+
+import main
+from conftest import api_client, form_payload, sign_up
+
+
+def test_max_responses_holds_under_concurrent_submits(database):
+    async def scenario():
+        async with api_client() as client:
+            headers = await sign_up(client)
+            form = (await client.post("/forms", json=form_payload(max_responses=5), headers=headers)).json()
+            submits = [client.post(f"/f/{form['slug']}/submit", json={}) for _ in range(25)]
+            codes = [response.status_code for response in await asyncio.gather(*submits)]
+            stored = await database.responses.count_documents({})
+            count = (await client.get(f"/forms/{form['_id']}", headers=headers)).json()["response_count"]
+            return codes, stored, count
+
+    codes, stored, count = asyncio.run(scenario())
+    assert codes.count(200) == 5
+    assert codes.count(403) == 20
+    assert stored == count == 5
+
+
+def test_partial_batch_failure_only_fails_rejected_submissions(database):
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        queue = main.SubmissionQueue("flush", 100, 100, 0.01)
+        form_id = (await database.forms.insert_one({"response_count": 0})).inserted_id
+        duplicate = (await database.responses.insert_one({"form_id": form_id})).inserted_id
+        documents = [{"_id": ObjectId(), "form_id": form_id}, {"_id": duplicate, "form_id": form_id},
+                     {"_id": ObjectId(), "form_id": form_id}]
+        batch = [(document, {}, loop.create_future()) for document in documents]
+        await queue.flush(batch)
+        form = await database.forms.find_one({"_id": form_id})
+        return [ack.exception() is None for _, _, ack in batch], form["response_count"], queue.failed
+
+    acknowledged, response_count, failed = asyncio.run(scenario())
+    assert acknowledged == [True, False, True]
+    assert response_count == 2
+    assert failed == 1
+
+
+def test_queued_submit_rechecks_a_stale_cached_form(database, monkeypatch):
+    async def scenario():
+        queue = main.SubmissionQueue("enqueue", 100, 100, 0.01)
+        monkeypatch.setattr(main, "submission_queue", queue)
+        queue.start()
+        try:
+            async with api_client() as client:
+                headers = await sign_up(client)
+                form = (await client.post("/forms", json=form_payload(), headers=headers)).json()
+                first = await client.post(f"/f/{form['slug']}/submit", json={})
+                # Deactivated behind the cache's back, as by another worker
+                await database.forms.update_one({"_id": ObjectId(form["_id"])}, {"$set": {"is_active": False}})
+                second = await client.post(f"/f/{form['slug']}/submit", json={})
+                return first.status_code, second.status_code
+        finally:
+            await queue.stop()
+
+    assert asyncio.run(scenario()) == (200, 404)
@@ -0,0 +1,171 @@
+import asyncio
+import json
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+import main
+from conftest import api_client, form_payload, sign_up
+
+QUESTIONS = [
+    {"id": "name", "type": "text", "title": "Name", "required": True},
+    {"id": "f", "type": "file", "title": "Upload", "required": False},
+]
+BOUNDARY = "test-boundary"
+
+
+async def create_form(client):
+    headers = await sign_up(client)
+    return (await client.post("/forms", json=form_payload(questions=QUESTIONS), headers=headers)).json()
+
+
+async def stored_counts(database):
+    return [await collection.count_documents({})
+            for collection in (database.responses, database.fs.files, database.fs.chunks)]
+
+
+def test_multipart_file_is_streamed_into_gridfs(database):
+    content = bytes(range(256)) * 2400  # Spans several GridFS chunks
+
+    async def scenario():
+        async with api_client() as client:
+            form = await create_form(client)
+            response = await client.post(
+                f"/f/{form['slug']}/submit-multipart",
+                data={"answers": json.dumps({"name": "Ann"})},
+                files={"f": ("notes.bin", content, "application/octet-stream")},
+            )
+            stored = await database.responses.find_one({})
+            download = await client.get(f"/files/{stored['answers']['f']['file_id']}")
+            return response.status_code, stored["answers"], download.content
+
+    status_code, answers, downloaded = asyncio.run(scenario())
+    assert status_code == 200
+    assert answers["name"] == "Ann"
+    assert answers["f"]["filename"] == "notes.bin"
+    assert answers["f"]["size"] == len(content)
+    assert downloaded == content
+
+
+def test_oversized_upload_is_rejected_before_the_body_is_read(database):
+    chunk = b"x" * 65536
+    total_chunks = 3 * main.MAX_FILE_SIZE // len(chunk)
+    sent = []
+
+    async def body():
+        yield (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"answers\"\r\n\r\n"
+               f"{json.dumps({'name': 'Ann'})}\r\n"
+               f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"f\"; filename=\"big.bin\"\r\n"
+               f"Content-Type: application/octet-stream\r\n\r\n").encode()
+        for _ in range(total_chunks):
+            sent.append(len(chunk))
+            yield chunk
+        yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+    async def scenario():
+        async with api_client() as client:
+            form = await create_form(client)
+            response = await client.post(
+                f"/f/{form['slug']}/submit-multipart",
+                content=body(),
+                headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+            )
+            return response.status_code, await stored_counts(database)
+
+    status_code, counts = asyncio.run(scenario())
+    assert status_code == 413
+    assert sum(sent) <= main.MAX_FILE_SIZE + len(chunk)
+    assert len(sent) < total_chunks
+    assert counts == [0, 0, 0]
+
+
+def test_rejected_multipart_submission_leaves_no_files(database):
+    async def scenario():
+        async with api_client() as client:
+            form = await create_form(client)
+            response = await client.post(
+                f"/f/{form['slug']}/submit-multipart",
+                data={"answers": json.dumps({})},
+                files={"f": ("notes.txt", b"hello", "text/plain")},
+            )
+            return response.status_code, await stored_counts(database)
+
+    status_code, counts = asyncio.run(scenario())
+    assert status_code == 400
+    assert counts == [0, 0, 0]
+
+
+def base64_answers():
+    return {"name": "Ann", "f": {"name": "notes.txt", "type": "text/plain", "data": "data:text/plain;base64,aGVsbG8="}}
+
+
+class FailingResponses:
+    """The responses collection with every insert failing, as during a primary failover."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    async def insert_one(self, *args, **kwargs):
+        raise AutoReconnect("primary stepped down")
+
+    async def insert_many(self, *args, **kwargs):
+        raise AutoReconnect("primary stepped down")
+
+
+def test_full_queue_refuses_before_storing_files(database, monkeypatch):
+    async def scenario():
+        queue = main.SubmissionQueue("flush", 1, 100, 0.01)
+        queue._queue = asyncio.Queue(maxsize=1)
+        queue._queue.put_nowait(None)  # Already full; no task drains it
+        queue.accepting = True
+        monkeypatch.setattr(main, "submission_queue", queue)
+        async with api_client() as client:
+            form = await create_form(client)
+            json_submit = await client.post(f"/f/{form['slug']}/submit", json=base64_answers())
+            multipart_submit = await client.post(
+                f"/f/{form['slug']}/submit-multipart",
+                data={"answers": json.dumps({"name": "Ann"})},
+                files={"f": ("notes.txt", b"hello", "text/plain")},
+            )
+            return json_submit.status_code, multipart_submit.status_code, await stored_counts(database)
+
+    json_status, multipart_status, counts = asyncio.run(scenario())
+    assert json_status == multipart_status == 429
+    assert counts == [0, 0, 0]
+
+
+def test_unsaved_queued_submission_removes_its_files(database, monkeypatch):
+    async def scenario():
+        queue = main.SubmissionQueue("flush", 100, 100, 0.01)
+        monkeypatch.setattr(main, "submission_queue", queue)
+        queue.start()
+        try:
+            async with api_client() as client:
+                form = await create_form(client)
+                monkeypatch.setattr(main, "responses_collection", FailingResponses(database.responses))
+                response = await client.post(f"/f/{form['slug']}/submit", json=base64_answers())
+                return response.status_code, await stored_counts(database)
+        finally:
+            await queue.stop()
+
+    status_code, counts = asyncio.run(scenario())
+    assert status_code == 503
+    assert counts == [0, 0, 0]
+
+
+def test_failed_insert_removes_its_files(database, monkeypatch):
+    async def scenario():
+        async with api_client() as client:
+            form = await create_form(client)
+            monkeypatch.setattr(main, "responses_collection", FailingResponses(database.responses))
+            with pytest.raises(AutoReconnect):
+                await client.post(f"/f/{form['slug']}/submit", json=base64_answers())
+            stored = await database.forms.find_one({"slug": form["slug"]})
+            return stored["response_count"], await stored_counts(database)
+
+    response_count, counts = asyncio.run(scenario())
+    assert response_count == 0
+    assert counts == [0, 0, 0]
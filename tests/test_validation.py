@@ -0,0 +1,126 @@
+import random
+
+import pytest
+from fastapi import HTTPException
+
+from main import AnswerValidator, FormCreate, validate_question_patterns
+
+
+def text_question(**fields):
+    return {"id": "q", "type": "text", "title": "Name", "required": False, **fields}
+
+
+@pytest.mark.parametrize("blank", [None, "", []])
+def test_required_question_rejects_blank_answers(blank):
+    validator = AnswerValidator([text_question(required=True)])
+    assert validator.validate({"q": blank}) == "Question 'Name' is required"
+    assert validator.validate({}) == "Question 'Name' is required"
+    assert validator.validate({"q": "Ada"}) is None
+
+
+def test_optional_question_accepts_blank_answers():
+    validator = AnswerValidator([text_question()])
+    assert validator.validate({"q": ""}) is None
+
+
+def test_invalid_pattern_is_rejected_on_save():
+    form = FormCreate(
+        title="t",
+        start_screen={"id": "s", "title": "S"},
+        end_screen={"id": "e", "title": "E"},
+        questions=[text_question(validation={"pattern": "(unclosed"})],
+    )
+    with pytest.raises(HTTPException) as raised:
+        validate_question_patterns(form.questions)
+    assert raised.value.status_code == 400
+
+
+def test_stored_invalid_pattern_does_not_break_compilation():
+    validator = AnswerValidator([text_question(validation={"pattern": "(unclosed"})])
+    assert validator.validate({"q": "anything"}) is None
+
+
+def baseline_validate(questions, answers):
+    # submit_form_response's checks at a516386, minus the GridFS write for base64 file answers
+    for question_id, answer in list(answers.items()):
+        question = next((q for q in questions if q["id"] == question_id), None)
+        if question and question["type"] == "file" and isinstance(answer, dict) and "data" in answer:
+            pass
+    for question in questions:
+        if question["required"] and question["id"] not in answers:
+            return f"Question '{question['title']}' is required"
+    return None
+
+
+def survey_questions(count):
+    questions = []
+    for index in range(count):
+        kind = ("rating", "multiple_choice", "text")[index % 3]
+        question = {"id": f"q{index}", "type": kind, "title": f"Question {index}", "required": index % 2 == 0}
+        if kind == "rating":
+            question.update(min_value=1, max_value=5)
+        elif kind == "multiple_choice":
+            question["options"] = [{"value": value, "label": value} for value in "abc"]
+        questions.append(question)
+    return questions
+
+
+def test_compiled_validator_matches_baseline_on_well_formed_answers():
+    # Answers of the right type and range, some questions left out: both must agree on every one
+    rng = random.Random(7)
+    questions = survey_questions(60)
+    validator = AnswerValidator(questions)
+    for _ in range(500):
+        answers = {}
+        for question in questions:
+            if rng.random() < 0.1:
+                continue
+            if question["type"] == "rating":
+                answers[question["id"]] = rng.randint(1, 5)
+            elif question["type"] == "multiple_choice":
+                answers[question["id"]] = rng.choice("abc")
+            else:
+                answers[question["id"]] = "text"
+        if rng.random() < 0.2:
+            answers["not-a-question"] = "kept as submitted"
+        assert validator.validate(answers) == baseline_validate(questions, answers)
+
+
+CHOICES = [{"value": value, "label": value} for value in "ab"]
+
+
+@pytest.mark.parametrize("question, answer, error", [
+    ({"type": "email"}, "not-an-email", "Question 'Q' expects a valid email address"),
+    ({"type": "email"}, 42, "Question 'Q' expects text"),
+    ({"type": "number"}, "seven", "Question 'Q' expects a number"),
+    ({"type": "number"}, True, "Question 'Q' expects a number"),
+    ({"type": "number", "min_value": 1}, 0, "Question 'Q' must be at least 1"),
+    ({"type": "rating", "max_value": 5}, 6, "Question 'Q' must be at most 5"),
+    ({"type": "multiple_choice", "options": CHOICES}, "c", "Question 'Q' has an invalid option: c"),
+    ({"type": "dropdown", "options": CHOICES}, ["a"], "Question 'Q' expects a single option"),
+    ({"type": "checkbox", "options": CHOICES}, ["a", "z"], "Question 'Q' has an invalid option: z"),
+    ({"type": "checkbox", "options": CHOICES}, "a", "Question 'Q' expects a list of options"),
+    ({"type": "text", "validation": {"pattern": "^[0-9]+$"}}, "12a", "Question 'Q' has an invalid format"),
+    ({"type": "text", "validation": {"min_length": 3}}, "ab", "Question 'Q' must be at least 3 characters"),
+    ({"type": "paragraph", "validation": {"max_length": 3}}, "abcd", "Question 'Q' must be at most 3 characters"),
+    ({"type": "file"}, "report.pdf", "Question 'Q' expects a file"),
+    ({"type": "text", "required": True}, "", "Question 'Q' is required"),
+    ({"type": "checkbox", "required": True, "options": CHOICES}, [], "Question 'Q' is required"),
+    ({"type": "text", "required": True}, None, "Question 'Q' is required"),
+])
+def test_new_rejections_the_baseline_accepted(question, answer, error):
+    questions = [{"id": "q", "title": "Q", "required": False, **question}]
+    assert baseline_validate(questions, {"q": answer}) is None
+    assert AnswerValidator(questions).validate({"q": answer}) == error
+
+
+@pytest.mark.parametrize("answers", [
+    {"unknown": "stored as submitted"},
+    {"unknown": 12, "q": "ada@example.com"},
+    {"q": ""},
+    {"q": None},
+])
+def test_answers_both_accept(answers):
+    questions = [{"id": "q", "type": "email", "title": "Q", "required": False}]
+    assert baseline_validate(questions, answers) is None
+    assert AnswerValidator(questions).validate(answers) is None